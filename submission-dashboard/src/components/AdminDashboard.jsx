@@ -4,13 +4,18 @@ import { Badge } from '@/components/ui/badge'
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs'
 import { Alert, AlertDescription } from '@/components/ui/alert'
 import { Input } from '@/components/ui/input'
+import { Button } from '@/components/ui/button'
 import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@/components/ui/select'
 import { Users, FileText, CheckCircle, XCircle, AlertTriangle, TrendingUp, Search } from 'lucide-react'
 import { BarChart, Bar, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer, LineChart, Line } from 'recharts'
 
+const PAGE_SIZE = 50
+
 const AdminDashboard = ({ user }) => {
   const [analytics, setAnalytics] = useState(null)
   const [submissions, setSubmissions] = useState([])
+  const [submissionsTotal, setSubmissionsTotal] = useState(0)
+  const [page, setPage] = useState(1)
   const [users, setUsers] = useState([])
   const [rejectionData, setRejectionData] = useState([])
   const [trendData, setTrendData] = useState([])
@@ -24,58 +29,28 @@ const AdminDashboard = ({ user }) => {
     fetchAdminData()
   }, [])
 
+  // Re-query the current page whenever the filters change (debounced while typing)
+  useEffect(() => {
+    const timeout = setTimeout(fetchSubmissions, searchTerm ? 300 : 0)
+    return () => clearTimeout(timeout)
+  }, [searchTerm, filterStatus, filterTaskType, page])
+
   const fetchAdminData = async () => {
     try {
       setLoading(true)
       
-      // Fetch summary analytics
-      const analyticsResponse = await fetch('/api/analytics/summary', {
-        credentials: 'include',
-      })
-      
-      if (analyticsResponse.ok) {
-        const analyticsData = await analyticsResponse.json()
-        setAnalytics(analyticsData)
-      }
-
-      // Fetch all submissions
-      const submissionsResponse = await fetch('/api/submissions', {
-        credentials: 'include',
-      })
-      
-      if (submissionsResponse.ok) {
-        const submissionsData = await submissionsResponse.json()
-        setSubmissions(submissionsData)
-      }
-
-      // Fetch users
-      const usersResponse = await fetch('/api/users', {
-        credentials: 'include',
-      })
-      
-      if (usersResponse.ok) {
-        const usersData = await usersResponse.json()
-        setUsers(usersData)
-      }
-
-      // Fetch rejection by task type
-      const rejectionResponse = await fetch('/api/analytics/charts/rejection-by-task-type', {
+      // Fetch every dashboard panel except the submissions list in one request
+      // (the list is paged separately as the filters change)
+      const dashboardResponse = await fetch('/api/dashboard/admin?fields=summary,users,rejection_by_task_type,submission_trend', {
         credentials: 'include',
       })
       
-      if (rejectionResponse.ok) {
-        const rejectionChartData = await rejectionResponse.json()
-        setRejectionData(rejectionChartData)
-      }
-
-      // Fetch submission trend
-      const trendResponse = await fetch('/api/analytics/charts/submission-trend', {
-        credentials: 'include',
-      })
-      
-      if (trendResponse.ok) {
-        const trendChartData = await trendResponse.json()
-        setTrendData(trendChartData)
+      if (dashboardResponse.ok) {
+        const dashboardData = await dashboardResponse.json()
+        setAnalytics(dashboardData.summary)
+        setUsers(dashboardData.users)
+        setRejectionData(dashboardData.rejection_by_task_type)
+        setTrendData(dashboardData.submission_trend)
       }
 
     } catch (err) {
@@ -86,24 +61,38 @@ const AdminDashboard = ({ user }) => {
     }
   }
 
-  // Filter submissions based on search and filters
-  const filteredSubmissions = submissions.filter(submission => {
-    const matchesSearch = !searchTerm || 
-      (submission.Name && submission.Name.toLowerCase().includes(searchTerm.toLowerCase())) ||
-      (submission['Task Type'] && submission['Task Type'].toLowerCase().includes(searchTerm.toLowerCase())) ||
-      (submission['Miner/ Slicer Name'] && submission['Miner/ Slicer Name'].toLowerCase().includes(searchTerm.toLowerCase()))
+  // Fetch one page of submissions, filtered on the server
+  const fetchSubmissions = async () => {
+    try {
+      const params = new URLSearchParams({ page, page_size: PAGE_SIZE })
+      if (searchTerm) params.set('q', searchTerm)
+      if (filterStatus !== 'all') params.set('status', filterStatus)
+      if (filterTaskType !== 'all') params.set('task_type', filterTaskType)
 
-    const matchesStatus = filterStatus === 'all' || 
-      submission['Is this rejected (Slice / Miner)'] === filterStatus
+      const submissionsResponse = await fetch(`/api/submissions?${params}`, {
+        credentials: 'include',
+      })
+      
+      if (submissionsResponse.ok) {
+        const submissionsData = await submissionsResponse.json()
+        setSubmissions(submissionsData.items)
+        setSubmissionsTotal(submissionsData.total)
+      }
+    } catch (err) {
+      console.error('Error fetching submissions:', err)
+    }
+  }
 
-    const matchesTaskType = filterTaskType === 'all' || 
-      submission['Task Type'] === filterTaskType
+  // Changing a filter starts again from the first page
+  const updateFilter = (setter) => (value) => {
+    setter(value)
+    setPage(1)
+  }
 
-    return matchesSearch && matchesStatus && matchesTaskType
-  })
+  const pageCount = Math.max(1, Math.ceil(submissionsTotal / PAGE_SIZE))
 
-  // Get unique task types for filter
-  const taskTypes = [...new Set(submissions.map(s => s['Task Type']).filter(Boolean))]
+  // Get task types for filter from the per-task-type chart data
+  const taskTypes = rejectionData.map(d => d.task_type).filter(Boolean)
 
   if (loading) {
     return (
@@ -298,11 +287,11 @@ const AdminDashboard = ({ user }) => {
                   <Input
                     placeholder="Search by name, task type..."
                     value={searchTerm}
-                    onChange={(e) => setSearchTerm(e.target.value)}
+                    onChange={(e) => updateFilter(setSearchTerm)(e.target.value)}
                     className="pl-10"
                   />
                 </div>
-                <Select value={filterStatus} onValueChange={setFilterStatus}>
+                <Select value={filterStatus} onValueChange={updateFilter(setFilterStatus)}>
                   <SelectTrigger>
                     <SelectValue placeholder="Filter by status" />
                   </SelectTrigger>
@@ -312,7 +301,7 @@ const AdminDashboard = ({ user }) => {
                     <SelectItem value="Rejected">Rejected</SelectItem>
                   </SelectContent>
                 </Select>
-                <Select value={filterTaskType} onValueChange={setFilterTaskType}>
+                <Select value={filterTaskType} onValueChange={updateFilter(setFilterTaskType)}>
                   <SelectTrigger>
                     <SelectValue placeholder="Filter by task type" />
                   </SelectTrigger>
@@ -330,15 +319,15 @@ const AdminDashboard = ({ user }) => {
           {/* Submissions Table */}
           <Card>
             <CardHeader>
-              <CardTitle>All Submissions ({filteredSubmissions.length})</CardTitle>
+              <CardTitle>All Submissions ({submissionsTotal})</CardTitle>
               <CardDescription>
                 Complete list of team submissions with filtering
               </CardDescription>
             </CardHeader>
             <CardContent>
-              {filteredSubmissions.length > 0 ? (
+              {submissions.length > 0 ? (
                 <div className="space-y-4 max-h-96 overflow-y-auto">
-                  {filteredSubmissions.map((submission, index) => (
+                  {submissions.map((submission, index) => (
                     <div key={index} className="flex items-center justify-between p-4 border rounded-lg">
                       <div className="flex-1 grid grid-cols-1 md:grid-cols-3 gap-4">
                         <div>
@@ -380,6 +369,19 @@ const AdminDashboard = ({ user }) => {
                   No submissions found matching your filters
                 </div>
               )}
+              <div className="flex items-center justify-between pt-4">
+                <div className="text-sm text-muted-foreground">
+                  Page {page} of {pageCount}
+                </div>
+                <div className="flex space-x-2">
+                  <Button variant="outline" size="sm" disabled={page <= 1} onClick={() => setPage(page - 1)}>
+                    Previous
+                  </Button>
+                  <Button variant="outline" size="sm" disabled={page >= pageCount} onClick={() => setPage(page + 1)}>
+                    Next
+                  </Button>
+                </div>
+              </div>
             </CardContent>
           </Card>
         </TabsContent>
@@ -20,24 +20,15 @@ const UserDashboard = ({ user }) => {
     try {
       setLoading(true)
       
-      // Fetch user analytics
-      const analyticsResponse = await fetch('/api/analytics/my', {
+      // Fetch analytics and submissions in one request
+      const dashboardResponse = await fetch('/api/dashboard/me', {
         credentials: 'include',
       })
       
-      if (analyticsResponse.ok) {
-        const analyticsData = await analyticsResponse.json()
-        setAnalytics(analyticsData)
-      }
-
-      // Fetch user submissions
-      const submissionsResponse = await fetch('/api/submissions/my', {
-        credentials: 'include',
-      })
-      
-      if (submissionsResponse.ok) {
-        const submissionsData = await submissionsResponse.json()
-        setSubmissions(submissionsData)
+      if (dashboardResponse.ok) {
+        const dashboardData = await dashboardResponse.json()
+        setAnalytics(dashboardData.analytics)
+        setSubmissions(dashboardData.submissions)
       }
 
     } catch (err) {
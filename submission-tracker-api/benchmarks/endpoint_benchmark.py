@@ -0,0 +1,238 @@
+"""Benchmark every API endpoint against synthetic workbooks of several sizes.
+
+For each size a workbook is generated (see synthetic_workbook; reused if it
+already exists) and measured in a fresh process, so load times and peak RSS
+are not shared between sizes. That process reports:
+
+- load time of the workbook: parsing Excel (cold columnar cache), attaching the
+  published cache, and app startup (importing src.main, with data loaded)
+- per endpoint, for both main.py's app and the data/auth blueprints: status,
+  first-request latency (builds derived structures), p50/p99 over the repeats,
+  payload size, and the process's peak RSS after the endpoint ran
+
+Run from the submission-tracker-api directory:
+
+    python -m benchmarks.endpoint_benchmark [--sizes 10000,100000,1000000] [--reviewers 20]
+        [--repeats 20] [--backend excel|sqlite] [--workdir benchmarks/data] [--json results.json]
+
+Writing the .xlsx for 1M rows takes several minutes; it only happens once per
+size and seed.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import time
+import numpy as np
+
+DEFAULT_SIZES = '10000,100000,1000000'
+WORKDIR = os.path.join(os.path.dirname(__file__), 'data')
+
+# (app, role, method, path); {name} is a reviewer that resolves from the Users sheet
+ENDPOINTS = (
+    ('main', 'admin', 'GET', '/api/auth/verify'),
+    ('main', 'admin', 'GET', '/api/submissions'),
+    ('main', 'admin', 'GET', '/api/submissions?page=2&page_size=50&sort=-Timestamp'),
+    ('main', 'admin', 'GET', '/api/submissions?status=Rejected&q=lane&page=1'),
+    ('main', 'admin', 'GET', '/api/submissions/search?q=traffic light&limit=100'),
+    ('main', 'admin', 'GET', '/api/submissions/export?format=csv'),
+    ('main', 'admin', 'GET', '/api/users'),
+    ('main', 'admin', 'GET', '/api/users/reviewer-names'),
+    ('main', 'admin', 'GET', '/api/analytics/summary'),
+    ('main', 'admin', 'GET', '/api/analytics/charts/rejection-by-task-type'),
+    ('main', 'admin', 'GET', '/api/analytics/charts/submission-trend'),
+    ('main', 'admin', 'GET', '/api/analytics/trend?granularity=week&breakdown=reviewer'),
+    ('main', 'admin', 'GET', '/api/analytics/leaderboard?metric=rejected&k=10'),
+    ('main', 'admin', 'GET', '/api/dashboard/admin'),
+    ('main', 'admin', 'GET', '/api/metrics'),
+    ('main', 'user', 'GET', '/api/submissions/my'),
+    ('main', 'user', 'GET', '/api/analytics/my'),
+    ('main', 'user', 'GET', '/api/dashboard/me'),
+    ('main', 'user', 'GET', '/api/submissions/export?format=ndjson'),
+    ('blueprint', 'admin', 'GET', '/api/auth/verify'),
+    ('blueprint', 'admin', 'GET', '/api/submissions'),
+    ('blueprint', 'admin', 'GET', '/api/submissions?page=2&page_size=50&sort=-Timestamp'),
+    ('blueprint', 'admin', 'GET', '/api/submissions/search?q=traffic light&limit=100'),
+    ('blueprint', 'admin', 'GET', '/api/submissions/export?format=csv'),
+    ('blueprint', 'admin', 'GET', '/api/submissions/user/{name}'),
+    ('blueprint', 'admin', 'GET', '/api/users'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/summary'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/user/{name}'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/leaderboard?metric=rejection_rate&k=5'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/charts/rejection-by-task-type'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/charts/submission-trend'),
+    ('blueprint', 'admin', 'GET', '/api/analytics/trend?granularity=month&breakdown=status'),
+    ('blueprint', 'user', 'GET', '/api/submissions/my'),
+    ('blueprint', 'user', 'GET', '/api/analytics/my'),
+    ('blueprint', 'user', 'POST', '/api/auth/check-email'),
+)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def _percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return float(np.percentile(values, 50)), float(np.percentile(values, 99))
+
+
+def _request(client, method, path, body):
+    start = time.perf_counter()
+    response = client.open(path, method=method, json=body)
+    # Consume streamed bodies (exports) inside the timing
+    payload = response.get_data()
+    return time.perf_counter() - start, response.status_code, len(payload)
+
+
+def _blueprint_app():
+    from flask import Flask
+    from src.routes.auth import auth_bp
+    from src.routes.data import data_bp
+    from src.services import sql_store
+
+    app = Flask(__name__)
+    app.secret_key = 'benchmark'
+    sql_store.init_app(app)
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')
+    app.register_blueprint(data_bp, url_prefix='/api')
+    return app
+
+
+def measure(repeats):
+    """Run in the child process: load the workbook named by WORKBOOK_PATH and time every endpoint"""
+    from src.services import columnar_cache, data_store
+
+    path = data_store.EXCEL_FILE_PATH
+    result = {'rows': None, 'load': {}, 'endpoints': []}
+
+    start = time.perf_counter()
+    data_store.read_workbook(path)
+    result['load']['excel_parse_s'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    import src.main
+    result['load']['app_startup_s'] = time.perf_counter() - start
+
+    if columnar_cache.is_available():
+        # The startup load published the parsed sheets; this is what every other worker pays
+        start = time.perf_counter()
+        cached = columnar_cache.load_published(data_store.file_version(path))
+        result['load']['cache_attach_s'] = time.perf_counter() - start if cached is not None else None
+
+    snapshot = data_store.store.snapshot()
+    result['rows'] = len(snapshot.submissions)
+    result['load']['peak_rss_mb'] = peak_rss_mb()
+
+    users = snapshot.users
+    admin = users.loc[users['Role'].str.strip() == 'admin', 'Email'].iloc[0]
+    reviewer = users.loc[(users['Role'].str.strip() != 'admin') & users['Name'].notna()].iloc[0]
+    apps = {'main': src.main.app, 'blueprint': _blueprint_app()}
+    clients = {}
+    for app_name, app in apps.items():
+        for role, email in (('admin', admin), ('user', reviewer['Email'])):
+            client = app.test_client()
+            status = client.post('/api/auth/signin', json={'email': email}).status_code
+            if status != 200:
+                raise RuntimeError(f'{app_name} sign-in as {email} failed with {status}')
+            clients[app_name, role] = client
+
+    for app_name, role, method, path in ENDPOINTS:
+        path = path.format(name=reviewer['Name'])
+        body = {'email': reviewer['Email']} if method == 'POST' else None
+        client = clients[app_name, role]
+        first, status, size = _request(client, method, path, body)
+        samples = [_request(client, method, path, body)[0] for _ in range(repeats)]
+        p50, p99 = _percentiles(samples)
+        result['endpoints'].append({
+            'app': app_name, 'role': role, 'method': method, 'path': path, 'status': status,
+            'first_ms': first * 1000, 'p50_ms': p50, 'p99_ms': p99, 'bytes': size, 'peak_rss_mb': peak_rss_mb(),
+        })
+    return result
+
+
+def _workbook(workdir, rows, reviewers, seed):
+    from benchmarks import synthetic_workbook
+
+    path = os.path.join(workdir, f'workbook-{rows}-{reviewers}-{seed}.xlsx')
+    if not os.path.exists(path):
+        print(f"Generating {path} ...", flush=True)
+        submissions_df, users_df = synthetic_workbook.generate(rows, reviewers, seed)
+        synthetic_workbook.write_workbook(path, submissions_df, users_df)
+    return path
+
+
+def run_size(workdir, rows, args):
+    """Measure one workbook size in a fresh process with its own cache and database"""
+    path = _workbook(workdir, rows, args.reviewers, args.seed)
+    cache_dir = os.path.join(workdir, f'cache-{rows}')
+    # Start from a cold cache, so the first load parses Excel
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    database = os.path.join(workdir, f'submissions-{rows}.db')
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(database + suffix):
+            os.remove(database + suffix)
+
+    env = dict(
+        os.environ,
+        WORKBOOK_PATH=path,
+        DATA_CACHE_DIR=cache_dir,
+        DATA_BACKEND=args.backend,
+        DATABASE_URL=f'sqlite:///{database}',
+        SESSION_BACKEND='memory',
+    )
+    command = [sys.executable, '-m', 'benchmarks.endpoint_benchmark', '--child', '--repeats', str(args.repeats)]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        print(completed.stdout + completed.stderr)
+        raise SystemExit(f'benchmark for {rows} rows failed')
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def report(result):
+    load = result['load']
+    cache = load.get('cache_attach_s')
+    print(f"\n{result['rows']} submissions: Excel parse {load['excel_parse_s']:.2f}s, "
+          f"app startup {load['app_startup_s']:.2f}s, "
+          f"cache attach {f'{cache * 1000:.1f}ms' if cache is not None else 'n/a'}, "
+          f"peak RSS after load {load['peak_rss_mb']:.0f} MB")
+    print(f"{'app':<9} {'role':<5} {'endpoint':<58} {'st':>3} {'first':>9} {'p50':>9} {'p99':>9} {'bytes':>11} {'rss MB':>7}")
+    for row in result['endpoints']:
+        print(f"{row['app']:<9} {row['role']:<5} {row['method'] + ' ' + row['path']:<58.58} {row['status']:>3} "
+              f"{row['first_ms']:>7.1f}ms {row['p50_ms']:>7.1f}ms {row['p99_ms']:>7.1f}ms {row['bytes']:>11,} {row['peak_rss_mb']:>7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=DEFAULT_SIZES, help='comma-separated submission counts')
+    parser.add_argument('--reviewers', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--backend', choices=('excel', 'sqlite'), default='excel', help='DATA_BACKEND for the blueprints')
+    parser.add_argument('--workdir', default=WORKDIR, help='where workbooks, caches and databases are kept')
+    parser.add_argument('--json', help='also write the results to this file')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.repeats)))
+        return
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = []
+    for rows in (int(size) for size in args.sizes.split(',')):
+        result = run_size(args.workdir, rows, args)
+        report(result)
+        results.append(result)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
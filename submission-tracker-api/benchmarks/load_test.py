@@ -0,0 +1,341 @@
+"""Replay shift-change traffic against the app running under gunicorn.
+
+Every reviewer signs in at about the same time (spread over --ramp seconds)
+and opens the user dashboard, while admins open and keep refreshing the admin
+dashboard. Each virtual user is a thread with its own keep-alive connection
+and session cookie, looping over its session until --duration is up:
+
+    reviewer: signin, verify, dashboard/me, submissions/my, analytics/my,
+              then dashboard/me every --think seconds (on average)
+    admin:    signin, verify, dashboard/admin, submissions (page 1), then
+              every --think seconds one of: the analytics fan-out (summary,
+              users, both charts), another page, or a filtered search
+
+By default gunicorn is started here (gunicorn.conf.py, with --workers and
+--threads, sessions shared through a temporary SQLite file) and stopped at the
+end; pass --url to target a server that is already running instead. Reports
+throughput, latency percentiles and error counts per request type, plus the
+time from sign-in to a loaded dashboard. Only the standard library is used on
+the client side, so the driver's own overhead is a Python thread per user.
+
+Run from the submission-tracker-api directory:
+
+    python -m benchmarks.load_test [--workers 2] [--threads 4] [--reviewers 50] [--admins 3]
+        [--duration 30] [--ramp 5] [--think 2] [--workbook PATH | --rows N] [--url http://host:port]
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.cookies import SimpleCookie
+from urllib.parse import urlsplit
+import numpy as np
+import pandas as pd
+from src.services import data_store, schema
+
+API_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READY_TIMEOUT = 600
+ADMIN_PAGE_SIZE = 25
+SEARCH_TERMS = ('lane', 'traffic', 'crosswalk', 'highway', 'manual')
+
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class Client:
+    """One virtual user's keep-alive connection and session cookie"""
+
+    def __init__(self, base_url, results):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.cookies = {}
+        self.results = results
+        self.connection = None
+
+    def request(self, label, method, path, body=None):
+        """Send one request, record its latency under `label`, and return (status, body bytes)"""
+        headers = {'Accept-Encoding': 'gzip, br'}
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+
+        for attempt in range(2):
+            reused = self.connection is not None
+            start = time.perf_counter()
+            try:
+                if self.connection is None:
+                    self.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+                self.connection.request(method, path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                data = response.read()
+                status = response.status
+                break
+            except STALE_CONNECTION_ERRORS:
+                self.close()
+                # The server closed an idle keep-alive connection; retry once on a new one, as browsers do
+                if reused and attempt == 0:
+                    continue
+                self.results.record(label, time.perf_counter() - start, None, 0, 'connection closed')
+                return None, b''
+            except (OSError, http.client.HTTPException) as e:
+                self.close()
+                self.results.record(label, time.perf_counter() - start, None, 0, type(e).__name__)
+                return None, b''
+        self.results.record(label, time.perf_counter() - start, status, len(data))
+
+        for header in response.headers.get_all('Set-Cookie') or ():
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = morsel.value
+        if response.getheader('Connection', '').lower() == 'close':
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+
+class Results:
+    """Latencies, statuses and sizes per request type, shared by every virtual user"""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+        self.bytes = {}
+        self.ready = []
+        self._lock = threading.Lock()
+
+    def record(self, label, seconds, status, size, error=None):
+        with self._lock:
+            self.samples.setdefault(label, []).append(seconds)
+            self.bytes[label] = self.bytes.get(label, 0) + size
+            if error is not None or status is None or status >= 400:
+                key = error or str(status)
+                errors = self.errors.setdefault(label, {})
+                errors[key] = errors.get(key, 0) + 1
+
+    def dashboard_ready(self, seconds):
+        with self._lock:
+            self.ready.append(seconds)
+
+
+def _think(stop, mean):
+    """Sleep for an exponentially distributed think time; False once the run is over"""
+    return not stop.wait(random.expovariate(1 / mean) if mean > 0 else 0)
+
+
+def _sign_in(client, email):
+    status, _ = client.request('POST /api/auth/signin', 'POST', '/api/auth/signin', {'email': email})
+    client.request('GET /api/auth/verify', 'GET', '/api/auth/verify')
+    return status == 200
+
+
+def reviewer_session(client, email, stop, think):
+    start = time.perf_counter()
+    if not _sign_in(client, email):
+        return
+    client.request('GET /api/dashboard/me', 'GET', '/api/dashboard/me')
+    client.results.dashboard_ready(time.perf_counter() - start)
+    client.request('GET /api/submissions/my', 'GET', '/api/submissions/my')
+    client.request('GET /api/analytics/my', 'GET', '/api/analytics/my')
+    while _think(stop, think):
+        client.request('GET /api/dashboard/me', 'GET', '/api/dashboard/me')
+
+
+def admin_session(client, email, stop, think, task_types):
+    start = time.perf_counter()
+    if not _sign_in(client, email):
+        return
+    client.request('GET /api/dashboard/admin', 'GET', '/api/dashboard/admin?fields=summary,users,rejection_by_task_type,submission_trend')
+    client.request('GET /api/submissions (page)', 'GET', f'/api/submissions?page=1&page_size={ADMIN_PAGE_SIZE}')
+    client.results.dashboard_ready(time.perf_counter() - start)
+    while _think(stop, think):
+        action = random.random()
+        if action < 0.4:
+            # Fan-out of the individual analytics endpoints, as older dashboards do
+            for path in ('/api/analytics/summary', '/api/users', '/api/analytics/charts/rejection-by-task-type', '/api/analytics/charts/submission-trend'):
+                client.request(f'GET {path}', 'GET', path)
+        elif action < 0.7:
+            page = random.randint(1, 20)
+            client.request('GET /api/submissions (page)', 'GET', f'/api/submissions?page={page}&page_size={ADMIN_PAGE_SIZE}')
+        else:
+            params = f'q={random.choice(SEARCH_TERMS)}&status=Rejected'
+            if task_types:
+                params += '&task_type=' + random.choice(task_types).replace(' ', '+')
+            client.request('GET /api/submissions (filtered)', 'GET', f'/api/submissions?page=1&page_size={ADMIN_PAGE_SIZE}&{params}')
+
+
+def virtual_user(base_url, results, stop, delay, session):
+    if stop.wait(delay):
+        return
+    client = Client(base_url, results)
+    try:
+        session(client)
+    finally:
+        client.close()
+
+
+def read_users(path):
+    """(admin emails, reviewer emails, task types) from a workbook, parsing only what's needed"""
+    users = schema.normalize(pd.read_excel(path, sheet_name=data_store.USERS_SHEET), schema.USER_FIELDS, 'users')
+    users = users[users[schema.EMAIL].notna()]
+    roles = users[schema.ROLE].astype(str).str.strip()
+    task_types = pd.read_excel(path, sheet_name=data_store.SUBMISSIONS_SHEET, usecols=[schema.TASK_TYPE], nrows=5000)
+    return (
+        users.loc[roles == 'admin', schema.EMAIL].tolist(),
+        users.loc[roles != 'admin', schema.EMAIL].tolist(),
+        task_types[schema.TASK_TYPE].dropna().unique().tolist(),
+    )
+
+
+def start_server(args, workbook, workdir):
+    """Start gunicorn with the requested workers/threads and wait until it answers"""
+    env = dict(
+        os.environ,
+        PORT=str(args.port),
+        WEB_CONCURRENCY=str(args.workers),
+        GUNICORN_THREADS=str(args.threads),
+        # Sessions must be shared between workers
+        SESSION_BACKEND='sqlite',
+        SESSION_DB_PATH=os.path.join(workdir, 'sessions.db'),
+    )
+    if workbook is not None:
+        # A separate cache so the service's own cache entry isn't replaced
+        env.update(WORKBOOK_PATH=workbook, DATA_CACHE_DIR=os.path.join(workdir, 'cache'))
+    log = open(os.path.join(workdir, 'gunicorn.log'), 'w')
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'src.main:app'],
+        cwd=API_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+    base_url = f'http://127.0.0.1:{args.port}'
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"gunicorn exited with {server.returncode}; see {log.name}")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', args.port, timeout=5)
+            connection.request('GET', '/api/auth/verify')
+            if connection.getresponse().status == 200:
+                connection.close()
+                return server, base_url
+        except OSError:
+            pass
+        time.sleep(0.5)
+    stop_server(server)
+    raise SystemExit(f"gunicorn did not answer within {READY_TIMEOUT}s; see {log.name}")
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+def _percentiles(samples):
+    values = np.asarray(samples) * 1000
+    return [float(np.percentile(values, q)) for q in (50, 95, 99)] + [float(values.max())]
+
+
+def report(results, elapsed, args):
+    print(f"\n{args.reviewers} reviewers + {args.admins} admins for {elapsed:.1f}s against "
+          f"{args.url or f'gunicorn ({args.workers} workers x {args.threads} threads)'}")
+    print(f"{'request':<54} {'count':>7} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7} {'KB/req':>7}")
+    total, errors = 0, 0
+    for label in sorted(results.samples):
+        samples = results.samples[label]
+        failed = sum(results.errors.get(label, {}).values())
+        p50, p95, p99, worst = _percentiles(samples)
+        total += len(samples)
+        errors += failed
+        print(f"{label:<54.54} {len(samples):>7} {len(samples) / elapsed:>7.1f} {p50:>6.1f}ms {p95:>6.1f}ms "
+              f"{p99:>6.1f}ms {worst:>6.0f}ms {failed:>7} {results.bytes[label] / len(samples) / 1024:>7.1f}")
+    all_samples = [seconds for samples in results.samples.values() for seconds in samples]
+    if all_samples:
+        p50, p95, p99, worst = _percentiles(all_samples)
+        print(f"{'all requests':<54} {total:>7} {total / elapsed:>7.1f} {p50:>6.1f}ms {p95:>6.1f}ms {p99:>6.1f}ms {worst:>6.0f}ms {errors:>7}")
+    if results.ready:
+        p50, p95, p99, worst = _percentiles(results.ready)
+        print(f"\nsign-in to loaded dashboard: p50 {p50:.0f}ms, p95 {p95:.0f}ms, p99 {p99:.0f}ms, max {worst:.0f}ms over {len(results.ready)} sessions")
+    for label, counts in sorted(results.errors.items()):
+        print(f"errors for {label}: " + ', '.join(f'{key} x{count}' for key, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='target a running server instead of starting gunicorn')
+    parser.add_argument('--port', type=int, default=5099, help='port for the gunicorn started here')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--reviewers', type=int, default=50, help='concurrent reviewer sessions')
+    parser.add_argument('--admins', type=int, default=3, help='concurrent admin sessions')
+    parser.add_argument('--duration', type=float, default=30, help='seconds of traffic after the first sign-in')
+    parser.add_argument('--ramp', type=float, default=5, help='seconds over which sessions start')
+    parser.add_argument('--think', type=float, default=2, help='mean seconds between refreshes')
+    parser.add_argument('--workbook', help='serve this workbook (default: the service\'s own)')
+    parser.add_argument('--rows', type=int, help='generate a synthetic workbook with this many submissions and serve it')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='load-test-')
+    workbook = args.workbook
+    if args.rows:
+        from benchmarks import synthetic_workbook
+
+        workbook = os.path.join(workdir, f'workbook-{args.rows}.xlsx')
+        submissions_df, users_df = synthetic_workbook.generate(args.rows, max(args.reviewers, 1), args.seed)
+        synthetic_workbook.write_workbook(workbook, submissions_df, users_df)
+    admins, reviewers, task_types = read_users(workbook or data_store.EXCEL_FILE_PATH)
+    if not admins or not reviewers:
+        raise SystemExit('the Users sheet needs at least one admin and one reviewer')
+
+    server = None
+    base_url = args.url
+    if base_url is None:
+        print(f"Starting gunicorn ({args.workers} workers x {args.threads} threads), logging to {workdir}/gunicorn.log ...", flush=True)
+        server, base_url = start_server(args, workbook, workdir)
+
+    results = Results()
+    stop = threading.Event()
+    # Virtual users cycle through the sheet's emails if there are more users than rows
+    sessions = [
+        lambda client, email=reviewers[i % len(reviewers)]: reviewer_session(client, email, stop, args.think)
+        for i in range(args.reviewers)
+    ] + [
+        lambda client, email=admins[i % len(admins)]: admin_session(client, email, stop, args.think, task_types)
+        for i in range(args.admins)
+    ]
+    random.shuffle(sessions)
+    threads = [
+        threading.Thread(target=virtual_user, args=(base_url, results, stop, random.uniform(0, args.ramp), session), daemon=True)
+        for session in sessions
+    ]
+    try:
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        stop.wait(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=60)
+        elapsed = time.perf_counter() - start
+    finally:
+        if server is not None:
+            stop_server(server)
+    report(results, elapsed, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""Compare the records serializer with the previous to_dict + pd.isna + jsonify path.
+
+Run from the submission-tracker-api directory:
+
+    python -m benchmarks.serialization_benchmark [repeats]
+"""
+import sys
+import time
+import pandas as pd
+from flask import Flask, jsonify
+from src.services import data_store
+from src.services.serialization import frame_to_json
+
+
+def legacy_records_json(df):
+    """The per-cell conversion the endpoints used before"""
+    records = df.to_dict('records')
+    for record in records:
+        for key, value in record.items():
+            if pd.isna(value):
+                record[key] = None
+    return jsonify(records).get_data()
+
+
+def legacy_fillna_json(df):
+    """main.py's previous fillna('') + to_dict path (on object columns, as the sheet was read then)"""
+    return jsonify(df.astype(object).fillna('').to_dict('records')).get_data()
+
+
+def measure(fn, df, repeats):
+    """Best wall time over `repeats` runs, plus the payload size"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        body = fn(df)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(body)
+
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    df = data_store.get_submissions()
+    print(f"{len(df)} rows x {len(df.columns)} columns, best of {repeats}")
+
+    app = Flask(__name__)
+    with app.app_context():
+        for label, fn in (('to_dict + pd.isna + jsonify', legacy_records_json),
+                          ('fillna + to_dict + jsonify', legacy_fillna_json),
+                          ('frame_to_json', frame_to_json)):
+            seconds, size = measure(fn, df, repeats)
+            print(f"{label:30} {seconds * 1000:9.1f} ms {size / 1e6:8.2f} MB")
+
+
+if __name__ == '__main__':
+    main()
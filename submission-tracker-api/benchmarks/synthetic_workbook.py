@@ -0,0 +1,153 @@
+"""Generate a synthetic workbook shaped like the production form sheet.
+
+Column fill rates and cardinalities follow the real "Form Responses 1" sheet
+(mostly-empty leader/mistake columns, a few hundred miner names, unique links),
+scaled to any number of rows and reviewers. The Users sheet has a few admins
+plus one user per reviewer, with a Name column so every email resolves.
+
+Run from the submission-tracker-api directory:
+
+    python -m benchmarks.synthetic_workbook ROWS [--reviewers N] [--seed S] [--out PATH] [--cache]
+
+--cache also stores and publishes the columnar cache entry for the workbook,
+as the service would after its first parse. It needs DATA_CACHE_DIR set, since
+publishing replaces the entry the service itself attaches to.
+"""
+import argparse
+import os
+import numpy as np
+import pandas as pd
+from src.services import columnar_cache, data_store, ingest, schema
+
+TASK_TYPES = (
+    ('ML Ranker Audit Project FP', 0.70), ('AI Search FP', 0.17), ('ML Ranker Audit Project QA', 0.08),
+    ('UML Real Production', 0.04), ('UML QA Real', 0.005), ('AI Search QA', 0.005),
+)
+STATUSES = (('Accepted', 0.59), ('Rejected', 0.38), ('Data missing', 0.03))
+LEADERS = ('Omar Medany', 'Amr Saber', 'Kerolos Hany', 'Ewis', 'Omar Yasser')
+MISTAKES = ('Lack of adherence', 'Guidance Gap', 'Guidance ambiguity')
+LEADER_ANSWERS = ('Accept', 'Reject', 'Data Missing')
+FIRST_NAMES = ('Ahmed', 'Omar', 'Mohamed', 'Tarek', 'Hossam', 'Abdo', 'Magdy', 'Youssef', 'Mahmoud', 'Mostafa', 'Karim', 'Ali')
+LAST_NAMES = ('Ashraf', 'Samir', 'Hussin', 'Tarek', 'Aid', 'Shaban', 'Fathy', 'Nabil', 'Saad', 'Adel', 'Hany', 'Gamal')
+MINER_WORDS = ('av', 'lane', 'boundary', 'violation', 'crosswalk', 'traffic', 'light', 'yield', 'region', 'oncoming', 'blocking', 'npc', 'manual', 'leadcar', 'caution', 'highway', 'ramp')
+
+# Share of rows that have a value in each sparse column
+FILL = {'name': 0.944, 'miner': 0.79, 'miner_name': 0.042, 'prompt': 0.167, 'leader': 0.027, 'mistake': 0.1, 'comment': 0.01}
+
+START = pd.Timestamp('2025-05-07 08:00')
+DAYS = 56
+
+
+def reviewer_names(count):
+    """`count` distinct reviewer names ('First Last', then 'First Last 2', ...)"""
+    names = [f'{first} {last}' for first in FIRST_NAMES for last in LAST_NAMES]
+    return [names[i % len(names)] + (f' {i // len(names) + 1}' if i >= len(names) else '') for i in range(count)]
+
+
+def _choice(rng, rows, weighted):
+    values, weights = zip(*weighted)
+    weights = np.asarray(weights) / sum(weights)
+    return rng.choice(np.asarray(values, dtype=object), size=rows, p=weights)
+
+
+def _sparse(rng, values, fill):
+    """Keep each value with probability `fill`, else null"""
+    return np.where(rng.random(len(values)) < fill, values, None)
+
+
+def generate(rows, reviewers=20, seed=0):
+    """Return (submissions_df, users_df) with the sheets' raw headers"""
+    rng = np.random.default_rng(seed)
+    names = reviewer_names(reviewers)
+
+    # Submissions arrive in time order over DAYS days, at millisecond precision like the form's export
+    offsets = np.sort(rng.integers(0, DAYS * 24 * 3600 * 1000, size=rows))
+    timestamps = START + pd.to_timedelta(offsets, unit='ms')
+
+    # A few reviewers submit much more than the rest
+    weights = rng.pareto(1.5, size=reviewers) + 1
+    reviewer = rng.choice(np.asarray(names, dtype=object), size=rows, p=weights / weights.sum())
+
+    miners = np.asarray(['_'.join(rng.choice(MINER_WORDS, size=4, replace=False)) for _ in range(max(rows // 90, 10))], dtype=object)
+    miner = miners[rng.integers(0, len(miners), size=rows)]
+    vins = np.asarray([f'5G21A6P0{n:09d}' for n in rng.integers(0, 10 ** 9, size=max(rows // 2, 1))], dtype=object)
+    vin = vins[rng.integers(0, len(vins), size=rows)]
+    start = rng.integers(1_719_000_000, 1_732_000_000, size=rows)
+
+    leader = _sparse(rng, np.asarray(LEADERS, dtype=object)[rng.integers(0, len(LEADERS), size=rows)], FILL['leader'])
+    reviewed = pd.notna(leader)
+    mistake = np.where(reviewed & (rng.random(rows) < FILL['mistake']), rng.choice(np.asarray(MISTAKES, dtype=object), size=rows), None)
+
+    submissions = pd.DataFrame({
+        schema.TIMESTAMP: timestamps,
+        schema.NAME: _sparse(rng, reviewer, FILL['name']),
+        '"GULP" Link': [f'https://webviz.robot.car/?vin={v}&start={s}300&seek-to={s + 5}.3&duration=10' for v, s in zip(vin, start)],
+        schema.TASK_TYPE: _choice(rng, rows, TASK_TYPES),
+        'Slice Name': np.full(rows, np.nan),
+        'Miner/ Slicer Name': _sparse(rng, miner, FILL['miner']),
+        'Road Event': [f'{v}:{s}:{s + 10}|{m}|tpo-v1: LINK' for v, s, m in zip(vin, start, miner)],
+        'Miner Name': _sparse(rng, miners[rng.integers(0, min(len(miners), 12), size=rows)], FILL['miner_name']),
+        'Prompt Text': _sparse(rng, miners[rng.integers(0, min(len(miners), 60), size=rows)], FILL['prompt']),
+        schema.STATUS: _choice(rng, rows, STATUSES),
+        schema.CHANGED: np.full(rows, np.nan),
+        schema.LEADER_NAME: leader,
+        schema.ALIGNED: np.where(reviewed, np.where(rng.random(rows) < 0.99, 'Yes', 'No'), None),
+        schema.LEADER_ANSWER: np.where(reviewed & (rng.random(rows) < 0.01), rng.choice(np.asarray(LEADER_ANSWERS, dtype=object), size=rows), None),
+        schema.MISTAKE: mistake,
+        schema.COMMENT: np.where(pd.notna(mistake) & (rng.random(rows) < 0.5), 'need to pay attention to traffic light', None),
+    })
+
+    admins = [('Admin', f'admin{i + 1}@example.com', 'admin') for i in range(3)]
+    users = admins + [(name, f"{name.lower().replace(' ', '.')}@example.com", 'user ') for name in names]
+    users_df = pd.DataFrame({
+        schema.EMAIL: [email for _, email, _ in users],
+        # Trailing spaces as in the real sheet; the user directory strips them
+        schema.ROLE: [role for _, _, role in users],
+        schema.NAME: [name if role != 'admin' else None for name, _, role in users],
+    })
+    return submissions, users_df
+
+
+def write_workbook(path, submissions_df, users_df):
+    """Write both sheets to an .xlsx file under the production sheet names"""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        submissions_df.to_excel(writer, sheet_name=data_store.SUBMISSIONS_SHEET, index=False)
+        users_df.to_excel(writer, sheet_name=data_store.USERS_SHEET, index=False)
+
+
+def write_cache(path, submissions_df, users_df):
+    """Store and publish the columnar cache entry for the workbook at `path` without re-parsing it"""
+    if not columnar_cache.is_available():
+        print("pyarrow is not installed; skipping the columnar cache")
+        return None
+    submissions_df = ingest.normalize_sheet(submissions_df.copy(), data_store.SUBMISSIONS_SHEET)
+    users_df = ingest.normalize_sheet(users_df.copy(), data_store.USERS_SHEET)
+    with columnar_cache.publish_lock():
+        key = columnar_cache.workbook_hash(path)
+        if columnar_cache.store(key, submissions_df, users_df):
+            columnar_cache.publish(key, data_store.file_version(path))
+    return key
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('rows', type=int)
+    parser.add_argument('--reviewers', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', help='output path (default benchmarks/data/workbook-ROWS.xlsx)')
+    parser.add_argument('--cache', action='store_true', help='also publish the columnar cache entry')
+    args = parser.parse_args()
+    if args.cache and 'DATA_CACHE_DIR' not in os.environ:
+        parser.error("--cache needs DATA_CACHE_DIR, so the service's own cache is left alone")
+
+    path = args.out or os.path.join(os.path.dirname(__file__), 'data', f'workbook-{args.rows}.xlsx')
+    submissions_df, users_df = generate(args.rows, args.reviewers, args.seed)
+    write_workbook(path, submissions_df, users_df)
+    print(f"Wrote {len(submissions_df)} submissions and {len(users_df)} users to {path}")
+    if args.cache:
+        print(f"Published columnar cache entry {write_cache(path, submissions_df, users_df)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+# Tell the app how many workers share it, so sessions default to the shared store
+os.environ['WEB_CONCURRENCY'] = str(workers)
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# Import the app (and load the workbook) once in the master before forking, so
+# workers start with the data already attached from the shared columnar cache
+preload_app = True
@@ -1,27 +1,48 @@
 import os
 import sys
-import pandas as pd
-from flask import Flask, send_from_directory, send_file, jsonify, request, session
+from flask import Flask, send_from_directory, send_file, jsonify, request
 from flask_cors import CORS
 
+# Make the src package importable when run as `python src/main.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.routes.auth import lookup_user
+from src.services import dashboard, data_store, export, http_cache, metrics, reviewer_resolver, reviewer_stats, search_index, session_store, sql_queries, sql_store, submission_query, trends
+from src.services.serialization import composite_response, page_response, records_response
+
 app = Flask(__name__, static_folder='static', static_url_path='')
 app.secret_key = 'your-secret-key-change-in-production'
 
 # Enable CORS for all routes
 CORS(app, supports_credentials=True)
 
+# Latency/size metrics for every request (registered first so it sees the final response)
+metrics.init_app(app)
+
+# With DATA_BACKEND=sqlite, re-import a changed workbook before anything reads the data
+app.before_request(sql_store.sync_if_changed)
+
+# ETag/304 handling and compression for the data endpoints
+http_cache.init_app(app)
+
+# SQLAlchemy models; with DATA_BACKEND=sqlite this also imports the workbook
+# into the indexed tables the data routes then query
+sql_store.init_app(app)
+
 # Load data
 def load_data():
-    try:
-        excel_path = os.path.join(os.path.dirname(__file__), '..', 'NEW(new)CounterTeam.xlsx')
-        submissions_df = pd.read_excel(excel_path, sheet_name='Form Responses 1')
-        users_df = pd.read_excel(excel_path, sheet_name='Users')
-        return submissions_df, users_df
-    except Exception as e:
-        print(f"Error loading data: {e}")
-        return pd.DataFrame(), pd.DataFrame()
+    """Return the shared submissions and users DataFrames, parsing the workbook if needed"""
+    snapshot = data_store.store.snapshot()
+    return snapshot.submissions, snapshot.users
 
-submissions_df, users_df = load_data()
+def current_snapshot():
+    """The in-memory snapshot the routes read, or None when they query the database"""
+    return None if sql_store.enabled() else data_store.store.snapshot()
+
+# Parse the workbook once at startup so the first request doesn't pay for it;
+# with DATA_BACKEND=sqlite the data stays in the database instead
+if not sql_store.enabled():
+    load_data()
 
 # Authentication routes
 @app.route('/api/auth/signin', methods=['POST'])
@@ -30,28 +51,28 @@ def signin():
     email = data.get('email', '').strip()
     
     # Check if user exists in Users sheet
-    user_row = users_df[users_df['Email'].str.lower() == email.lower()]
+    user_info = lookup_user(email)
     
-    if user_row.empty:
+    if user_info is None:
         return jsonify({'error': 'User not found or not authorized'}), 401
     
-    user_info = user_row.iloc[0]
     user_data = {
-        'email': user_info['Email'],
-        'role': user_info['Role']
+        'email': user_info['email'],
+        'role': user_info['role'],
+        'name': user_info['name']
     }
     
-    session['user'] = user_data
+    session_store.start_session(user_data)
     return jsonify({'user': user_data})
 
 @app.route('/api/auth/signout', methods=['POST'])
 def signout():
-    session.pop('user', None)
+    session_store.end_session()
     return jsonify({'message': 'Signed out successfully'})
 
 @app.route('/api/auth/verify', methods=['GET'])
 def verify():
-    user = session.get('user')
+    user = session_store.current_user()
     if user:
         return jsonify({'authenticated': True, 'user': user})
     return jsonify({'authenticated': False})
@@ -59,107 +80,190 @@ def verify():
 # Data routes
 @app.route('/api/submissions', methods=['GET'])
 def get_all_submissions():
-    user = session.get('user')
+    user = session_store.current_user()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    snapshot = current_snapshot()
+    
+    # Filtered, sorted and paginated view when any paging, sort or filter parameters are given
+    if submission_query.is_query(request.args):
+        try:
+            page = dashboard.submissions_page(snapshot, request.args)
+        except submission_query.QueryError as e:
+            return jsonify({'error': str(e)}), 400
+        return page_response(page['items'], page['total'], page['page'], page['page_size'])
+    
+    return records_response(sql_queries.all_submissions() if snapshot is None else snapshot.submissions)
+
+@app.route('/api/submissions/search', methods=['GET'])
+def search_submissions():
+    user = session_store.current_user()
     if not user or user['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    return jsonify(submissions_df.fillna('').to_dict('records'))
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    try:
+        limit = search_index.parse_limit(request.args)
+    except search_index.SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if sql_store.enabled():
+        # Ranked by the database's full-text index
+        total, results, matches = sql_queries.search_submissions(query, limit)
+    else:
+        # Ranked row ids from the snapshot's search index, plus the matching rows
+        snapshot = data_store.store.snapshot()
+        total, results = search_index.search_submissions(snapshot, query, limit)
+        matches = snapshot.submissions.take([result['id'] for result in results])
+    
+    return composite_response(query=query, total=total, results=results, items=matches)
+
+@app.route('/api/submissions/export', methods=['GET'])
+def export_submissions():
+    user = session_store.current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    # Streamed in chunks; admins get every matching row, users only their own
+    try:
+        if sql_store.enabled():
+            return export.export_sql_response(user, request.args)
+        return export.export_response(data_store.store.snapshot(), user, request.args)
+    except (export.ExportError, submission_query.QueryError) as e:
+        return jsonify({'error': str(e)}), 400
 
 @app.route('/api/submissions/my', methods=['GET'])
 def get_my_submissions():
-    user = session.get('user')
+    user = session_store.current_user()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    # Extract name from email (assuming format like ME116268@meti.services)
-    email_prefix = user['email'].split('@')[0]
-    user_submissions = submissions_df[submissions_df['Name'].str.contains(email_prefix, case=False, na=False)]
-    
-    return jsonify(user_submissions.fillna('').to_dict('records'))
+    # Rows of the reviewer name the email was resolved to at load time
+    return records_response(dashboard.my_submissions(current_snapshot(), user))
 
 @app.route('/api/users', methods=['GET'])
 def get_users():
-    user = session.get('user')
+    user = session_store.current_user()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return records_response(dashboard.users(current_snapshot()))
+
+@app.route('/api/users/reviewer-names', methods=['GET'])
+def get_reviewer_names():
+    user = session_store.current_user()
     if not user or user['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    return jsonify(users_df.fillna('').to_dict('records'))
+    # How each user's email was matched to a reviewer name, and what couldn't be
+    if sql_store.enabled():
+        resolutions, conflicts = sql_queries.reviewer_resolutions()
+    else:
+        resolver = reviewer_resolver.get_resolver()
+        resolutions, conflicts = list(resolver.resolutions.values()), resolver.conflicts
+    return jsonify({
+        'resolutions': resolutions,
+        'conflicts': conflicts
+    })
 
 @app.route('/api/analytics/summary', methods=['GET'])
 def get_admin_analytics():
-    user = session.get('user')
+    user = session_store.current_user()
     if not user or user['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    analytics = {
-        'unique_members': submissions_df['Name'].nunique(),
-        'total_submissions': len(submissions_df),
-        'accepted_count': len(submissions_df[submissions_df['Is this rejected (Slice / Miner)'] == 'Accepted']),
-        'rejected_count': len(submissions_df[submissions_df['Is this rejected (Slice / Miner)'] == 'Rejected']),
-        'changed_count': len(submissions_df[submissions_df['Is this Changed (Slice / Miner)'] == 'Yes']),
-        'most_common_mistake': submissions_df['In your opinion, what is the reason for reviewer mistake?'].mode().iloc[0] if not submissions_df['In your opinion, what is the reason for reviewer mistake?'].mode().empty else 'No data',
-        'reviewer_with_most_rejected': submissions_df[submissions_df['Is this rejected (Slice / Miner)'] == 'Rejected']['Name'].mode().iloc[0] if not submissions_df[submissions_df['Is this rejected (Slice / Miner)'] == 'Rejected']['Name'].mode().empty else 'No data'
-    }
-    
-    return jsonify(analytics)
+    return jsonify(dashboard.admin_summary(current_snapshot()))
 
 @app.route('/api/analytics/my', methods=['GET'])
 def get_my_analytics():
-    user = session.get('user')
+    user = session_store.current_user()
     if not user:
         return jsonify({'error': 'Unauthorized'}), 401
     
-    # Extract name from email
-    email_prefix = user['email'].split('@')[0]
-    user_submissions = submissions_df[submissions_df['Name'].str.contains(email_prefix, case=False, na=False)]
-    
-    analytics = {
-        'total_submitted': len(user_submissions),
-        'accepted_count': len(user_submissions[user_submissions['Is this rejected (Slice / Miner)'] == 'Accepted']),
-        'rejected_count': len(user_submissions[user_submissions['Is this rejected (Slice / Miner)'] == 'Rejected']),
-        'leader_reviewed': len(user_submissions[user_submissions['Leader Name'].notna()]),
-        'changed_by_leader': len(user_submissions[user_submissions['Is this Changed (Slice / Miner)'] == 'Yes']),
-        'fully_aligned': len(user_submissions[user_submissions['Are the QC and Reviewer aligned on the same answer'] == 'Yes']),
-        'misaligned': len(user_submissions[user_submissions['Are the QC and Reviewer aligned on the same answer'] == 'No']),
-        'last_submission': user_submissions['Timestamp'].max() if not user_submissions.empty else None,
-        'mistake_reasons': user_submissions['In your opinion, what is the reason for reviewer mistake?'].value_counts().to_dict()
-    }
-    
-    return jsonify(analytics)
+    # Counters of the reviewer name the email was resolved to at load time
+    return jsonify(dashboard.my_analytics(current_snapshot(), user))
 
 @app.route('/api/analytics/charts/rejection-by-task-type', methods=['GET'])
 def get_rejection_by_task_type():
-    user = session.get('user')
+    user = session_store.current_user()
     if not user or user['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    chart_data = []
-    for task_type in submissions_df['Task Type'].unique():
-        if pd.isna(task_type):
-            continue
-        task_data = submissions_df[submissions_df['Task Type'] == task_type]
-        accepted = len(task_data[task_data['Is this rejected (Slice / Miner)'] == 'Accepted'])
-        rejected = len(task_data[task_data['Is this rejected (Slice / Miner)'] == 'Rejected'])
-        chart_data.append({
-            'task_type': task_type,
-            'accepted': accepted,
-            'rejected': rejected
-        })
-    
-    return jsonify(chart_data)
+    return jsonify(dashboard.rejection_by_task_type(current_snapshot()))
 
 @app.route('/api/analytics/charts/submission-trend', methods=['GET'])
 def get_submission_trend():
-    user = session.get('user')
+    user = session_store.current_user()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    return jsonify(dashboard.submission_trend(current_snapshot()))
+
+@app.route('/api/analytics/trend', methods=['GET'])
+def get_trend():
+    user = session_store.current_user()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Served from pre-rolled day/week/month buckets
+    try:
+        if sql_store.enabled():
+            return jsonify(sql_queries.query_trend(request.args))
+        return jsonify(trends.query_trend(data_store.store.snapshot(), request.args))
+    except trends.TrendError as e:
+        return jsonify({'error': str(e)}), 400
+
+@app.route('/api/analytics/leaderboard', methods=['GET'])
+def get_leaderboard():
+    user = session_store.current_user()
+    if not user or user['role'] != 'admin':
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    # Top-k selection over the per-reviewer stats table
+    table = sql_queries.get_reviewer_stats() if sql_store.enabled() else reviewer_stats.get_table(data_store.store.snapshot())
+    try:
+        return jsonify(reviewer_stats.query_leaderboard(table, request.args))
+    except reviewer_stats.LeaderboardError as e:
+        return jsonify({'error': str(e)}), 400
+
+# Dashboard routes: every panel of a dashboard from one snapshot in one request
+@app.route('/api/dashboard/admin', methods=['GET'])
+def get_admin_dashboard():
+    user = session_store.current_user()
     if not user or user['role'] != 'admin':
         return jsonify({'error': 'Unauthorized'}), 403
     
-    # Convert timestamp to date and count submissions per day
-    submissions_df['Date'] = pd.to_datetime(submissions_df['Timestamp']).dt.date
-    trend_data = submissions_df.groupby('Date').size().reset_index(name='count')
-    trend_data['date'] = trend_data['Date'].astype(str)
+    try:
+        panels = dashboard.build(dashboard.ADMIN_PANELS, current_snapshot(), user, request.args)
+    except (dashboard.UnknownFieldError, submission_query.QueryError) as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return composite_response(**panels)
+
+@app.route('/api/dashboard/me', methods=['GET'])
+def get_my_dashboard():
+    user = session_store.current_user()
+    if not user:
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        panels = dashboard.build(dashboard.USER_PANELS, current_snapshot(), user, request.args)
+    except dashboard.UnknownFieldError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return composite_response(**panels)
+
+# Prometheus scrape endpoint
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    if not metrics.authorized(session_store.current_user()):
+        return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify(trend_data[['date', 'count']].to_dict('records'))
+    return metrics.render(), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
 
 # Serve React app
 @app.route('/')
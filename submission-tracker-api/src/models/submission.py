@@ -0,0 +1,100 @@
+from src.models.user import db
+from src.services import schema
+
+# Canonical sheet header -> Submission attribute, in sheet order
+SUBMISSION_COLUMNS = {
+    schema.TIMESTAMP: 'timestamp',
+    schema.NAME: 'name',
+    '"GULP" Link': 'gulp_link',
+    schema.TASK_TYPE: 'task_type',
+    'Slice Name': 'slice_name',
+    'Miner/ Slicer Name': 'miner_slicer_name',
+    'Road Event': 'road_event',
+    'Miner Name': 'miner_name',
+    'Prompt Text': 'prompt_text',
+    schema.STATUS: 'status',
+    schema.CHANGED: 'changed',
+    schema.LEADER_NAME: 'leader_name',
+    schema.ALIGNED: 'aligned',
+    schema.LEADER_ANSWER: 'leader_answer',
+    schema.MISTAKE: 'mistake',
+    schema.COMMENT: 'comment',
+}
+
+# Canonical sheet header -> SheetUser attribute
+USER_COLUMNS = {
+    schema.EMAIL: 'email',
+    schema.ROLE: 'role',
+}
+
+
+class Submission(db.Model):
+    """One row of the form responses sheet; `id` is its position in the sheet"""
+    __tablename__ = 'submissions'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    timestamp = db.Column(db.DateTime, index=True)
+    name = db.Column(db.Text, index=True)
+    gulp_link = db.Column(db.Text)
+    task_type = db.Column(db.Text, index=True)
+    slice_name = db.Column(db.Text)
+    miner_slicer_name = db.Column(db.Text)
+    road_event = db.Column(db.Text)
+    miner_name = db.Column(db.Text)
+    prompt_text = db.Column(db.Text)
+    status = db.Column(db.Text, index=True)
+    changed = db.Column(db.Text)
+    leader_name = db.Column(db.Text)
+    aligned = db.Column(db.Text)
+    leader_answer = db.Column(db.Text)
+    mistake = db.Column(db.Text)
+    comment = db.Column(db.Text)
+
+    __table_args__ = (
+        # Per-reviewer queries read one reviewer's rows in time order
+        db.Index('ix_submissions_name_timestamp', 'name', 'timestamp'),
+        db.Index('ix_submissions_task_type_status', 'task_type', 'status'),
+    )
+
+    def __repr__(self):
+        return f'<Submission {self.id}>'
+
+
+class SheetUser(db.Model):
+    """One row of the Users sheet, with the reviewer name its email resolved to"""
+    __tablename__ = 'sheet_users'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    email = db.Column(db.Text, nullable=False)
+    # Normalized email (see user_directory.normalize_email) for lookups
+    email_key = db.Column(db.Text, unique=True, nullable=False, index=True)
+    role = db.Column(db.Text)
+    reviewer_name = db.Column(db.Text, index=True)
+    # Resolver tier that matched the reviewer name ('exact', 'prefix', 'fuzzy'), or None
+    resolution_method = db.Column(db.Text)
+
+    def __repr__(self):
+        return f'<SheetUser {self.email}>'
+
+    def to_dict(self):
+        return {
+            'email': self.email,
+            'role': self.role,
+            'name': self.reviewer_name
+        }
+
+
+class ImportState(db.Model):
+    """The workbook version the tables were last synced from (a single row)"""
+    __tablename__ = 'import_state'
+
+    id = db.Column(db.Integer, primary_key=True)
+    workbook_version = db.Column(db.Text)
+    generation = db.Column(db.Integer, nullable=False, default=0)
+    submissions = db.Column(db.Integer, nullable=False, default=0)
+    users = db.Column(db.Integer, nullable=False, default=0)
+    imported_at = db.Column(db.DateTime)
+    # Reviewer name conflicts reported by the resolver, as JSON
+    conflicts = db.Column(db.Text)
+    # The Users sheet as read (raw cells, sheet column order), as split-oriented JSON
+    users_sheet = db.Column(db.Text)
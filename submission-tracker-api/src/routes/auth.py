@@ -1,54 +1,31 @@
-from flask import Blueprint, jsonify, request, session
-import pandas as pd
-import os
-from datetime import datetime, timedelta
-import secrets
+from flask import Blueprint, jsonify, request
+from src.services import metrics, session_store, sql_queries, sql_store, user_directory
 
 auth_bp = Blueprint('auth', __name__)
 
-# Path to the Excel file
-EXCEL_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'NEW(new)CounterTeam.xlsx')
+# Request metrics for every auth endpoint
+auth_bp.before_request(metrics.start_request)
+auth_bp.after_request(metrics.finish_request)
+auth_bp.teardown_request(metrics.stop_profiler)
+# Sign-ins see Users sheet changes (with DATA_BACKEND=sqlite)
+auth_bp.before_request(sql_store.sync_if_changed)
 
-def load_users_data():
-    """Load users data from Excel file"""
-    try:
-        df = pd.read_excel(EXCEL_FILE_PATH, sheet_name='Users')
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        print(f"Error loading users data: {e}")
-        return pd.DataFrame()
+def lookup_user(email):
+    """User record for an email from the users table or the prebuilt user directory, or None"""
+    if sql_store.enabled():
+        return sql_queries.lookup_user(email)
+    return user_directory.get_directory().lookup(email)
 
-def load_submissions_data():
-    """Load submissions data from Excel file"""
-    try:
-        df = pd.read_excel(EXCEL_FILE_PATH, sheet_name='Form Responses 1')
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        print(f"Error loading submissions data: {e}")
-        return pd.DataFrame()
+def has_users():
+    """Whether any users were loaded at all"""
+    if sql_store.enabled():
+        return sql_queries.has_users()
+    return bool(user_directory.get_directory().users)
 
 def find_user_name_by_email(email):
-    """Find user name from submissions data based on email pattern"""
-    submissions_df = load_submissions_data()
-    if submissions_df.empty or 'Name' not in submissions_df.columns:
-        return None
-    
-    # Get unique names from submissions
-    unique_names = submissions_df['Name'].dropna().unique()
-    
-    # For now, we'll return the first name if email exists in users
-    # In a real scenario, you might want to implement a more sophisticated mapping
-    users_df = load_users_data()
-    if not users_df.empty and email in users_df['Email'].values:
-        # Return the first non-null name from submissions as a fallback
-        if len(unique_names) > 0:
-            return unique_names[0]
-    
-    return None
+    """Find user name for an email from the prebuilt user directory"""
+    user = lookup_user(email)
+    return user['name'] if user else None
 
 @auth_bp.route('/signin', methods=['POST'])
 def signin():
@@ -59,46 +36,30 @@ def signin():
     if not email:
         return jsonify({'error': 'Email is required'}), 400
     
-    users_df = load_users_data()
-    if users_df.empty:
+    if not has_users():
         return jsonify({'error': 'No users data found'}), 404
     
     # Find user by email
-    user_row = users_df[users_df['Email'] == email]
+    user_data = lookup_user(email)
     
-    if user_row.empty:
+    if user_data is None:
         return jsonify({'error': 'User not found or not authorized'}), 401
     
-    user_data = user_row.iloc[0].to_dict()
-    
-    # Handle NaN values
-    for key, value in user_data.items():
-        if pd.isna(value):
-            user_data[key] = None
-    
-    # Generate a simple session token
-    session_token = secrets.token_urlsafe(32)
+    # Associated name was resolved when the directory was built
+    user_name = user_data['name']
     
-    # Find associated name from submissions data
-    user_name = find_user_name_by_email(email)
-    
-    # Store session info (in a real app, you'd use a proper session store)
-    session_data = {
-        'email': user_data['Email'],
-        'role': user_data['Role'],
-        'name': user_name,
-        'token': session_token,
-        'expires': (datetime.now() + timedelta(hours=24)).isoformat()
-    }
-    
-    # Store in Flask session for simplicity
-    session['user'] = session_data
+    # Keep the session server-side; the cookie only carries its token
+    session_token = session_store.start_session({
+        'email': user_data['email'],
+        'role': user_data['role'],
+        'name': user_name
+    })
     
     return jsonify({
         'success': True,
         'user': {
-            'email': user_data['Email'],
-            'role': user_data['Role'],
+            'email': user_data['email'],
+            'role': user_data['role'],
             'name': user_name,
             'token': session_token
         }
@@ -107,26 +68,20 @@ def signin():
 @auth_bp.route('/signout', methods=['POST'])
 def signout():
     """Sign out user"""
-    session.pop('user', None)
+    session_store.end_session()
     return jsonify({'success': True, 'message': 'Signed out successfully'})
 
 @auth_bp.route('/verify', methods=['GET'])
 def verify_session():
     """Verify current session"""
-    user_data = session.get('user')
+    user_data = session_store.current_user()
     
     if not user_data:
-        return jsonify({'authenticated': False}), 401
-    
-    # Check if session has expired
-    try:
-        expires = datetime.fromisoformat(user_data['expires'])
-        if datetime.now() > expires:
-            session.pop('user', None)
+        # A token the store doesn't know has expired (or was swept)
+        if session_store.has_token():
+            session_store.end_session()
             return jsonify({'authenticated': False, 'error': 'Session expired'}), 401
-    except:
-        session.pop('user', None)
-        return jsonify({'authenticated': False, 'error': 'Invalid session'}), 401
+        return jsonify({'authenticated': False}), 401
     
     return jsonify({
         'authenticated': True,
@@ -146,31 +101,20 @@ def check_email():
     if not email:
         return jsonify({'error': 'Email is required'}), 400
     
-    users_df = load_users_data()
-    if users_df.empty:
-        return jsonify({'exists': False})
-    
     # Check if email exists
-    email_exists = email in users_df['Email'].values
+    email_exists = lookup_user(email) is not None
     
     return jsonify({'exists': email_exists})
 
 def require_auth(f):
     """Decorator to require authentication"""
     def decorated_function(*args, **kwargs):
-        user_data = session.get('user')
+        user_data = session_store.current_user()
         if not user_data:
-            return jsonify({'error': 'Authentication required'}), 401
-        
-        # Check if session has expired
-        try:
-            expires = datetime.fromisoformat(user_data['expires'])
-            if datetime.now() > expires:
-                session.pop('user', None)
+            # Expired sessions are gone from the store, so this is one lookup
+            if session_store.has_token():
                 return jsonify({'error': 'Session expired'}), 401
-        except:
-            session.pop('user', None)
-            return jsonify({'error': 'Invalid session'}), 401
+            return jsonify({'error': 'Authentication required'}), 401
         
         return f(*args, **kwargs)
     
@@ -180,7 +124,7 @@ def require_auth(f):
 def require_admin(f):
     """Decorator to require admin role"""
     def decorated_function(*args, **kwargs):
-        user_data = session.get('user')
+        user_data = session_store.current_user()
         if not user_data:
             return jsonify({'error': 'Authentication required'}), 401
         
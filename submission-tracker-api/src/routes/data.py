@@ -1,284 +1,250 @@
-from flask import Blueprint, jsonify, request, session
-import pandas as pd
-import os
-from datetime import datetime
+from flask import Blueprint, jsonify, request
 from src.routes.auth import require_auth, require_admin
+from src.services import aggregates, data_store, export, http_cache, metrics, reviewer_index, reviewer_stats, search_index, session_store, sql_queries, sql_store, submission_query, trends, user_directory
+from src.services.serialization import composite_response, page_response, records_response
 
 data_bp = Blueprint('data', __name__)
 
-# Path to the Excel file
-EXCEL_FILE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'NEW(new)CounterTeam.xlsx')
+# Request metrics, then (with DATA_BACKEND=sqlite) re-importing a changed
+# workbook, then ETag/304 handling and compression for every data endpoint
+data_bp.before_request(metrics.start_request)
+data_bp.after_request(metrics.finish_request)
+data_bp.teardown_request(metrics.stop_profiler)
+data_bp.before_request(sql_store.sync_if_changed)
+data_bp.before_request(http_cache.check_not_modified)
+data_bp.after_request(http_cache.finalize_response)
 
-def load_submissions_data():
-    """Load submissions data from Excel file"""
-    try:
-        df = pd.read_excel(EXCEL_FILE_PATH, sheet_name='Form Responses 1')
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        print(f"Error loading submissions data: {e}")
-        return pd.DataFrame()
-
-def load_users_data():
-    """Load users data from Excel file"""
-    try:
-        df = pd.read_excel(EXCEL_FILE_PATH, sheet_name='Users')
-        # Clean column names
-        df.columns = df.columns.str.strip()
-        return df
-    except Exception as e:
-        print(f"Error loading users data: {e}")
-        return pd.DataFrame()
+def _reviewer_name(user_data):
+    """Reviewer name the signed-in user's email was resolved to when the data was loaded"""
+    if sql_store.enabled():
+        return sql_queries.reviewer_name(user_data)
+    return user_directory.reviewer_name(data_store.store.snapshot(), user_data)
 
 @data_bp.route('/submissions', methods=['GET'])
 @require_admin
 def get_submissions():
-    """Get all submissions data (admin only)"""
-    df = load_submissions_data()
+    """Get all submissions data, optionally filtered and paginated (admin only)"""
+    if sql_store.enabled():
+        return _get_submissions_sql()
+    
+    snapshot = data_store.store.snapshot()
+    df = snapshot.submissions
     if df.empty:
         return jsonify({'error': 'No data found'}), 404
     
-    # Convert DataFrame to list of dictionaries
-    submissions = df.to_dict('records')
+    # Filtered, sorted and paginated view when any paging, sort or filter parameters are given
+    if submission_query.is_query(request.args):
+        try:
+            page_df, total, page, page_size = submission_query.query_submissions(snapshot, request.args)
+        except submission_query.QueryError as e:
+            return jsonify({'error': str(e)}), 400
+        return page_response(page_df, total, page, page_size)
+    
+    return records_response(df)
+
+def _get_submissions_sql():
+    if not sql_queries.has_submissions():
+        return jsonify({'error': 'No data found'}), 404
+    
+    # Filtering, sorting and paging run in SQLite on the indexed columns
+    if submission_query.is_query(request.args):
+        try:
+            page_df, total, page, page_size = sql_queries.query_submissions(request.args)
+        except submission_query.QueryError as e:
+            return jsonify({'error': str(e)}), 400
+        return page_response(page_df, total, page, page_size)
+    
+    return records_response(sql_queries.all_submissions())
+
+@data_bp.route('/submissions/search', methods=['GET'])
+@require_admin
+def search_submissions():
+    """Full-text search over submission text columns (admin only)"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Query parameter q is required'}), 400
+    
+    try:
+        limit = search_index.parse_limit(request.args)
+    except search_index.SearchError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    if sql_store.enabled():
+        # Ranked by the full-text index in the database
+        total, results, matches = sql_queries.search_submissions(query, limit)
+        return composite_response(query=query, total=total, results=results, items=matches)
     
-    # Handle NaN values by converting them to None
-    for submission in submissions:
-        for key, value in submission.items():
-            if pd.isna(value):
-                submission[key] = None
+    # Ranked row ids from the snapshot's search index, plus the matching rows
+    snapshot = data_store.store.snapshot()
+    total, results = search_index.search_submissions(snapshot, query, limit)
+    matches = snapshot.submissions.take([result['id'] for result in results])
     
-    return jsonify(submissions)
+    return composite_response(query=query, total=total, results=results, items=matches)
+
+@data_bp.route('/submissions/export', methods=['GET'])
+@require_auth
+def export_submissions():
+    """Stream submissions as CSV or NDJSON (admins get all rows, users their own)"""
+    try:
+        if sql_store.enabled():
+            return export.export_sql_response(session_store.current_user(), request.args)
+        return export.export_response(data_store.store.snapshot(), session_store.current_user(), request.args)
+    except (export.ExportError, submission_query.QueryError) as e:
+        return jsonify({'error': str(e)}), 400
 
 @data_bp.route('/submissions/user/<name>', methods=['GET'])
 @require_auth
 def get_submissions_by_user(name):
     """Get submissions for a specific user"""
-    user_data = session.get('user')
+    user_data = session_store.current_user()
     
     # Users can only access their own data unless they're admin
-    if user_data.get('role') != 'admin' and user_data.get('name') != name:
+    if user_data.get('role') != 'admin' and _reviewer_name(user_data) != name:
         return jsonify({'error': 'Access denied'}), 403
     
-    df = load_submissions_data()
-    if df.empty:
-        return jsonify({'error': 'No data found'}), 404
-    
-    # Filter by user name (case-sensitive as per requirements)
-    user_submissions = df[df['Name'] == name]
+    return _submissions_for_name(name)
+
+def _submissions_for_name(name):
+    if sql_store.enabled():
+        if not sql_queries.has_submissions():
+            return jsonify({'error': 'No data found'}), 404
+        # Only the user's rows are read, through the name index (case-sensitive as per requirements)
+        user_submissions = sql_queries.submissions_for_name(name)
+    else:
+        snapshot = data_store.store.snapshot()
+        if snapshot.submissions.empty:
+            return jsonify({'error': 'No data found'}), 404
+        # Look up the user's rows in the reviewer index (case-sensitive as per requirements)
+        user_submissions = reviewer_index.submissions_for_name(snapshot, name)
     
     if user_submissions.empty:
         return jsonify([])
     
-    submissions = user_submissions.to_dict('records')
-    
-    # Handle NaN values
-    for submission in submissions:
-        for key, value in submission.items():
-            if pd.isna(value):
-                submission[key] = None
-    
-    return jsonify(submissions)
+    return records_response(user_submissions)
 
 @data_bp.route('/submissions/my', methods=['GET'])
 @require_auth
 def get_my_submissions():
     """Get submissions for the current authenticated user"""
-    user_data = session.get('user')
-    user_name = user_data.get('name')
+    user_data = session_store.current_user()
+    # Reviewer name the email was resolved to when the data was loaded
+    user_name = _reviewer_name(user_data)
     
     if not user_name:
         return jsonify({'error': 'User name not found'}), 400
     
-    df = load_submissions_data()
-    if df.empty:
-        return jsonify({'error': 'No data found'}), 404
-    
-    # Filter by user name (case-sensitive as per requirements)
-    user_submissions = df[df['Name'] == user_name]
-    
-    if user_submissions.empty:
-        return jsonify([])
-    
-    submissions = user_submissions.to_dict('records')
-    
-    # Handle NaN values
-    for submission in submissions:
-        for key, value in submission.items():
-            if pd.isna(value):
-                submission[key] = None
-    
-    return jsonify(submissions)
+    return _submissions_for_name(user_name)
 
 @data_bp.route('/users', methods=['GET'])
 @require_admin
 def get_users():
     """Get all users data (admin only)"""
-    df = load_users_data()
+    df = sql_queries.users() if sql_store.enabled() else data_store.get_users()
     if df.empty:
         return jsonify({'error': 'No users data found'}), 404
     
-    users = df.to_dict('records')
-    
-    # Handle NaN values
-    for user in users:
-        for key, value in user.items():
-            if pd.isna(value):
-                user[key] = None
-    
-    return jsonify(users)
+    return records_response(df)
+
+def _get_aggregates():
+    """Counters over all submissions, or None if there are none"""
+    if sql_store.enabled():
+        # Grouped in SQLite once per import
+        summary = sql_queries.get_aggregates()
+        return summary if summary.total else None
+    snapshot = data_store.store.snapshot()
+    if snapshot.submissions.empty:
+        return None
+    # All counters come from the snapshot's precomputed aggregates
+    return aggregates.get_aggregates(snapshot)
+
+def _get_reviewer_stats():
+    """Per-reviewer stats table of the current data, or None if there are no submissions"""
+    if sql_store.enabled():
+        table = sql_queries.get_reviewer_stats()
+        return table if sql_queries.get_aggregates().total else None
+    snapshot = data_store.store.snapshot()
+    if snapshot.submissions.empty:
+        return None
+    # Materialized once per snapshot from its aggregates
+    return reviewer_stats.get_table(snapshot)
 
 @data_bp.route('/analytics/summary', methods=['GET'])
 @require_admin
 def get_summary_analytics():
     """Get summary analytics for admin dashboard"""
-    df = load_submissions_data()
-    if df.empty:
+    summary = _get_aggregates()
+    if summary is None:
         return jsonify({'error': 'No data found'}), 404
     
-    # Calculate summary statistics
-    total_submissions = len(df)
-    unique_members = df['Name'].nunique() if 'Name' in df.columns else 0
-    
-    # Count accepted vs rejected
-    accepted_count = len(df[df['Is this rejected (Slice / Miner)'] == 'Accepted']) if 'Is this rejected (Slice / Miner)' in df.columns else 0
-    rejected_count = len(df[df['Is this rejected (Slice / Miner)'] == 'Rejected']) if 'Is this rejected (Slice / Miner)' in df.columns else 0
-    
-    # Count tasks changed by leaders
-    changed_count = len(df[df['Is this Changed (Slice / Miner)'].notna()]) if 'Is this Changed (Slice / Miner)' in df.columns else 0
-    
-    # Most common reviewer mistake
-    mistake_column = 'In you opinion, What is the reason for reviewer mistake?'
-    most_common_mistake = None
-    if mistake_column in df.columns:
-        mistake_counts = df[mistake_column].value_counts()
-        if not mistake_counts.empty:
-            most_common_mistake = mistake_counts.index[0]
-    
-    # Reviewer with most rejected tasks
-    reviewer_with_most_rejected = None
-    if 'Name' in df.columns and 'Is this rejected (Slice / Miner)' in df.columns:
-        rejected_by_reviewer = df[df['Is this rejected (Slice / Miner)'] == 'Rejected']['Name'].value_counts()
-        if not rejected_by_reviewer.empty:
-            reviewer_with_most_rejected = rejected_by_reviewer.index[0]
-    
     return jsonify({
-        'total_submissions': total_submissions,
-        'unique_members': unique_members,
-        'accepted_count': accepted_count,
-        'rejected_count': rejected_count,
-        'changed_count': changed_count,
-        'most_common_mistake': most_common_mistake,
-        'reviewer_with_most_rejected': reviewer_with_most_rejected
+        'total_submissions': summary.total,
+        'unique_members': summary.unique_members,
+        'accepted_count': summary.status['Accepted'],
+        'rejected_count': summary.status['Rejected'],
+        'changed_count': summary.changed_count,
+        'most_common_mistake': summary.most_common_mistake,
+        'reviewer_with_most_rejected': _get_reviewer_stats().leader('rejected')
     })
 
 @data_bp.route('/analytics/user/<name>', methods=['GET'])
 @require_auth
 def get_user_analytics(name):
     """Get analytics for a specific user"""
-    user_data = session.get('user')
+    user_data = session_store.current_user()
     
     # Users can only access their own analytics unless they're admin
-    if user_data.get('role') != 'admin' and user_data.get('name') != name:
+    if user_data.get('role') != 'admin' and _reviewer_name(user_data) != name:
         return jsonify({'error': 'Access denied'}), 403
     
-    df = load_submissions_data()
-    if df.empty:
+    table = _get_reviewer_stats()
+    if table is None:
         return jsonify({'error': 'No data found'}), 404
     
-    # Filter by user name
-    user_df = df[df['Name'] == name]
-    
-    if user_df.empty:
+    # Looked up in the per-reviewer stats table (case-sensitive as per requirements)
+    row = table.lookup(name)
+    if row is None:
         return jsonify({'error': 'No data found for this user'}), 404
     
-    # Calculate user-specific statistics
-    total_submitted = len(user_df)
-    
-    accepted_count = len(user_df[user_df['Is this rejected (Slice / Miner)'] == 'Accepted']) if 'Is this rejected (Slice / Miner)' in user_df.columns else 0
-    rejected_count = len(user_df[user_df['Is this rejected (Slice / Miner)'] == 'Rejected']) if 'Is this rejected (Slice / Miner)' in user_df.columns else 0
-    
-    # Tasks reviewed by leader
-    leader_reviewed = len(user_df[user_df['Leader Name'].notna()]) if 'Leader Name' in user_df.columns else 0
-    
-    # Tasks changed by leader
-    changed_by_leader = len(user_df[user_df['Is this Changed (Slice / Miner)'].notna()]) if 'Is this Changed (Slice / Miner)' in user_df.columns else 0
-    
-    # Alignment with QC
-    aligned_column = 'Are The Qc And the reviewer allign on the same answer'
-    fully_aligned = 0
-    misaligned = 0
-    if aligned_column in user_df.columns:
-        aligned_data = user_df[aligned_column].value_counts()
-        fully_aligned = aligned_data.get('Yes', 0)
-        misaligned = aligned_data.get('No', 0)
-    
-    # Last submission date
-    last_submission = None
-    if 'Timestamp' in user_df.columns:
-        timestamps = pd.to_datetime(user_df['Timestamp'], errors='coerce')
-        if not timestamps.isna().all():
-            last_submission = timestamps.max().isoformat()
-    
-    # Reason for reviewer mistakes (for pie chart)
-    mistake_reasons = {}
-    mistake_column = 'In you opinion, What is the reason for reviewer mistake?'
-    if mistake_column in user_df.columns:
-        mistake_counts = user_df[mistake_column].value_counts()
-        mistake_reasons = mistake_counts.to_dict()
-    
-    return jsonify({
-        'total_submitted': total_submitted,
-        'accepted_count': accepted_count,
-        'rejected_count': rejected_count,
-        'leader_reviewed': leader_reviewed,
-        'changed_by_leader': changed_by_leader,
-        'fully_aligned': fully_aligned,
-        'misaligned': misaligned,
-        'last_submission': last_submission,
-        'mistake_reasons': mistake_reasons
-    })
+    return jsonify(row)
 
 @data_bp.route('/analytics/my', methods=['GET'])
 @require_auth
 def get_my_analytics():
     """Get analytics for the current authenticated user"""
-    user_data = session.get('user')
-    user_name = user_data.get('name')
+    user_data = session_store.current_user()
+    # Reviewer name the email was resolved to when the data was loaded
+    user_name = _reviewer_name(user_data)
     
     if not user_name:
         return jsonify({'error': 'User name not found'}), 400
     
     return get_user_analytics(user_name)
 
+@data_bp.route('/analytics/leaderboard', methods=['GET'])
+@require_admin
+def get_leaderboard():
+    """Get the top k reviewers by a metric (admin only)"""
+    table = _get_reviewer_stats()
+    if table is None:
+        return jsonify({'error': 'No data found'}), 404
+    
+    try:
+        result = reviewer_stats.query_leaderboard(table, request.args)
+    except reviewer_stats.LeaderboardError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify(result)
+
 @data_bp.route('/analytics/charts/rejection-by-task-type', methods=['GET'])
 @require_admin
 def get_rejection_by_task_type():
     """Get rejection rate by task type for charts (admin only)"""
-    df = load_submissions_data()
-    if df.empty:
+    summary = _get_aggregates()
+    if summary is None:
         return jsonify({'error': 'No data found'}), 404
     
-    if 'Task Type' not in df.columns or 'Is this rejected (Slice / Miner)' not in df.columns:
-        return jsonify({'error': 'Required columns not found'}), 404
-    
-    # Group by task type and calculate rejection rates
-    task_type_stats = df.groupby('Task Type')['Is this rejected (Slice / Miner)'].value_counts().unstack(fill_value=0)
-    
-    result = []
-    for task_type in task_type_stats.index:
-        accepted = task_type_stats.loc[task_type].get('Accepted', 0)
-        rejected = task_type_stats.loc[task_type].get('Rejected', 0)
-        total = accepted + rejected
-        rejection_rate = (rejected / total * 100) if total > 0 else 0
-        
-        result.append({
-            'task_type': task_type,
-            'accepted': int(accepted),
-            'rejected': int(rejected),
-            'total': int(total),
-            'rejection_rate': round(rejection_rate, 2)
-        })
+    # Rejection rates per task type, sorted by task type
+    result = sorted(summary.rejection_by_task_type(), key=lambda row: row['task_type'])
     
     return jsonify(result)
 
@@ -286,28 +252,26 @@ def get_rejection_by_task_type():
 @require_admin
 def get_submission_trend():
     """Get submission trend over time for line charts (admin only)"""
-    df = load_submissions_data()
-    if df.empty:
+    summary = _get_aggregates()
+    if summary is None:
         return jsonify({'error': 'No data found'}), 404
     
-    if 'Timestamp' not in df.columns:
-        return jsonify({'error': 'Timestamp column not found'}), 404
-    
-    # Convert timestamp to datetime
-    df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce')
-    df = df.dropna(subset=['Timestamp'])
-    
-    # Group by date and count submissions
-    df['Date'] = df['Timestamp'].dt.date
-    daily_counts = df.groupby('Date').size().reset_index(name='count')
+    # Daily counts from the precomputed aggregates
+    result = summary.daily_trend()
     
-    # Convert to list of dictionaries
-    result = []
-    for _, row in daily_counts.iterrows():
-        result.append({
-            'date': row['Date'].isoformat(),
-            'count': int(row['count'])
-        })
+    return jsonify(result)
+
+@data_bp.route('/analytics/trend', methods=['GET'])
+@require_admin
+def get_trend():
+    """Get submission counts per day/week/month, optionally by task type, status or reviewer (admin only)"""
+    try:
+        if sql_store.enabled():
+            result = sql_queries.query_trend(request.args)
+        else:
+            result = trends.query_trend(data_store.store.snapshot(), request.args)
+    except trends.TrendError as e:
+        return jsonify({'error': str(e)}), 400
     
     return jsonify(result)
 
@@ -0,0 +1,211 @@
+from collections import Counter
+import pandas as pd
+from src.services import data_store, schema
+
+STATUS_COLUMN = schema.STATUS
+CHANGED_COLUMN = schema.CHANGED
+ALIGNED_COLUMN = schema.ALIGNED
+MISTAKE_COLUMN = schema.MISTAKE
+LEADER_REVIEWED = 'Leader Reviewed'
+
+# Dimensions every submission is counted under, in key order
+DIMENSIONS = (schema.NAME, schema.TASK_TYPE, STATUS_COLUMN, CHANGED_COLUMN, ALIGNED_COLUMN, MISTAKE_COLUMN, LEADER_REVIEWED, 'Date')
+
+
+def _top(counter):
+    """Most frequent key (ties broken by the smallest key, like Series.mode), or None"""
+    if not counter:
+        return None
+    best = max(counter.values())
+    return min(key for key, count in counter.items() if count == best)
+
+
+def _later(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def count_frame(df):
+    """Count rows per combination of DIMENSIONS and find each reviewer's latest timestamp.
+
+    Returns (counts, last_submission) where counts maps a tuple of dimension values
+    (nulls as None) to a row count, and last_submission maps a reviewer name to a
+    Timestamp. Both merge by simple addition/max, which is what lets appended rows
+    be folded into existing aggregates.
+    """
+    # The schema guarantees these columns, with timestamps already parsed
+    timestamps = df[schema.TIMESTAMP]
+    dimensions = pd.DataFrame({
+        schema.NAME: df[schema.NAME],
+        schema.TASK_TYPE: df[schema.TASK_TYPE],
+        STATUS_COLUMN: df[STATUS_COLUMN],
+        CHANGED_COLUMN: df[CHANGED_COLUMN],
+        ALIGNED_COLUMN: df[ALIGNED_COLUMN],
+        MISTAKE_COLUMN: df[MISTAKE_COLUMN],
+        LEADER_REVIEWED: df[schema.LEADER_NAME].notna(),
+        'Date': timestamps.dt.date,
+    })
+
+    counts = Counter()
+    for key, count in dimensions.groupby(list(DIMENSIONS), dropna=False, sort=False).size().items():
+        counts[tuple(None if pd.isna(value) else value for value in key)] += int(count)
+
+    last_submission = timestamps.groupby(dimensions[schema.NAME]).max().dropna().to_dict()
+    return counts, last_submission
+
+
+class ReviewerStats:
+    """Counters over one reviewer's submissions"""
+
+    def __init__(self):
+        self.total = 0
+        self.status = Counter()
+        self.changed = Counter()
+        self.alignment = Counter()
+        self.mistakes = Counter()
+        self.leader_reviewed = 0
+        self.last_submission = None
+
+    @property
+    def changed_count(self):
+        """Rows with any value in the changed column"""
+        return self.total - self.changed[None]
+
+    def combine(self, other):
+        """Return the stats of both reviewers' submissions together"""
+        combined = ReviewerStats()
+        for stats in (self, other):
+            combined.total += stats.total
+            combined.status.update(stats.status)
+            combined.changed.update(stats.changed)
+            combined.alignment.update(stats.alignment)
+            combined.mistakes.update(stats.mistakes)
+            combined.leader_reviewed += stats.leader_reviewed
+            combined.last_submission = _later(combined.last_submission, stats.last_submission)
+        return combined
+
+
+class SubmissionAggregates:
+    """Counters over all submissions, computed from one groupby over the dimensions.
+
+    Every breakdown served by the analytics endpoints is a marginal of `counts`.
+    Because the form sheet only ever grows, reloads usually go through `extend`,
+    which counts just the appended rows and adds them to the previous counts.
+    """
+
+    def __init__(self, counts, last_submission, rows):
+        self.counts = counts
+        self.last_submission = last_submission
+        self.rows = rows
+        self.total = sum(counts.values())
+
+        self.status = Counter()
+        self.changed = Counter()
+        self.alignment = Counter()
+        self.mistakes = Counter()
+        self.daily = Counter()
+        self.by_task_type = {}
+        self.reviewers = {}
+        for key, count in counts.items():
+            name, task_type, status, changed, aligned, mistake, leader_reviewed, date = key
+            self.status[status] += count
+            self.changed[changed] += count
+            self.alignment[aligned] += count
+            if mistake is not None:
+                self.mistakes[mistake] += count
+            if date is not None:
+                self.daily[date] += count
+            if task_type is not None:
+                self.by_task_type.setdefault(task_type, Counter())[status] += count
+            if name is not None:
+                stats = self.reviewers.get(name)
+                if stats is None:
+                    stats = self.reviewers[name] = ReviewerStats()
+                stats.total += count
+                stats.status[status] += count
+                stats.changed[changed] += count
+                stats.alignment[aligned] += count
+                if mistake is not None:
+                    stats.mistakes[mistake] += count
+                if leader_reviewed:
+                    stats.leader_reviewed += count
+
+        for name, timestamp in last_submission.items():
+            if name in self.reviewers:
+                self.reviewers[name].last_submission = timestamp
+
+    @classmethod
+    def build(cls, snapshot):
+        df = snapshot.submissions
+        counts, last_submission = count_frame(df)
+        return cls(counts, last_submission, len(df))
+
+    @classmethod
+    def extend(cls, previous, snapshot, start):
+        """Fold the rows appended at positions >= start into the previous aggregates"""
+        if previous.rows != start:
+            return cls.build(snapshot)
+
+        df = snapshot.submissions
+        appended_counts, appended_last = count_frame(df.iloc[start:])
+        counts = Counter(previous.counts)
+        counts.update(appended_counts)
+        last_submission = dict(previous.last_submission)
+        for name, timestamp in appended_last.items():
+            last_submission[name] = _later(last_submission.get(name), timestamp)
+        return cls(counts, last_submission, len(df))
+
+    @property
+    def unique_members(self):
+        return len(self.reviewers)
+
+    @property
+    def changed_count(self):
+        """Rows with any value in the changed column"""
+        return self.total - self.changed[None]
+
+    @property
+    def most_common_mistake(self):
+        return _top(self.mistakes)
+
+    def reviewer(self, *names):
+        """Combined stats for the given reviewer names, or None if none of them submitted"""
+        found = [self.reviewers[name] for name in names if name in self.reviewers]
+        if not found:
+            return None
+        stats = ReviewerStats()
+        for other in found:
+            stats = stats.combine(other)
+        return stats
+
+    def rejection_by_task_type(self):
+        """Accepted/rejected counts per task type, in order of first appearance"""
+        result = []
+        for task_type, statuses in self.by_task_type.items():
+            accepted = statuses['Accepted']
+            rejected = statuses['Rejected']
+            total = accepted + rejected
+            result.append({
+                'task_type': task_type,
+                'accepted': accepted,
+                'rejected': rejected,
+                'total': total,
+                'rejection_rate': round(rejected / total * 100, 2) if total > 0 else 0
+            })
+        return result
+
+    def daily_trend(self):
+        """Submissions per calendar day, oldest first"""
+        return [{'date': date.isoformat(), 'count': count} for date, count in sorted(self.daily.items())]
+
+
+data_store.register_derived('aggregates', SubmissionAggregates.build, SubmissionAggregates.extend)
+
+
+def get_aggregates(snapshot=None):
+    """Aggregates for the given (or current) snapshot"""
+    snapshot = snapshot or data_store.store.snapshot()
+    return snapshot.derived('aggregates')
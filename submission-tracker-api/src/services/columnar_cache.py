@@ -0,0 +1,219 @@
+"""Columnar on-disk cache of the workbook sheets.
+
+Both sheets are written as uncompressed Arrow IPC (Feather v2) files named after
+the SHA-256 of the workbook, and memory-mapped on later loads instead of parsing
+Excel. Refresh it ahead of time (e.g. in a release step) with:
+
+    python -m src.services.columnar_cache
+
+The cache is also how gunicorn workers share one copy of the data: the process
+that parses a workbook version publishes it in a manifest with an increasing
+generation number, and every other process attaches to the same files. Mapped
+pages live in the OS page cache, so N workers don't hold N copies. Workers
+watch the generation (one stat of the manifest per access), so they pick up a
+version published elsewhere, e.g. by the refresh command above, without
+noticing the workbook change themselves.
+"""
+import hashlib
+import json
+import os
+import sys
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no inter-process lock on Windows
+    fcntl = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pragma: no cover - the cache is an optimisation only
+    pa = None
+    feather = None
+
+CACHE_DIR = os.environ.get(
+    'DATA_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'cache')
+)
+
+# Bumped whenever the loader's output changes (columns, dtypes), so entries
+# written by an older loader are never attached to
+CACHE_FORMAT = 4
+
+SHEET_FILES = {
+    'submissions': f'v{CACHE_FORMAT}.submissions.arrow',
+    'users': f'v{CACHE_FORMAT}.users.arrow',
+}
+
+# Which entry holds the data for which workbook version, and its generation
+MANIFEST_FILE = 'current.json'
+LOCK_FILE = '.lock'
+
+
+def is_available():
+    """Whether pyarrow is installed and the cache can be used"""
+    return feather is not None
+
+
+def workbook_hash(path):
+    """Return the SHA-256 hex digest of the workbook contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entry_path(key, sheet):
+    return os.path.join(CACHE_DIR, f'{key}.{SHEET_FILES[sheet]}')
+
+
+def load(key):
+    """Load both sheets for a workbook hash, or return None on a cache miss"""
+    if not is_available():
+        return None
+
+    paths = [_entry_path(key, sheet) for sheet in SHEET_FILES]
+    if not all(os.path.exists(p) for p in paths):
+        return None
+
+    try:
+        return tuple(feather.read_table(p, memory_map=True).to_pandas() for p in paths)
+    except Exception as e:
+        print(f"Error reading data cache: {e}")
+        return None
+
+
+def store(key, submissions_df, users_df):
+    """Write both sheets for a workbook hash and drop entries for older workbooks"""
+    if not is_available():
+        return False
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        for sheet, df in (('submissions', submissions_df), ('users', users_df)):
+            path = _entry_path(key, sheet)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            # Uncompressed so readers can memory-map the file
+            feather.write_feather(df, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, path)
+    except Exception as e:
+        print(f"Error writing data cache: {e}")
+        return False
+
+    _prune(keep=key)
+    return True
+
+
+def _prune(keep):
+    """Remove cache entries that don't belong to the given workbook hash"""
+    # Processes still mapping a removed file keep reading it until they reload
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith('.arrow') and not name.startswith(f'{keep}.v{CACHE_FORMAT}.'):
+            try:
+                os.remove(os.path.join(CACHE_DIR, name))
+            except OSError:
+                pass
+
+
+def published():
+    """The current manifest {'generation', 'key', 'format', 'workbook_version'}, or None"""
+    try:
+        with open(os.path.join(CACHE_DIR, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+_manifest_cache = {'stat': None, 'manifest': None}
+
+
+def current_manifest():
+    """The published manifest like published(), re-read only when the file was replaced"""
+    if not is_available():
+        return None
+    try:
+        stat = os.stat(os.path.join(CACHE_DIR, MANIFEST_FILE))
+    except OSError:
+        return None
+    key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    if _manifest_cache['stat'] != key:
+        _manifest_cache['manifest'] = published()
+        _manifest_cache['stat'] = key
+    return _manifest_cache['manifest']
+
+
+def publish(key, workbook_version):
+    """Point the manifest at the entry for `key` under the next generation number"""
+    manifest = published() or {}
+    manifest = {
+        'generation': manifest.get('generation', 0) + 1,
+        'key': key,
+        'format': CACHE_FORMAT,
+        'workbook_version': list(workbook_version) if workbook_version else None,
+    }
+    path = os.path.join(CACHE_DIR, MANIFEST_FILE)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error publishing data cache: {e}")
+        return None
+    return manifest['generation']
+
+
+def attach(manifest):
+    """Load the entry a manifest points at as (workbook_version, sheets), or None"""
+    if not manifest or manifest.get('format') != CACHE_FORMAT or not manifest.get('workbook_version'):
+        return None
+    sheets = load(manifest['key'])
+    return (tuple(manifest['workbook_version']), sheets) if sheets is not None else None
+
+
+def load_published(workbook_version):
+    """Attach to the published entry if it was built from this workbook version"""
+    manifest = published()
+    if not manifest or workbook_version is None or manifest.get('workbook_version') != list(workbook_version):
+        return None
+    attached = attach(manifest)
+    return attached[1] if attached is not None else None
+
+
+@contextmanager
+def publish_lock():
+    """Inter-process lock held while a workbook version is parsed and published"""
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, LOCK_FILE), 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def refresh(path):
+    """Parse the workbook and (re)build its cache entry"""
+    from src.services.data_store import file_version, read_workbook
+
+    with publish_lock():
+        key = workbook_hash(path)
+        submissions_df, users_df = read_workbook(path)
+        if store(key, submissions_df, users_df):
+            publish(key, file_version(path))
+    return key
+
+
+if __name__ == '__main__':
+    from src.services.data_store import EXCEL_FILE_PATH
+
+    if not is_available():
+        sys.exit('pyarrow is not installed; the data cache is disabled')
+
+    workbook = sys.argv[1] if len(sys.argv) > 1 else EXCEL_FILE_PATH
+    print(f"Cached {workbook} as {refresh(workbook)}")
@@ -0,0 +1,108 @@
+from src.models.submission import SUBMISSION_COLUMNS
+from src.services import aggregates, reviewer_index, reviewer_stats, sql_queries, sql_store, submission_query, user_directory
+
+
+class UnknownFieldError(ValueError):
+    """Raised when `fields=` names a panel the dashboard doesn't have"""
+
+
+# With DATA_BACKEND=sqlite the panels read the database and `snapshot` is None
+
+def _aggregates(snapshot):
+    if sql_store.enabled():
+        return sql_queries.get_aggregates()
+    return aggregates.get_aggregates(snapshot)
+
+
+def _reviewer_stats(snapshot):
+    if sql_store.enabled():
+        return sql_queries.get_reviewer_stats()
+    return reviewer_stats.get_table(snapshot)
+
+
+def reviewer_name(snapshot, user):
+    """Submission `Name` of a signed-in user, or None if their email didn't resolve to one"""
+    if sql_store.enabled():
+        return sql_queries.reviewer_name(user)
+    return user_directory.reviewer_name(snapshot, user)
+
+
+def admin_summary(snapshot):
+    """Headline counters for the admin dashboard"""
+    summary = _aggregates(snapshot)
+    return {
+        'unique_members': summary.unique_members,
+        'total_submissions': summary.total,
+        'accepted_count': summary.status['Accepted'],
+        'rejected_count': summary.status['Rejected'],
+        'changed_count': summary.changed['Yes'],
+        'most_common_mistake': summary.most_common_mistake or 'No data',
+        'reviewer_with_most_rejected': _reviewer_stats(snapshot).leader('rejected') or 'No data'
+    }
+
+
+def rejection_by_task_type(snapshot):
+    """Accepted/rejected counts per task type for the bar chart"""
+    return [
+        {'task_type': row['task_type'], 'accepted': row['accepted'], 'rejected': row['rejected']}
+        for row in _aggregates(snapshot).rejection_by_task_type()
+    ]
+
+
+def submission_trend(snapshot):
+    """Daily submission counts for the line chart"""
+    return _aggregates(snapshot).daily_trend()
+
+
+def submissions_page(snapshot, args):
+    """First (or requested) page of submissions with its total"""
+    if sql_store.enabled():
+        page_df, total, page, page_size = sql_queries.query_submissions(args)
+    else:
+        page_df, total, page, page_size = submission_query.query_submissions(snapshot, args)
+    return {'items': page_df, 'total': total, 'page': page, 'page_size': page_size}
+
+
+def users(snapshot):
+    if sql_store.enabled():
+        return sql_queries.users()
+    return snapshot.users
+
+
+def my_analytics(snapshot, user):
+    """Counters for the reviewer the signed-in user's email resolved to"""
+    return _reviewer_stats(snapshot).dashboard_row(reviewer_name(snapshot, user))
+
+
+def my_submissions(snapshot, user):
+    """Submissions of the reviewer the signed-in user's email resolved to"""
+    name = reviewer_name(snapshot, user)
+    if sql_store.enabled():
+        # Only the reviewer's rows are read, through the name index
+        return sql_queries.submissions_for_name(name) if name is not None else sql_queries.to_frame([], SUBMISSION_COLUMNS)
+    if name is None:
+        return snapshot.submissions.iloc[:0]
+    return reviewer_index.submissions_for_name(snapshot, name)
+
+
+ADMIN_PANELS = {
+    'summary': lambda snapshot, user, args: admin_summary(snapshot),
+    'submissions': lambda snapshot, user, args: submissions_page(snapshot, args),
+    'users': lambda snapshot, user, args: users(snapshot),
+    'rejection_by_task_type': lambda snapshot, user, args: rejection_by_task_type(snapshot),
+    'submission_trend': lambda snapshot, user, args: submission_trend(snapshot),
+}
+
+USER_PANELS = {
+    'analytics': lambda snapshot, user, args: my_analytics(snapshot, user),
+    'submissions': lambda snapshot, user, args: my_submissions(snapshot, user),
+}
+
+
+def build(panels, snapshot, user, args):
+    """Compute the panels selected by `fields=` (all by default) from a single snapshot"""
+    fields = [field.strip() for field in args.get('fields', '').split(',') if field.strip()] or list(panels)
+    unknown = [field for field in fields if field not in panels]
+    if unknown:
+        raise UnknownFieldError(f"Unknown dashboard fields: {', '.join(unknown)}")
+    return {field: panels[field](snapshot, user, args) for field in fields}
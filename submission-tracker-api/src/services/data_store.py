@@ -0,0 +1,285 @@
+import os
+import threading
+import time
+import numpy as np
+import pandas as pd
+from src.services import columnar_cache, ingest, metrics, schema
+
+# Path to the Excel file (WORKBOOK_PATH points the service at another copy, e.g. a benchmark workbook)
+EXCEL_FILE_PATH = os.environ.get(
+    'WORKBOOK_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'NEW(new)CounterTeam.xlsx')
+)
+
+SUBMISSIONS_SHEET = ingest.SUBMISSIONS_SHEET
+USERS_SHEET = ingest.USERS_SHEET
+
+
+def file_version(path):
+    """Return an (mtime, size) pair identifying the current state of a file"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_workbook(path):
+    """Parse both sheets of the workbook (schema columns only, normalized; see ingest)"""
+    return ingest.read_workbook(path)
+
+
+def load_workbook(path, version=None):
+    """Load both sheets, preferring the columnar cache over parsing Excel.
+
+    When another process (the gunicorn master or a sibling worker) already
+    published this workbook version, its memory-mapped files are attached
+    directly. Otherwise one process at a time parses and publishes, and the
+    rest attach to its result once they get the lock.
+    """
+    with metrics.timed('load'):
+        start = time.perf_counter()
+        sheets, source = _load_sheets(path, version)
+        elapsed = time.perf_counter() - start
+        metrics.DATA_LOAD_SECONDS.observe(elapsed, source)
+    metrics.cache_result('data', source != 'excel')
+    print(f"Loaded {len(sheets[0])} submissions and {len(sheets[1])} users in {elapsed:.2f}s (source: {source})")
+    return sheets
+
+
+def _load_sheets(path, version):
+    """Return ((submissions_df, users_df), source) where source is 'published', 'cache' or 'excel'"""
+    if not columnar_cache.is_available():
+        return read_workbook(path), 'excel'
+
+    cached = columnar_cache.load_published(version)
+    if cached is not None:
+        return cached, 'published'
+
+    with columnar_cache.publish_lock():
+        # Published while we were waiting for the lock
+        cached = columnar_cache.load_published(version)
+        if cached is not None:
+            return cached, 'published'
+
+        key = columnar_cache.workbook_hash(path)
+        cached = columnar_cache.load(key)
+        source = 'cache'
+        if cached is None:
+            source = 'excel'
+            submissions_df, users_df = read_workbook(path)
+            if not columnar_cache.store(key, submissions_df, users_df):
+                return (submissions_df, users_df), source
+            # Serve the mapped copy so this process shares pages with the others
+            cached = columnar_cache.load(key) or (submissions_df, users_df)
+        columnar_cache.publish(key, version)
+        return cached, source
+
+
+def freeze_frame(df):
+    """Return `df` with its NumPy-backed columns and categorical codes made read-only.
+
+    In-place writes to those columns (`.loc[...] = `, `.values[...] = `) raise
+    instead of racing with other threads; they are copied once if they were
+    writeable, and memory-mapped columns stay mapped. Arrow-backed columns have
+    immutable buffers but pandas can still swap them, so snapshot frames must
+    never be assigned into. Anything derived from a frame (filters, take,
+    column arithmetic) is a new object under pandas' copy-on-write, so readers
+    never need to copy the snapshot.
+    """
+    columns = {}
+    for name, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy(copy=True)
+            codes.flags.writeable = False
+            columns[name] = pd.Categorical.from_codes(codes, dtype=series.dtype, validate=False)
+        elif isinstance(series.dtype, np.dtype):
+            values = series.to_numpy(copy=False)
+            if values.flags.writeable:
+                values = values.copy()
+                values.flags.writeable = False
+            columns[name] = values
+        else:
+            columns[name] = series.array
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+# Structures derived from a snapshot (indexes, aggregates, ...) by name. Each
+# entry is (build, extend): build(snapshot) computes the structure from scratch,
+# and the optional extend(previous, snapshot, start) folds the rows appended at
+# positions >= start into the structure built for the previous snapshot.
+_derivations = {}
+
+
+def register_derived(name, build, extend=None):
+    """Register a structure to compute for every loaded snapshot"""
+    _derivations[name] = (build, extend)
+
+
+def _same_values(left, right):
+    """Compare two equally shaped frames cell by cell, ignoring dtype differences"""
+    for column in left.columns:
+        a, b = left[column], right[column]
+        if isinstance(a.dtype, pd.CategoricalDtype) or isinstance(b.dtype, pd.CategoricalDtype):
+            # Categoricals only compare equal-to-equal categories; compare the labels
+            a, b = a.astype(object), b.astype(object)
+        if not ((a == b) | (a.isna() & b.isna())).all():
+            return False
+    return True
+
+
+def appended_from(previous, snapshot):
+    """Return the previous submission count if the new snapshot only appended rows, else None.
+
+    The form sheet is append-only, so a reload normally adds rows at the end. The
+    row count and the last timestamp act as a watermark that rejects most edits
+    cheaply; the earlier rows are then compared in full so that any in-place
+    change falls back to a full rebuild.
+    """
+    old_df, new_df = previous.submissions, snapshot.submissions
+    rows = len(old_df)
+    if old_df.empty or len(new_df) < rows or not old_df.columns.equals(new_df.columns):
+        return None
+    if schema.TIMESTAMP in old_df.columns:
+        last_old, last_new = old_df[schema.TIMESTAMP].iloc[-1], new_df[schema.TIMESTAMP].iloc[rows - 1]
+        if not (last_old == last_new or (pd.isna(last_old) and pd.isna(last_new))):
+            return None
+    if not previous.users.columns.equals(snapshot.users.columns) or len(previous.users) != len(snapshot.users):
+        return None
+    if not _same_values(previous.users, snapshot.users):
+        return None
+    if not _same_values(old_df, new_df.iloc[:rows]):
+        return None
+    return rows
+
+
+class DataSnapshot:
+    """Both sheets as they were loaded from one version of the workbook.
+
+    A snapshot is immutable once built: the frames are frozen (see freeze_frame)
+    and shared by every thread without copying, and derived structures are
+    computed once. Reloads create a new snapshot instead of changing this one.
+    """
+
+    def __init__(self, submissions, users, version):
+        self.submissions = freeze_frame(submissions)
+        self.users = freeze_frame(users)
+        self.version = version
+        self._derived = {}
+        # Reentrant: a builder may itself use other derived structures
+        self._lock = threading.RLock()
+
+    def derived(self, name):
+        """Return a registered derived structure, computing it on first use"""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+
+        with self._lock:
+            if name not in self._derived:
+                build, _ = _derivations[name]
+                with metrics.timed(name, metrics.DERIVED_BUILD_SECONDS, name, 'build'):
+                    self._derived[name] = build(self)
+            return self._derived[name]
+
+    def derive_from(self, previous):
+        """Compute every registered structure, extending the previous snapshot's where possible"""
+        start = appended_from(previous, self)
+        for name, (build, extend) in list(_derivations.items()):
+            try:
+                if extend is not None and start is not None and name in previous._derived:
+                    with metrics.timed(name, metrics.DERIVED_BUILD_SECONDS, name, 'extend'):
+                        self._derived[name] = extend(previous._derived[name], self, start)
+                else:
+                    with metrics.timed(name, metrics.DERIVED_BUILD_SECONDS, name, 'build'):
+                        self._derived[name] = build(self)
+            except Exception as e:
+                # Leave it to be built (and fail with the request) on first use
+                print(f"Error building {name}: {e}")
+
+
+class DataStore:
+    """Process-wide holder of the parsed workbook.
+
+    The workbook is parsed once and kept in memory. Every access compares the
+    generation of the published columnar cache (see columnar_cache) with the
+    one last seen and attaches to a version another process published; it then
+    compares the file's mtime and size with the loaded version and reloads
+    only when they differ. A reload builds a complete new snapshot before
+    swapping it in, so readers always see either the old or the new data,
+    never a mix.
+    """
+
+    def __init__(self, path=EXCEL_FILE_PATH):
+        self.path = path
+        self._snapshot = DataSnapshot(schema.empty_frame(schema.SUBMISSION_FIELDS), schema.empty_frame(schema.USER_FIELDS), None)
+        self._failed_version = None
+        # Generation of the published manifest when the snapshot was last checked against it
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _swap(self, snapshot, current):
+        snapshot.derive_from(current)
+        self._snapshot = snapshot
+        self._failed_version = None
+        return snapshot
+
+    def _attach_published(self, manifest, current, version):
+        """Swap in the version another process published, unless it is already loaded or stale"""
+        published = manifest.get('workbook_version') if manifest else None
+        if version is not None and published != list(version):
+            # Built from another state of the workbook we can see; it gets (re)loaded below
+            return current
+        attached = columnar_cache.attach(manifest)
+        if attached is None or attached[0] == current.version:
+            return current
+        version, (submissions_df, users_df) = attached
+        print(f"Attached published data generation {manifest['generation']} ({len(submissions_df)} submissions)")
+        return self._swap(DataSnapshot(submissions_df, users_df, version), current)
+
+    def snapshot(self):
+        """Return the current snapshot, reloading it if a new version was published or the workbook changed"""
+        manifest = columnar_cache.current_manifest()
+        generation = manifest['generation'] if manifest else None
+        version = file_version(self.path)
+        current = self._snapshot
+        if generation == self._generation and (version is None or version == current.version or version == self._failed_version):
+            return current
+
+        with self._lock:
+            # Another thread may have reloaded while we were waiting
+            current = self._snapshot
+            if generation != self._generation:
+                current = self._attach_published(manifest, current, version)
+                self._generation = generation
+            if version is None or version == current.version or version == self._failed_version:
+                return current
+
+            try:
+                submissions_df, users_df = load_workbook(self.path, version)
+            except Exception as e:
+                print(f"Error loading data: {e}")
+                self._failed_version = version
+                return current
+
+            snapshot = self._swap(DataSnapshot(submissions_df, users_df, version), current)
+            # Loading attached to or published this version under the manifest's latest generation
+            manifest = columnar_cache.current_manifest()
+            self._generation = manifest['generation'] if manifest else None
+            return snapshot
+
+
+store = DataStore()
+
+
+def get_submissions():
+    """Return the current submissions DataFrame (shared, do not modify)"""
+    return store.snapshot().submissions
+
+
+def get_users():
+    """Return the current users DataFrame (shared, do not modify)"""
+    return store.snapshot().users
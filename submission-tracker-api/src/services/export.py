@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from flask import Response
+from src.models.submission import SUBMISSION_COLUMNS
+from src.services import sql_queries, submission_query, user_directory
+
+# Response MIME type for each export format
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows serialized per chunk; memory use is bounded by this, not by the sheet size
+CHUNK_ROWS = 2000
+
+
+class ExportError(ValueError):
+    """Raised for an unsupported export format"""
+
+
+def export_positions(snapshot, user, args):
+    """Positions of the rows `user` may export that match the list-view filters, in order.
+
+    Admins export every matching row; other users only their own reviewer's rows.
+    """
+    positions = submission_query.select_positions(snapshot, args)
+    if user.get('role') == 'admin':
+        return positions
+    name = user_directory.reviewer_name(snapshot, user)
+    if name is None:
+        return positions[:0]
+    own = snapshot.derived('reviewer_index').positions(name)
+    return positions[np.isin(positions, own)]
+
+
+def _chunks(frames, columns, fmt):
+    if fmt == 'csv':
+        yield pd.DataFrame(columns=list(columns)).to_csv(index=False).encode('utf-8')
+    for chunk in frames:
+        if fmt == 'csv':
+            yield chunk.to_csv(index=False, header=False).encode('utf-8')
+        else:
+            lines = chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+            yield (lines if lines.endswith('\n') else lines + '\n').encode('utf-8')
+
+
+def parse_format(args):
+    """Export format from request args, validated"""
+    fmt = args.get('format', 'csv').strip().lower()
+    if fmt not in FORMATS:
+        raise ExportError(f"format must be one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+def stream_response(frames, columns, total, fmt):
+    """Streamed download of the rows in an iterable of DataFrames with the given columns"""
+    response = Response(_chunks(frames, columns, fmt), mimetype=FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename=submissions.{fmt}'
+    response.headers['X-Total-Count'] = str(total)
+    return response
+
+
+def export_response(snapshot, user, args):
+    """Streamed CSV or NDJSON download of the submissions selected by request args"""
+    fmt = parse_format(args)
+    positions = export_positions(snapshot, user, args)
+
+    # The generator keeps this snapshot's frame, so a reload mid-download can't mix versions
+    df = snapshot.submissions
+    frames = (df.take(positions[start:start + CHUNK_ROWS]) for start in range(0, len(positions), CHUNK_ROWS))
+    return stream_response(frames, df.columns, len(positions), fmt)
+
+
+def export_sql_response(user, args):
+    """Streamed download like export_response, read from the database in chunks (DATA_BACKEND=sqlite)"""
+    fmt = parse_format(args)
+    statement, total = sql_queries.export_query(user, args)
+    return stream_response(sql_queries.stream_frames(statement, CHUNK_ROWS), list(SUBMISSION_COLUMNS), total, fmt)
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from flask import current_app, g, request
+from src.services import data_store, metrics, session_store, sql_store
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Only GETs under these prefixes are derived purely from the workbook
+CACHEABLE_PREFIX = '/api/'
+EXCLUDED_PREFIXES = ('/api/auth/', '/api/metrics')
+
+# Bodies smaller than this aren't worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Compressed bodies are kept per (ETag, encoding) up to this many bytes in total
+COMPRESSED_CACHE_BYTES = 64 * 1024 * 1024
+
+# Responses depend on the signed-in user (session cookie or bearer token), so
+# only the user's own client may store them, and must revalidate before reuse
+VARY = ('Cookie', 'Authorization', 'Accept-Encoding')
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _is_cacheable():
+    path = request.path
+    return (
+        request.method == 'GET'
+        and path.startswith(CACHEABLE_PREFIX)
+        and not path.startswith(EXCLUDED_PREFIXES)
+    )
+
+
+def _data_version():
+    """Workbook version the served data came from, in either storage mode"""
+    if sql_store.enabled():
+        return sql_store.version()
+    return data_store.store.snapshot().version
+
+
+def current_etag():
+    """ETag for this request: workbook version + full path + the signed-in user"""
+    version = _data_version()
+    user = session_store.current_user() or {}
+    key = '|'.join([repr(version), request.full_path, str(user.get('email')), str(user.get('role'))])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+def _last_modified():
+    version = _data_version()
+    if version is None:
+        return None
+    return datetime.fromtimestamp(version[0] / 1e9, tz=timezone.utc)
+
+
+def _mark_private(response):
+    response.vary.update(VARY)
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
+
+
+def check_not_modified():
+    """before_request hook: answer a matching If-None-Match with 304 before the view runs"""
+    if not _is_cacheable():
+        return None
+
+    # Remember the ETag so the response is tagged with the version it was computed from
+    g.etag = etag = current_etag()
+    matched = bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+    metrics.cache_result('etag', matched)
+    if matched:
+        response = current_app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        return _mark_private(response)
+    return None
+
+
+class _CompressedCache:
+    """Byte-bounded LRU of compressed bodies keyed by (ETag, encoding)"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+_compressed = _CompressedCache(COMPRESSED_CACHE_BYTES)
+
+
+def _choose_encoding():
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+
+def _compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=5)
+
+
+def finalize_response(response):
+    """after_request hook: tag successful GETs with ETag/Last-Modified and compress large JSON"""
+    if not _is_cacheable() or response.status_code != 200:
+        return response
+    if response.is_streamed:
+        # Per-user downloads (exports) are never stored by shared caches either
+        return _mark_private(response)
+    if response.headers.get('ETag') or response.headers.get('Content-Encoding'):
+        # Already handled (e.g. by the app-level hook when a blueprint is mounted)
+        return response
+
+    etag = g.get('etag') or current_etag()
+    response.set_etag(etag, weak=True)
+    last_modified = _last_modified()
+    if last_modified is not None:
+        response.last_modified = last_modified
+    _mark_private(response)
+
+    if response.mimetype != 'application/json':
+        return response
+    encoding = _choose_encoding()
+    body = response.get_data()
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return response
+
+    compressed = _compressed.get((etag, encoding))
+    metrics.cache_result('compressed', compressed is not None)
+    if compressed is None:
+        with metrics.timed('compress'):
+            compressed = _compress(body, encoding)
+        _compressed.put((etag, encoding), compressed)
+    response.set_data(compressed)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def init_app(app):
+    """Register the conditional-GET and compression hooks for every route of the app"""
+    app.before_request(check_not_modified)
+    app.after_request(finalize_response)
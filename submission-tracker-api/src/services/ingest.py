@@ -0,0 +1,99 @@
+"""Parsing the workbook's two sheets into normalized frames.
+
+Only columns that map to a schema field are read (usecols), each sheet is
+normalized (text cleanup, canonical headers, datetime/category dtypes) by the
+task that parsed it, and the fastest available engine is used: calamine
+(python-calamine, a Rust reader) when installed, otherwise openpyxl. With
+calamine the sheets are parsed concurrently, each from its own handle; with
+openpyxl opening the file dominates (it parses every shared string), so one
+handle is shared and the sheets are read in turn. EXCEL_ENGINE forces an
+engine, and a calamine failure falls back to openpyxl.
+"""
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from src.services import schema
+
+SUBMISSIONS_SHEET = 'Form Responses 1'
+USERS_SHEET = 'Users'
+
+# Sheet name -> (fields, label used in schema warnings)
+SHEETS = {
+    SUBMISSIONS_SHEET: (schema.SUBMISSION_FIELDS, 'submissions'),
+    USERS_SHEET: (schema.USER_FIELDS, 'users'),
+}
+
+ENGINES = ('calamine', 'openpyxl')
+ENGINE = os.environ.get('EXCEL_ENGINE', '').strip().lower() or None
+
+# Engines whose open is cheap enough to give every sheet its own handle
+CONCURRENT_ENGINES = ('calamine',)
+
+try:
+    import python_calamine
+except ImportError:  # calamine is optional, openpyxl is always available
+    python_calamine = None
+
+
+def default_engine():
+    """EXCEL_ENGINE if set, else calamine when installed, else openpyxl"""
+    if ENGINE:
+        if ENGINE not in ENGINES:
+            print(f"Error: unknown EXCEL_ENGINE {ENGINE!r}, using openpyxl")
+            return 'openpyxl'
+        return ENGINE
+    return 'calamine' if python_calamine is not None else 'openpyxl'
+
+
+def stringify_mixed_columns(df):
+    """Turn free-text columns holding stray numbers into plain string columns"""
+    for column in df.columns[df.dtypes == object]:
+        values = df[column]
+        mask = values.notna()
+        df[column] = values.where(~mask, values[mask].astype(str))
+    return df
+
+
+def normalize_sheet(df, sheet):
+    """Clean up and normalize a raw frame of `sheet` (see schema.normalize)"""
+    fields, label = SHEETS[sheet]
+    return schema.normalize(stringify_mixed_columns(df), fields, label)
+
+
+def parse_sheet(source, sheet, engine=None):
+    """Read the schema's columns of one sheet and normalize them.
+
+    `source` is a path or an open pd.ExcelFile.
+    """
+    fields, _ = SHEETS[sheet]
+    if isinstance(source, pd.ExcelFile):
+        df = source.parse(sheet, usecols=schema.header_matcher(fields))
+    else:
+        df = pd.read_excel(source, sheet_name=sheet, engine=engine, usecols=schema.header_matcher(fields))
+    return normalize_sheet(df, sheet)
+
+
+def _read(path, engine):
+    if engine in CONCURRENT_ENGINES:
+        with ThreadPoolExecutor(max_workers=len(SHEETS)) as pool:
+            futures = [pool.submit(parse_sheet, path, sheet, engine) for sheet in SHEETS]
+            return tuple(future.result() for future in futures)
+    with pd.ExcelFile(path, engine=engine) as excel:
+        return tuple(parse_sheet(excel, sheet) for sheet in SHEETS)
+
+
+def read_workbook(path, engine=None):
+    """Return (submissions_df, users_df) parsed from the workbook at `path`"""
+    engine = engine or default_engine()
+    start = time.perf_counter()
+    try:
+        sheets = _read(path, engine)
+    except Exception as e:
+        if engine == 'openpyxl':
+            raise
+        print(f"Error reading workbook with {engine}, falling back to openpyxl: {e}")
+        engine = 'openpyxl'
+        sheets = _read(path, engine)
+    print(f"Parsed {os.path.basename(path)} with {engine} in {time.perf_counter() - start:.2f}s")
+    return sheets
@@ -0,0 +1,230 @@
+"""Request and hot-path instrumentation, exposed in the Prometheus text format.
+
+Metrics are kept per process; with several gunicorn workers each scrape sees
+the worker that answered it, so scrape every worker or sum by `pid`.
+
+Optional behaviour is switched on by environment variables:
+
+    SERVER_TIMING=1             add a Server-Timing header to every API response
+    PROFILE_SAMPLE_RATE=0.01    profile this fraction of requests with cProfile
+    PROFILE_SLOW_MS=500         ...and report the profiles of those slower than this
+    PROFILE_DIR=/tmp/profiles   ...as .prof files here (printed to stdout otherwise)
+    METRICS_TOKEN=secret        let scrapers read /api/metrics with `Authorization: Bearer secret`
+    METRICS_PUBLIC=1            let anyone read /api/metrics (otherwise an admin session or the token)
+"""
+import cProfile
+import hmac
+import io
+import os
+import pstats
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import g, has_request_context, request
+
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '').lower() in ('1', 'true', 'yes')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SLOW_MS = float(os.environ.get('PROFILE_SLOW_MS', 500))
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+METRICS_PUBLIC = os.environ.get('METRICS_PUBLIC', '').lower() in ('1', 'true', 'yes')
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+# cProfile can only profile one request (thread) at a time
+_profile_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _label_text(names, values):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonic counter per label combination"""
+
+    kind = 'counter'
+
+    def __init__(self, name, help_text, labels=()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, label_values, value) for label_values, value in self._values.items()]
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label combination"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = labels
+        self.buckets = buckets
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [[0] * len(self.buckets), 0, 0.0]
+            counts = entry[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            entry[1] += 1
+            entry[2] += value
+
+    def samples(self):
+        result = []
+        with self._lock:
+            for label_values, (counts, count, total) in self._values.items():
+                for bound, bucket_count in zip(self.buckets, counts):
+                    result.append((f'{self.name}_bucket', label_values + (('le', f'{bound:g}'),), bucket_count))
+                result.append((f'{self.name}_bucket', label_values + (('le', '+Inf'),), count))
+                result.append((f'{self.name}_count', label_values, count))
+                result.append((f'{self.name}_sum', label_values, total))
+        return result
+
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', 'Request latency by endpoint', ('endpoint', 'method', 'status'))
+RESPONSE_BYTES = Histogram('http_response_size_bytes', 'Response body size by endpoint', ('endpoint',), SIZE_BUCKETS)
+DATA_LOAD_SECONDS = Histogram('data_load_duration_seconds', 'Time to load the workbook by source', ('source',))
+DERIVED_BUILD_SECONDS = Histogram('derived_build_duration_seconds', 'Time to build or extend a derived structure', ('name', 'mode'))
+CACHE_REQUESTS = Counter('cache_requests_total', 'Cache lookups by cache and result', ('cache', 'result'))
+
+REGISTRY = (REQUEST_SECONDS, RESPONSE_BYTES, DATA_LOAD_SECONDS, DERIVED_BUILD_SECONDS, CACHE_REQUESTS)
+
+
+def cache_result(cache, hit):
+    """Count one lookup in `cache` as a hit or a miss"""
+    CACHE_REQUESTS.inc(cache, 'hit' if hit else 'miss')
+
+
+@contextmanager
+def timed(name, histogram=None, *label_values):
+    """Time a block: adds a Server-Timing entry for the request and optionally observes a histogram"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if histogram is not None:
+            histogram.observe(elapsed, *label_values)
+        if has_request_context():
+            timings = g.setdefault('server_timing', [])
+            timings.append((name, elapsed))
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.append(f'# HELP {metric.name} {metric.help_text}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        for sample_name, label_values, value in metric.samples():
+            names = list(metric.labels) + ['pid']
+            values = list(label_values[:len(metric.labels)]) + [os.getpid()]
+            for extra_name, extra_value in label_values[len(metric.labels):]:
+                names.append(extra_name)
+                values.append(extra_value)
+            lines.append(f'{sample_name}{_label_text(names, values)} {value:g}')
+    return '\n'.join(lines) + '\n'
+
+
+def _endpoint():
+    rule = request.url_rule
+    return rule.rule if rule is not None else 'unmatched'
+
+
+def start_request():
+    """before_request hook: start timing (and maybe profiling) the request"""
+    if 'metrics_start' in g:
+        # Already started by the app-level hook when a blueprint is mounted
+        return None
+    g.metrics_start = time.perf_counter()
+    if PROFILE_SAMPLE_RATE and random.random() < PROFILE_SAMPLE_RATE and _profile_lock.acquire(blocking=False):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+    return None
+
+
+def _stop_profiler():
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        _profile_lock.release()
+    return profiler
+
+
+def stop_profiler(exc=None):
+    """teardown_request hook: make sure a failed request doesn't leave the profiler running"""
+    _stop_profiler()
+
+
+def _report_profile(profiler, elapsed):
+    endpoint = _endpoint()
+    if PROFILE_DIR:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{endpoint.strip('/').replace('/', '_') or 'root'}.prof"
+        profiler.dump_stats(os.path.join(PROFILE_DIR, name))
+        return
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats('cumulative').print_stats(20)
+    print(f"Slow request {request.method} {request.full_path} took {elapsed * 1000:.0f} ms\n{out.getvalue()}")
+
+
+def finish_request(response):
+    """after_request hook: record latency and size, and add Server-Timing if enabled"""
+    start = g.pop('metrics_start', None)
+    if start is None:
+        return response
+    elapsed = time.perf_counter() - start
+
+    profiler = _stop_profiler()
+    if profiler is not None and elapsed * 1000 >= PROFILE_SLOW_MS:
+        _report_profile(profiler, elapsed)
+
+    endpoint = _endpoint()
+    REQUEST_SECONDS.observe(elapsed, endpoint, request.method, response.status_code)
+    if not response.is_streamed:
+        RESPONSE_BYTES.observe(response.calculate_content_length() or 0, endpoint)
+
+    if SERVER_TIMING:
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in g.get('server_timing', [])]
+        entries.append(f'total;dur={elapsed * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+
+def authorized(user):
+    """Whether this request may read /api/metrics: an admin, the scrape token, or anyone if METRICS_PUBLIC"""
+    if METRICS_PUBLIC or (user and user.get('role') == 'admin'):
+        return True
+    if not METRICS_TOKEN:
+        return False
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}')
+
+
+def init_app(app):
+    """Register the request timing hooks for every route of the app"""
+    app.before_request(start_request)
+    app.after_request(finish_request)
+    app.teardown_request(stop_profiler)
@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from src.services import data_store, schema
+
+
+def normalize_name(value):
+    """Normalize a reviewer name or email prefix for case/whitespace-insensitive matching"""
+    return ' '.join(str(value).split()).casefold()
+
+
+def _group_positions(names, start):
+    """Map each distinct name in `names` to the absolute row positions it appears at"""
+    valid = names.notna().to_numpy()
+    positions = np.flatnonzero(valid) + start
+    if not len(positions):
+        return {}
+    groups = pd.Series(positions).groupby(names.to_numpy()[valid], sort=False).indices
+    return {name: positions[rows] for name, rows in groups.items()}
+
+
+class ReviewerIndex:
+    """Row positions of each reviewer's submissions, keyed by the exact `Name` value"""
+
+    def __init__(self, by_name):
+        self.by_name = by_name
+
+    @classmethod
+    def build(cls, snapshot):
+        return cls(_group_positions(snapshot.submissions[schema.NAME], 0))
+
+    @classmethod
+    def extend(cls, previous, snapshot, start):
+        by_name = dict(previous.by_name)
+        for name, positions in _group_positions(snapshot.submissions[schema.NAME].iloc[start:], start).items():
+            if name in by_name:
+                by_name[name] = np.concatenate([by_name[name], positions])
+            else:
+                by_name[name] = positions
+        return cls(by_name)
+
+    def positions(self, name):
+        """Row positions for an exact reviewer name"""
+        return self.by_name.get(name, np.empty(0, dtype=np.intp))
+
+
+data_store.register_derived('reviewer_index', ReviewerIndex.build, ReviewerIndex.extend)
+
+
+def submissions_for_name(snapshot, name):
+    """Submissions of the reviewer with exactly this name"""
+    index = snapshot.derived('reviewer_index')
+    return snapshot.submissions.take(index.positions(name))
+
@@ -0,0 +1,149 @@
+import pandas as pd
+from src.services import data_store, schema
+from src.services.reviewer_index import normalize_name
+
+# Fuzzy keys shorter than this match too much to be trusted
+MIN_FUZZY_LENGTH = 3
+
+
+def fuzzy_key(value):
+    """Letters of a name or email local part only, e.g. 'omar.shaban' and 'Omar Shaban' -> 'omarshaban'"""
+    return ''.join(ch for ch in str(value).casefold() if ch.isalpha())
+
+
+def _user_name(row):
+    # The schema maps header variants like 'Reviewer Name' onto the optional Name field
+    value = row.get(schema.NAME)
+    if value is not None and not pd.isna(value) and str(value).strip():
+        return str(value).strip()
+    return None
+
+
+class ReviewerResolver:
+    """Deterministic mapping from Users-sheet emails to submission `Name` values.
+
+    Each email is matched in tiers, stopping at the first tier with any candidate:
+    exact (the Users sheet names the reviewer, or a reviewer is recorded under the
+    email itself), prefix (the email's local part equals a normalized name, or
+    else one whole word of it) and fuzzy (letters-only keys of the local part or
+    the sheet name equal the name's). A tier with more than one candidate leaves
+    the email unresolved and is reported as a conflict rather than guessed at, as
+    is a reviewer claimed by several emails. A local part that only appears
+    inside a name ('yas' in 'omar yasser') is never resolved, only reported.
+    """
+
+    def __init__(self, resolutions, conflicts, reviewer_names):
+        self.resolutions = resolutions
+        self.conflicts = conflicts
+        self.reviewer_names = reviewer_names
+
+    @classmethod
+    def build(cls, snapshot):
+        names = sorted(snapshot.derived('reviewer_index').by_name, key=str)
+        users_df = snapshot.users
+
+        by_exact = {str(name): name for name in names}
+        by_email = {str(name).strip().casefold(): name for name in names}
+        by_normalized = {}
+        by_word = {}
+        by_fuzzy = {}
+        for name in names:
+            normalized = normalize_name(name)
+            by_normalized.setdefault(normalized, []).append(name)
+            for word in set(normalized.split()):
+                by_word.setdefault(word, []).append(name)
+            by_fuzzy.setdefault(fuzzy_key(name), []).append(name)
+
+        resolutions = {}
+        conflicts = []
+        for row in users_df.to_dict('records'):
+            email = row.get(schema.EMAIL)
+            if email is None or pd.isna(email) or not str(email).strip():
+                continue
+            email = str(email).strip()
+            key = email.casefold()
+            if key in resolutions:
+                # The first row for an address wins, as in the user directory
+                continue
+
+            local_part = normalize_name(email.split('@')[0])
+            sheet_name = _user_name(row)
+
+            exact = set()
+            if sheet_name is not None and sheet_name in by_exact:
+                exact.add(by_exact[sheet_name])
+            if key in by_email:
+                exact.add(by_email[key])
+
+            prefix = list(by_normalized.get(local_part, []))
+            if not prefix and len(local_part) >= MIN_FUZZY_LENGTH:
+                prefix = list(by_word.get(local_part, []))
+
+            fuzzy = set()
+            for text in (local_part, sheet_name):
+                text_key = fuzzy_key(text) if text else ''
+                if len(text_key) >= MIN_FUZZY_LENGTH:
+                    fuzzy.update(by_fuzzy.get(text_key, []))
+
+            name, method = None, None
+            for tier, candidates in (('exact', exact), ('prefix', prefix), ('fuzzy', fuzzy)):
+                if not candidates:
+                    continue
+                candidates = sorted(set(candidates), key=str)
+                if len(candidates) == 1:
+                    name, method = candidates[0], tier
+                else:
+                    conflicts.append({'email': email, 'reason': f'ambiguous {tier} match', 'names': candidates})
+                break
+            else:
+                # Only part of a name's word: too weak to authorize access to that reviewer's rows
+                partial = sorted(
+                    (name for normalized, group in by_normalized.items()
+                     if len(local_part) >= MIN_FUZZY_LENGTH and local_part in normalized for name in group),
+                    key=str
+                )
+                if partial:
+                    conflicts.append({'email': email, 'reason': 'partial name match', 'names': partial})
+            resolutions[key] = {'email': email, 'name': name, 'method': method}
+
+        claimed = {}
+        for resolution in resolutions.values():
+            if resolution['name'] is not None:
+                claimed.setdefault(resolution['name'], []).append(resolution['email'])
+        for name, emails in claimed.items():
+            if len(emails) > 1:
+                conflicts.append({'email': ', '.join(emails), 'reason': 'reviewer claimed by several users', 'names': [name]})
+
+        resolved = sum(resolution['name'] is not None for resolution in resolutions.values())
+        print(f"Resolved reviewer names for {resolved} of {len(resolutions)} users ({len(conflicts)} conflicts)")
+        for conflict in conflicts:
+            print(f"Reviewer name conflict for {conflict['email']}: {conflict['reason']} ({', '.join(map(str, conflict['names']))})")
+        return cls(resolutions, conflicts, frozenset(names))
+
+    @classmethod
+    def extend(cls, previous, snapshot, start):
+        # Users are unchanged on an append; only a new reviewer name can change the mapping
+        names = frozenset(snapshot.derived('reviewer_index').by_name)
+        if names == previous.reviewer_names:
+            return previous
+        return cls.build(snapshot)
+
+    def resolve(self, email):
+        """Resolution record {'email', 'name', 'method'} for an email, or None if it isn't a user"""
+        if not email:
+            return None
+        return self.resolutions.get(str(email).strip().casefold())
+
+    def name_for(self, email):
+        """Reviewer name an email resolves to, or None"""
+        resolution = self.resolve(email)
+        return resolution['name'] if resolution else None
+
+
+data_store.register_derived('reviewer_resolver', ReviewerResolver.build, ReviewerResolver.extend)
+
+
+def get_resolver(snapshot=None):
+    """Reviewer resolver for the given (or current) snapshot"""
+    snapshot = snapshot or data_store.store.snapshot()
+    return snapshot.derived('reviewer_resolver')
@@ -0,0 +1,142 @@
+"""Per-reviewer stats table and leaderboard.
+
+The table is materialized once per data version from the per-reviewer
+counters of the aggregates: one analytics row per reviewer (the payload of
+/analytics/user/<name>) and one {name: value} column per leaderboard metric.
+Per-reviewer lookups are then a dict get, and a leaderboard is a top-k
+selection over one column (O(n log k)) rather than a sort of every reviewer.
+"""
+import heapq
+from src.services import aggregates, data_store
+
+DEFAULT_METRIC = 'submitted'
+DEFAULT_K = 10
+MAX_K = 100
+
+
+class LeaderboardError(ValueError):
+    """Raised for invalid leaderboard parameters"""
+
+
+def _rejection_rate(row):
+    """Share of accepted/rejected submissions that were rejected, in percent"""
+    total = row['accepted_count'] + row['rejected_count']
+    return round(row['rejected_count'] / total * 100, 2) if total > 0 else 0
+
+
+# Leaderboard metric -> its value in a reviewer's analytics row
+METRICS = {
+    'submitted': lambda row: row['total_submitted'],
+    'accepted': lambda row: row['accepted_count'],
+    'rejected': lambda row: row['rejected_count'],
+    'leader_reviewed': lambda row: row['leader_reviewed'],
+    'changed': lambda row: row['changed_by_leader'],
+    'aligned': lambda row: row['fully_aligned'],
+    'misaligned': lambda row: row['misaligned'],
+    'rejection_rate': _rejection_rate,
+}
+
+
+def analytics_row(stats):
+    """Analytics payload of one reviewer's ReviewerStats"""
+    return {
+        'total_submitted': stats.total,
+        'accepted_count': stats.status['Accepted'],
+        'rejected_count': stats.status['Rejected'],
+        'leader_reviewed': stats.leader_reviewed,
+        'changed_by_leader': stats.changed_count,
+        'fully_aligned': stats.alignment['Yes'],
+        'misaligned': stats.alignment['No'],
+        'last_submission': stats.last_submission.isoformat() if stats.last_submission is not None else None,
+        'mistake_reasons': dict(stats.mistakes)
+    }
+
+
+# Analytics row of a user who has no submissions (or didn't resolve to a reviewer)
+EMPTY_ROW = analytics_row(aggregates.ReviewerStats())
+
+
+class ReviewerStatsTable:
+    """Analytics rows and metric columns for every reviewer of one data version.
+
+    Besides the metric columns, `changed_yes` counts only changes marked 'Yes',
+    which is how the dashboard has always reported `changed_by_leader`.
+    """
+
+    def __init__(self, rows, changed_yes):
+        self.rows = rows
+        self.columns = {metric: {name: value(row) for name, row in rows.items()} for metric, value in METRICS.items()}
+        self.changed_yes = changed_yes
+
+    @classmethod
+    def build(cls, snapshot):
+        return cls.from_aggregates(aggregates.get_aggregates(snapshot))
+
+    @classmethod
+    def from_aggregates(cls, summary):
+        reviewers = summary.reviewers
+        return cls(
+            {name: analytics_row(stats) for name, stats in reviewers.items()},
+            {name: stats.changed['Yes'] for name, stats in reviewers.items()}
+        )
+
+    def lookup(self, name):
+        """Analytics row of a reviewer (case-sensitive), or None if they never submitted"""
+        return self.rows.get(name)
+
+    def dashboard_row(self, name):
+        """Analytics row as the dashboard serves it (zeros for an unknown or None name)"""
+        row = self.rows.get(name)
+        if row is None:
+            return dict(EMPTY_ROW)
+        return dict(row, changed_by_leader=self.changed_yes[name])
+
+    def top(self, metric, k):
+        """The k (name, value) pairs with the highest values, ties broken by name"""
+        return heapq.nsmallest(k, self.columns[metric].items(), key=lambda item: (-item[1], item[0]))
+
+    def leader(self, metric):
+        """Reviewer with the highest non-zero value of a metric, or None"""
+        top = self.top(metric, 1)
+        return top[0][0] if top and top[0][1] else None
+
+
+# Rebuilt from the aggregates, which are themselves extended on append
+data_store.register_derived('reviewer_stats', ReviewerStatsTable.build)
+
+
+def get_table(snapshot=None):
+    """Reviewer stats table for the given (or current) snapshot"""
+    snapshot = snapshot or data_store.store.snapshot()
+    return snapshot.derived('reviewer_stats')
+
+
+def _parse_k(args):
+    value = args.get('k')
+    if value is None or not value.strip():
+        return DEFAULT_K
+    try:
+        k = int(value)
+    except ValueError:
+        raise LeaderboardError('k must be an integer')
+    if not 1 <= k <= MAX_K:
+        raise LeaderboardError(f'k must be between 1 and {MAX_K}')
+    return k
+
+
+def query_leaderboard(table, args):
+    """Top reviewers of the given table for request args `metric` and `k`"""
+    metric = (args.get('metric') or DEFAULT_METRIC).strip().lower()
+    if metric not in METRICS:
+        raise LeaderboardError(f"metric must be one of: {', '.join(METRICS)}")
+    k = _parse_k(args)
+
+    return {
+        'metric': metric,
+        'k': k,
+        'reviewers': len(table.rows),
+        'leaders': [
+            {'rank': rank, 'name': name, 'value': value}
+            for rank, (name, value) in enumerate(table.top(metric, k), start=1)
+        ],
+    }
@@ -0,0 +1,125 @@
+"""Canonical columns of both sheets and the header variants they're read from.
+
+The form's headers have been edited over time (and were spelled differently in
+different parts of this code), so every loaded sheet is normalized once: each
+raw header is matched to a canonical field by its exact text, a listed variant,
+or a case/punctuation-insensitive key; fields get their dtype; and required
+fields that are missing are reported and added as all-null columns, so the
+analytics never have to check whether a column exists.
+"""
+import re
+import pandas as pd
+
+TIMESTAMP = 'Timestamp'
+NAME = 'Name'
+TASK_TYPE = 'Task Type'
+STATUS = 'Is this rejected (Slice / Miner)'
+CHANGED = 'Is this Changed (Slice / Miner)'
+LEADER_NAME = 'Leader Name'
+ALIGNED = 'Are The Qc And the reviewer allign on the same answer'
+LEADER_ANSWER = 'Is this rejected (Slice / Miner) - Leader Answer'
+MISTAKE = 'In you opinion, What is the reason for reviewer mistake?'
+COMMENT = 'Comment'
+
+EMAIL = 'Email'
+ROLE = 'Role'
+
+
+class Field:
+    """One canonical column: the headers it may appear under and how it's typed"""
+
+    def __init__(self, name, variants=(), dtype=None, required=False):
+        self.name = name
+        self.variants = variants
+        self.dtype = dtype
+        self.required = required
+
+
+SUBMISSION_FIELDS = (
+    Field(TIMESTAMP, dtype='datetime', required=True),
+    Field(NAME, ('Reviewer Name',), dtype='category', required=True),
+    Field('"GULP" Link', ('GULP Link',)),
+    Field(TASK_TYPE, dtype='category', required=True),
+    Field('Slice Name'),
+    Field('Miner/ Slicer Name', ('Miner/Slicer Name',), dtype='category'),
+    Field('Road Event'),
+    Field('Miner Name', dtype='category'),
+    Field('Prompt Text', dtype='category'),
+    Field(STATUS, dtype='category', required=True),
+    Field(CHANGED, dtype='category', required=True),
+    Field(LEADER_NAME, dtype='category', required=True),
+    Field(ALIGNED, ('Are the QC and Reviewer aligned on the same answer',), dtype='category', required=True),
+    Field(LEADER_ANSWER, dtype='category'),
+    Field(MISTAKE, ('In your opinion, what is the reason for reviewer mistake?',), dtype='category', required=True),
+    Field(COMMENT, ('Comments',), dtype='category'),
+)
+
+USER_FIELDS = (
+    Field(EMAIL, ('Email Address', 'E-mail'), required=True),
+    Field(ROLE, required=True),
+    # Optional reviewer name used to resolve emails to submission names
+    Field(NAME, ('Reviewer Name',)),
+)
+
+
+def header_key(header):
+    """Case-, whitespace- and punctuation-insensitive key of a header"""
+    return ' '.join(re.sub(r'[^\w]+', ' ', str(header).casefold()).split())
+
+
+def _header_map(fields):
+    """Map every accepted header spelling (and its key) to its canonical name"""
+    exact, keyed = {}, {}
+    for field in fields:
+        for header in (field.name, *field.variants):
+            exact.setdefault(header, field.name)
+            keyed.setdefault(header_key(header), field.name)
+    return exact, keyed
+
+
+def header_matcher(fields):
+    """Predicate telling whether a raw header maps to one of `fields` (for read_excel's usecols)"""
+    exact, keyed = _header_map(fields)
+    return lambda header: str(header).strip() in exact or header_key(str(header).strip()) in keyed
+
+
+def normalize(df, fields, sheet):
+    """Rename `df`'s headers to canonical names, apply field dtypes and add missing required fields"""
+    exact, keyed = _header_map(fields)
+    canonical = {field.name for field in fields}
+    renames = {}
+    claimed = {}
+    # Headers that already are canonical names claim their field first
+    for column in sorted(df.columns, key=lambda column: str(column).strip() not in canonical):
+        header = str(column).strip()
+        name = exact.get(header) or keyed.get(header_key(header))
+        if name is None:
+            renames[column] = header
+            continue
+        if name in claimed:
+            # Keep the first matching column; a later duplicate keeps its own header
+            print(f"Schema warning: {sheet} columns {claimed[name]!r} and {header!r} both map to {name!r}")
+            renames[column] = header
+            continue
+        claimed[name] = header
+        renames[column] = name
+    df = df.rename(columns=renames)
+
+    for field in fields:
+        if field.name not in df.columns:
+            if field.required:
+                print(f"Schema warning: {sheet} sheet has no {field.name!r} column; treating it as empty")
+                df[field.name] = pd.Series(None, index=df.index, dtype=object)
+            else:
+                continue
+        if field.dtype == 'datetime':
+            df[field.name] = pd.to_datetime(df[field.name], errors='coerce')
+        elif field.dtype == 'category':
+            df[field.name] = df[field.name].astype('category')
+    return df
+
+
+def empty_frame(fields):
+    """Frame with every required field and no rows (the state before anything is loaded)"""
+    df = pd.DataFrame({field.name: pd.Series(dtype=object) for field in fields if field.required})
+    return normalize(df, fields, 'empty')
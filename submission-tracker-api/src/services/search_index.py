@@ -0,0 +1,147 @@
+import math
+import re
+import numpy as np
+from src.services import data_store, schema
+
+# Text columns covered by the search index
+SEARCH_COLUMNS = (schema.NAME, schema.TASK_TYPE, 'Miner/ Slicer Name', 'Miner Name', schema.MISTAKE, schema.COMMENT)
+
+# Score weight of a query term matching a whole token vs. only part of one
+EXACT_WEIGHT = 1.0
+PARTIAL_WEIGHT = 0.5
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+_EMPTY = np.empty(0, dtype=np.intp)
+
+
+class SearchError(ValueError):
+    """Raised for invalid search parameters"""
+
+
+def parse_limit(args):
+    """Read `limit` from request args: an integer >= 1, capped at MAX_LIMIT"""
+    try:
+        limit = int(args.get('limit', DEFAULT_LIMIT))
+    except ValueError:
+        raise SearchError('limit must be an integer')
+    if limit < 1:
+        raise SearchError(f'limit must be between 1 and {MAX_LIMIT}')
+    return min(limit, MAX_LIMIT)
+
+
+def tokenize(text):
+    """Split text into lower-cased alphanumeric tokens (underscores separate tokens)"""
+    return _TOKEN_PATTERN.findall(str(text).lower())
+
+
+def _trigrams(token):
+    return {token[i:i + 3] for i in range(len(token) - 2)}
+
+
+def _token_positions(df, start):
+    """Map each token to the sorted, de-duplicated row positions it occurs in"""
+    lists = {}
+    for column in SEARCH_COLUMNS:
+        if column not in df.columns:
+            continue
+        values = df[column]
+        valid = values.notna().to_numpy()
+        positions = np.flatnonzero(valid)
+        # Tokenize each distinct value once, then hand its rows to every token
+        for value, rows in values[valid].groupby(values[valid].to_numpy(), sort=False).indices.items():
+            rows = positions[rows] + start
+            for token in set(tokenize(value)):
+                lists.setdefault(token, []).append(rows)
+    return {token: np.unique(np.concatenate(arrays)) for token, arrays in lists.items()}
+
+
+class SearchIndex:
+    """Inverted index from tokens to submission rows, with a trigram index over the vocabulary.
+
+    A query term matches a row if it equals one of the row's tokens or is a
+    substring of one; substring candidates come from the trigram index so the
+    vocabulary is never scanned for terms of three or more characters. Rows must
+    match every term and are ranked by the summed IDF of their matching terms.
+    """
+
+    def __init__(self, postings, rows):
+        self.postings = postings
+        self.rows = rows
+        self.trigrams = {}
+        for token in postings:
+            for trigram in _trigrams(token):
+                self.trigrams.setdefault(trigram, set()).add(token)
+
+    @classmethod
+    def build(cls, snapshot):
+        df = snapshot.submissions
+        return cls(_token_positions(df, 0), len(df))
+
+    @classmethod
+    def extend(cls, previous, snapshot, start):
+        if previous.rows != start:
+            return cls.build(snapshot)
+        df = snapshot.submissions
+        postings = dict(previous.postings)
+        for token, positions in _token_positions(df.iloc[start:], start).items():
+            postings[token] = np.concatenate([postings[token], positions]) if token in postings else positions
+        return cls(postings, len(df))
+
+    def _tokens_containing(self, term):
+        """Vocabulary tokens that contain `term` as a proper substring"""
+        if len(term) < 3:
+            candidates = self.postings.keys()
+        else:
+            grams = sorted(_trigrams(term), key=lambda g: len(self.trigrams.get(g, ())))
+            candidates = set(self.trigrams.get(grams[0], ()))
+            for gram in grams[1:]:
+                candidates &= self.trigrams.get(gram, set())
+                if not candidates:
+                    break
+        return [token for token in candidates if token != term and term in token]
+
+    def _idf(self, matches):
+        return math.log(1 + self.rows / max(len(matches), 1))
+
+    def search(self, query):
+        """Return (row positions, scores) of rows matching every term, best first"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return _EMPTY, np.empty(0)
+
+        matched = None
+        scored = []
+        for term in terms:
+            exact = self.postings.get(term, _EMPTY)
+            partial = [self.postings[token] for token in self._tokens_containing(term)]
+            partial = np.setdiff1d(np.unique(np.concatenate(partial)), exact) if partial else _EMPTY
+            rows = np.union1d(exact, partial)
+            if not len(rows):
+                return _EMPTY, np.empty(0)
+            idf = self._idf(rows)
+            scored.append((exact, EXACT_WEIGHT * idf))
+            scored.append((partial, PARTIAL_WEIGHT * idf))
+            matched = rows if matched is None else np.intersect1d(matched, rows, assume_unique=True)
+            if not len(matched):
+                return _EMPTY, np.empty(0)
+
+        scores = np.zeros(len(matched))
+        for rows, weight in scored:
+            scores[np.isin(matched, rows, assume_unique=True)] += weight
+
+        # Highest score first, ties in sheet order
+        order = np.lexsort((matched, -scores))
+        return matched[order], scores[order]
+
+
+data_store.register_derived('search_index', SearchIndex.build, SearchIndex.extend)
+
+
+def search_submissions(snapshot, query, limit=DEFAULT_LIMIT):
+    """Ranked matches for `query` as (total, [{'id', 'score'}, ...] truncated to `limit`)"""
+    rows, scores = snapshot.derived('search_index').search(query)
+    results = [{'id': int(row), 'score': round(float(score), 4)} for row, score in zip(rows[:limit], scores[:limit])]
+    return len(rows), results
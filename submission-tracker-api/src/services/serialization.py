@@ -0,0 +1,42 @@
+import json
+import pandas as pd
+from flask import Response
+from src.services import metrics
+
+
+def frame_to_json(df):
+    """Serialize a DataFrame to a JSON array of records as UTF-8 bytes.
+
+    Uses pandas' C encoder column by column, so there is no intermediate list of
+    dicts. NaN/NaT become null and timestamps become ISO 8601 strings.
+    """
+    return df.to_json(orient='records', date_format='iso', force_ascii=False).encode('utf-8')
+
+
+def to_json(value):
+    """Serialize a payload that may contain DataFrames (encoded as records) to UTF-8 bytes"""
+    if isinstance(value, pd.DataFrame):
+        return frame_to_json(value)
+    if isinstance(value, dict) and any(isinstance(item, (pd.DataFrame, dict)) for item in value.values()):
+        members = [json.dumps(str(key)).encode('utf-8') + b':' + to_json(item) for key, item in value.items()]
+        return b'{' + b','.join(members) + b'}'
+    return json.dumps(value, ensure_ascii=False).encode('utf-8')
+
+
+def records_response(df):
+    """JSON response with the DataFrame's rows as records"""
+    with metrics.timed('encode'):
+        body = frame_to_json(df)
+    return Response(body, mimetype='application/json')
+
+
+def composite_response(**fields):
+    """JSON object response whose DataFrame fields are encoded as records"""
+    with metrics.timed('encode'):
+        body = to_json(fields)
+    return Response(body, mimetype='application/json')
+
+
+def page_response(df, total, page, page_size):
+    """JSON response with one page of records and the total number of matches"""
+    return composite_response(items=df, total=total, page=page, page_size=page_size)
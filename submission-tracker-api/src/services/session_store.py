@@ -0,0 +1,218 @@
+"""Server-side session storage keyed by an opaque token.
+
+The cookie only carries the token; the signed-in user record lives in a session
+store: an in-process LRU with a TTL for a single worker, or a SQLite file
+(SESSION_DB_PATH) shared between gunicorn workers. SESSION_BACKEND picks one;
+by default the shared store is used whenever WEB_CONCURRENCY configures more
+than one worker, and the in-process store is refused there, since a session
+created by one worker would be unknown to the others. Expired sessions are
+removed on access and by a background sweeper thread.
+"""
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from flask import g, request, session
+
+SESSION_TTL = int(os.environ.get('SESSION_TTL', 24 * 60 * 60))
+SESSION_MAX_ENTRIES = int(os.environ.get('SESSION_MAX_ENTRIES', 10000))
+SWEEP_INTERVAL = int(os.environ.get('SESSION_SWEEP_INTERVAL', 300))
+SESSION_DB_PATH = os.environ.get(
+    'SESSION_DB_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database', 'sessions.db')
+)
+
+# Name of the token in the (signed) cookie session
+TOKEN_KEY = 'token'
+
+
+class MemorySessionStore:
+    """In-process LRU of sessions, each expiring `ttl` seconds after sign-in"""
+
+    def __init__(self, ttl=SESSION_TTL, max_entries=SESSION_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, token, user):
+        with self._lock:
+            self._entries[token] = (time.time() + self.ttl, user)
+            self._entries.move_to_end(token)
+            # Least recently used sessions go first when the store is full
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            expires, user = entry
+            if time.time() >= expires:
+                del self._entries[token]
+                return None
+            self._entries.move_to_end(token)
+            return user
+
+    def delete(self, token):
+        with self._lock:
+            self._entries.pop(token, None)
+
+    def sweep(self):
+        """Drop every expired session and return how many were dropped"""
+        now = time.time()
+        with self._lock:
+            expired = [token for token, (expires, _) in self._entries.items() if now >= expires]
+            for token in expired:
+                del self._entries[token]
+        return len(expired)
+
+
+class SQLiteSessionStore:
+    """Sessions in a SQLite table, shared by every process that opens the same file"""
+
+    def __init__(self, path=SESSION_DB_PATH, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(token TEXT PRIMARY KEY, user TEXT NOT NULL, expires REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS sessions_expires ON sessions (expires)')
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork (e.g. gunicorn workers)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=5)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def put(self, token, user):
+        with self._connection() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO sessions (token, user, expires) VALUES (?, ?, ?)',
+                (token, json.dumps(user), time.time() + self.ttl)
+            )
+
+    def get(self, token):
+        row = self._connection().execute(
+            'SELECT user FROM sessions WHERE token = ? AND expires > ?', (token, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, token):
+        with self._connection() as conn:
+            conn.execute('DELETE FROM sessions WHERE token = ?', (token,))
+
+    def sweep(self):
+        """Drop every expired session and return how many were dropped"""
+        with self._connection() as conn:
+            return conn.execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),)).rowcount
+
+
+def configured_workers():
+    """Number of worker processes serving the app (WEB_CONCURRENCY, 1 if unset)"""
+    try:
+        return max(int(os.environ.get('WEB_CONCURRENCY', 1)), 1)
+    except ValueError:
+        return 1
+
+
+def create_store(backend=None, workers=None):
+    """Session store selected by SESSION_BACKEND ('memory' or 'sqlite').
+
+    Defaults to 'sqlite' when more than one worker is configured, and raises
+    RuntimeError if 'memory' is asked for there.
+    """
+    workers = workers or configured_workers()
+    default = 'sqlite' if workers > 1 else 'memory'
+    backend = (backend or os.environ.get('SESSION_BACKEND') or default).strip().lower()
+    if backend not in ('memory', 'sqlite'):
+        print(f"Error: unknown SESSION_BACKEND {backend!r}, using {default}")
+        backend = default
+    if backend == 'sqlite':
+        return SQLiteSessionStore()
+    if workers > 1:
+        raise RuntimeError(f"SESSION_BACKEND=memory cannot share sessions between {workers} workers; use sqlite")
+    return MemorySessionStore()
+
+
+store = create_store()
+
+_sweeper_pid = None
+_sweeper_lock = threading.Lock()
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        try:
+            store.sweep()
+        except Exception as e:
+            print(f"Error sweeping sessions: {e}")
+
+
+def _ensure_sweeper():
+    """Start the sweeper thread once per process (threads don't survive a fork)"""
+    global _sweeper_pid
+    if _sweeper_pid == os.getpid():
+        return
+    with _sweeper_lock:
+        if _sweeper_pid != os.getpid():
+            threading.Thread(target=_sweep_forever, name='session-sweeper', daemon=True).start()
+            _sweeper_pid = os.getpid()
+
+
+def _request_token():
+    token = session.get(TOKEN_KEY)
+    if token:
+        return token
+    # API clients may send the token returned by sign-in instead of the cookie
+    authorization = request.headers.get('Authorization', '')
+    if authorization.startswith('Bearer '):
+        return authorization[len('Bearer '):].strip() or None
+    return None
+
+
+def start_session(user):
+    """Store `user` under a new token, put the token in the cookie and return it"""
+    _ensure_sweeper()
+    token = secrets.token_urlsafe(32)
+    store.put(token, user)
+    session.clear()
+    session[TOKEN_KEY] = token
+    g.session_user = user
+    return token
+
+
+def current_user():
+    """The signed-in user record for this request, or None"""
+    if 'session_user' not in g:
+        _ensure_sweeper()
+        token = _request_token()
+        g.session_user = store.get(token) if token else None
+    return g.session_user
+
+
+def has_token():
+    """Whether the request carries a session token (valid or not)"""
+    return _request_token() is not None
+
+
+def end_session():
+    """Forget the current session, both server-side and in the cookie"""
+    token = _request_token()
+    if token:
+        store.delete(token)
+    session.clear()
+    g.session_user = None
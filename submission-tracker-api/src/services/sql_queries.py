@@ -0,0 +1,244 @@
+"""The data endpoints' queries against the imported tables (DATA_BACKEND=sqlite).
+
+Each function returns what its in-memory counterpart does (frames with the
+canonical sheet headers, aggregates.SubmissionAggregates, trend series), so
+the views and serializers are shared between both backends. Filtering,
+sorting, paging and grouping run in SQLite on the indexed columns; only
+result rows and group counts come back into Python.
+"""
+import json
+import threading
+from collections import Counter
+from datetime import date
+import pandas as pd
+from sqlalchemy import false, func, or_, select, text
+from src.models.submission import ImportState, SheetUser, Submission, SUBMISSION_COLUMNS
+from src.models.user import db
+from src.services import aggregates, reviewer_stats, schema, search_index, sql_store, submission_query, trends, user_directory
+
+# Whole-table aggregates for the import generation they were computed from
+_aggregates = {'generation': None, 'value': None}
+_aggregates_lock = threading.Lock()
+
+# Structures built from the aggregates, by name: (aggregates they came from, structure)
+_from_aggregates = {}
+
+
+def _columns():
+    return [getattr(Submission, attribute).label(header) for header, attribute in SUBMISSION_COLUMNS.items()]
+
+
+def to_frame(rows, columns):
+    """Result rows as a DataFrame with the sheet's dtypes for timestamps"""
+    df = pd.DataFrame(list(rows), columns=list(columns))
+    if schema.TIMESTAMP in df.columns:
+        df[schema.TIMESTAMP] = pd.to_datetime(df[schema.TIMESTAMP], errors='coerce')
+    return df
+
+
+def _frame(statement):
+    with db.engine.connect() as connection:
+        result = connection.execute(statement)
+        return to_frame(result.fetchall(), result.keys())
+
+
+def _count(statement):
+    return db.session.execute(select(func.count()).select_from(statement.order_by(None).subquery())).scalar_one()
+
+
+def has_submissions():
+    return db.session.execute(select(Submission.id).limit(1)).first() is not None
+
+
+def all_submissions():
+    """Every submission in sheet order"""
+    return _frame(select(*_columns()).order_by(Submission.id))
+
+
+def submissions_for_name(name):
+    """Rows whose `Name` equals `name` exactly, in sheet order (uses the name index)"""
+    return _frame(select(*_columns()).where(Submission.name == name).order_by(Submission.id))
+
+
+def select_submissions(args):
+    """Statement for the submissions matching the list-view filters in request args, sorted"""
+    statement = select(*_columns())
+    if args.get('status'):
+        statement = statement.where(Submission.status == args.get('status'))
+    if args.get('task_type'):
+        statement = statement.where(Submission.task_type == args.get('task_type'))
+    term = (args.get('q') or '').strip().lower()
+    if term:
+        statement = statement.where(or_(*[
+            func.lower(getattr(Submission, SUBMISSION_COLUMNS[column])).contains(term, autoescape=True)
+            for column in submission_query.SEARCH_COLUMNS
+        ]))
+
+    sort = args.get('sort')
+    if not sort:
+        return statement.order_by(Submission.id)
+    column = sort.lstrip('-')
+    if column not in SUBMISSION_COLUMNS:
+        raise submission_query.QueryError(f"Cannot sort by unknown column '{column}'")
+    attribute = getattr(Submission, SUBMISSION_COLUMNS[column])
+    # Nulls last in both directions, ties in sheet order
+    return statement.order_by(attribute.is_(None), attribute.desc() if sort.startswith('-') else attribute, Submission.id)
+
+
+def query_submissions(args):
+    """Filter, sort and paginate submissions in SQL. Returns (page_df, total, page, page_size)."""
+    page, page_size = submission_query.parse_page(args)
+    statement = select_submissions(args)
+    total = _count(statement)
+    page_df = _frame(statement.limit(page_size).offset((page - 1) * page_size))
+    return page_df, total, page, page_size
+
+
+def search_submissions(query, limit=search_index.DEFAULT_LIMIT):
+    """Full-text matches for `query` as (total, [{'id', 'score'}, ...], rows).
+
+    Every term must prefix-match a token of one of the search columns; rows are
+    ranked by FTS5's bm25 (higher scores are better), ties in sheet order.
+    """
+    terms = list(dict.fromkeys(search_index.tokenize(query)))
+    if not terms:
+        return 0, [], to_frame([], SUBMISSION_COLUMNS)
+    # Tokens are alphanumeric, so quoting them is all the escaping FTS5 needs
+    match = ' '.join(f'"{term}"*' for term in terms)
+    table = sql_store.FTS_TABLE
+    total = db.session.execute(
+        text(f"SELECT count(*) FROM {table} WHERE {table} MATCH :match"), {'match': match}
+    ).scalar_one()
+    ranked = db.session.execute(
+        text(f"SELECT rowid, bm25({table}) AS rank FROM {table} WHERE {table} MATCH :match ORDER BY rank, rowid LIMIT :limit"),
+        {'match': match, 'limit': limit}
+    ).all()
+    results = [{'id': int(row), 'score': round(-float(rank), 4)} for row, rank in ranked]
+
+    ids = [result['id'] for result in results]
+    rows = _frame(select(*_columns(), Submission.id.label('_id')).where(Submission.id.in_(ids)))
+    rows = rows.set_index('_id').reindex(ids).reset_index(drop=True)
+    return total, results, rows
+
+
+def export_query(user, args):
+    """Statement and row count of the submissions `user` may export that match the list-view filters"""
+    statement = select_submissions(args)
+    if user.get('role') != 'admin':
+        # Other users only export their own reviewer's rows (none if they didn't resolve to one)
+        name = reviewer_name(user)
+        statement = statement.where(Submission.name == name if name is not None else false())
+    return statement, _count(statement)
+
+
+def stream_frames(statement, chunk_rows):
+    """Generator of DataFrames of at most `chunk_rows` rows, fetched as it is consumed.
+
+    The engine is looked up now, so the generator can run after the request's
+    app context is gone (as a streamed response body does).
+    """
+    engine = db.engine
+
+    def frames():
+        with engine.connect() as connection:
+            result = connection.execution_options(yield_per=chunk_rows).execute(statement)
+            columns = list(result.keys())
+            for rows in result.partitions():
+                yield to_frame(rows, columns)
+
+    return frames()
+
+
+def users():
+    """The Users sheet exactly as read, like the in-memory snapshot's users frame"""
+    state = db.session.get(ImportState, 1)
+    if state is None or not state.users_sheet:
+        return pd.DataFrame(columns=[schema.EMAIL, schema.ROLE])
+    sheet = json.loads(state.users_sheet)
+    return pd.DataFrame(sheet['data'], columns=sheet['columns'])
+
+
+def has_users():
+    return db.session.execute(select(SheetUser.id).limit(1)).first() is not None
+
+
+def lookup_user(email):
+    """User record {'email', 'role', 'name'} for an email address, or None if it isn't authorized"""
+    if not email:
+        return None
+    user = db.session.execute(
+        select(SheetUser).where(SheetUser.email_key == user_directory.normalize_email(email))
+    ).scalar_one_or_none()
+    return user.to_dict() if user else None
+
+
+def reviewer_resolutions():
+    """(resolutions, conflicts) stored by the last import, as the reviewer resolver reports them"""
+    rows = db.session.execute(
+        select(SheetUser.email, SheetUser.reviewer_name, SheetUser.resolution_method).order_by(SheetUser.id)
+    ).all()
+    state = db.session.get(ImportState, 1)
+    resolutions = [{'email': email, 'name': name, 'method': method} for email, name, method in rows]
+    return resolutions, json.loads(state.conflicts) if state is not None and state.conflicts else []
+
+
+def reviewer_name(user):
+    """Submission `Name` of a signed-in user, or None if their email didn't resolve to one"""
+    record = lookup_user(user.get('email'))
+    return record['name'] if record else None
+
+
+def _aggregate(where=None):
+    """SubmissionAggregates computed by grouping in SQL over the same dimensions as aggregates.count_frame"""
+    day = func.date(Submission.timestamp)
+    leader_reviewed = Submission.leader_name.is_not(None)
+    dimensions = (
+        Submission.name, Submission.task_type, Submission.status, Submission.changed,
+        Submission.aligned, Submission.mistake, leader_reviewed, day,
+    )
+    # Groups in order of their first row, so breakdowns list values in sheet order as in memory
+    statement = select(*dimensions, func.count()).group_by(*dimensions).order_by(func.min(Submission.id))
+    last = select(Submission.name, func.max(Submission.timestamp)).where(Submission.name.is_not(None)).group_by(Submission.name)
+    if where is not None:
+        statement = statement.where(where)
+        last = last.where(where)
+
+    counts = Counter()
+    rows = 0
+    for *key, count in db.session.execute(statement):
+        key[-2] = bool(key[-2])
+        key[-1] = date.fromisoformat(key[-1]) if key[-1] else None
+        counts[tuple(key)] += count
+        rows += count
+    last_submission = {name: pd.Timestamp(timestamp) for name, timestamp in db.session.execute(last) if timestamp is not None}
+    return aggregates.SubmissionAggregates(counts, last_submission, rows)
+
+
+def get_aggregates():
+    """Aggregates over every submission, recomputed once per import"""
+    generation = sql_store.generation()
+    with _aggregates_lock:
+        if _aggregates['value'] is None or _aggregates['generation'] != generation:
+            _aggregates['value'] = _aggregate()
+            _aggregates['generation'] = generation
+        return _aggregates['value']
+
+
+def _derived(name, build):
+    """build(aggregates) for the current aggregates, rebuilt only when they are"""
+    summary = get_aggregates()
+    with _aggregates_lock:
+        cached = _from_aggregates.get(name)
+        if cached is None or cached[0] is not summary:
+            cached = _from_aggregates[name] = (summary, build(summary))
+        return cached[1]
+
+
+def get_reviewer_stats():
+    """Per-reviewer stats table over every submission, rebuilt once per import"""
+    return _derived('reviewer_stats', reviewer_stats.ReviewerStatsTable.from_aggregates)
+
+
+def query_trend(args):
+    """Trend series for request args, as trends.query_trend returns it (buckets rolled up once per import)"""
+    return trends.query_rollups(_derived('trends', trends.TrendRollups.from_aggregates), args)
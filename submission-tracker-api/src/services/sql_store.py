@@ -0,0 +1,240 @@
+"""SQLite storage of the workbook, as an alternative to keeping it in memory.
+
+With DATA_BACKEND=sqlite both sheets are imported into indexed tables (see
+src/models/submission.py) and the data endpoints query those instead of the
+in-memory snapshot, so a worker only holds the rows a request needs. The
+import replaces both tables in one transaction whenever the workbook's
+(mtime, size) changes: at startup, on requests at most every
+SQL_SYNC_INTERVAL seconds, and by hand with
+
+    python -m src.services.sql_store [--force] [workbook]
+
+DATABASE_URL overrides the default SQLite file, src/database/submissions.db.
+"""
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert, text
+from src.models.submission import ImportState, SheetUser, Submission, SUBMISSION_COLUMNS
+from src.models.user import db
+from src.services import data_store, metrics, reviewer_resolver, search_index, user_directory
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - no inter-process lock on Windows
+    fcntl = None
+
+DATA_BACKEND = os.environ.get('DATA_BACKEND', 'excel').strip().lower()
+DATABASE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'database')
+DATABASE_URI = os.environ.get('DATABASE_URL', f"sqlite:///{os.path.join(DATABASE_DIR, 'submissions.db')}")
+SYNC_CHECK_INTERVAL = float(os.environ.get('SQL_SYNC_INTERVAL', 5))
+
+# External-content FTS5 index over the search columns, rebuilt after every import
+FTS_TABLE = 'submissions_fts'
+FTS_COLUMNS = [SUBMISSION_COLUMNS[column] for column in search_index.SEARCH_COLUMNS]
+
+# Stored in SQLite's user_version; bumped whenever the tables change. The tables
+# only ever hold an import of the workbook, so older ones are dropped and re-imported.
+SCHEMA_VERSION = 3
+
+# Version and generation of the imported data as last seen by this process
+_current = {'version': None, 'generation': None, 'checked': 0.0}
+_lock = threading.Lock()
+
+
+def enabled():
+    """Whether the data endpoints are served from the database"""
+    return DATA_BACKEND == 'sqlite'
+
+
+def _version_text(version):
+    return ','.join(map(str, version)) if version is not None else None
+
+
+def _parse_version(value):
+    return tuple(int(part) for part in value.split(',')) if value else None
+
+
+def create_schema():
+    """Create the tables, indexes and full-text index if they don't exist yet (or are outdated)"""
+    with db.engine.begin() as connection:
+        if connection.execute(text('PRAGMA user_version')).scalar_one() != SCHEMA_VERSION:
+            connection.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+            db.metadata.drop_all(connection, tables=[Submission.__table__, SheetUser.__table__, ImportState.__table__])
+            connection.execute(text(f'PRAGMA user_version = {SCHEMA_VERSION}'))
+    db.create_all()
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            f"{', '.join(FTS_COLUMNS)}, content='{Submission.__tablename__}', content_rowid='id')"
+        ))
+
+
+def lock_file():
+    """Import lock next to the configured database file, or None for an in-memory database"""
+    database = db.engine.url.database
+    if not database or database == ':memory:':
+        return None
+    return f'{os.path.abspath(database)}.import.lock'
+
+
+@contextmanager
+def _import_lock():
+    """Exclusive inter-process lock so concurrent workers import a version once"""
+    path = lock_file() if fcntl is not None else None
+    if path is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _submission_rows(df):
+    """Sheet rows as dicts of Submission attributes (nulls as None, text as str)"""
+    columns = {header: attribute for header, attribute in SUBMISSION_COLUMNS.items() if header in df.columns}
+    frame = df[list(columns)].rename(columns=columns).astype(object)
+    frame = frame.where(frame.notna(), None)
+    for attribute in frame.columns:
+        if attribute != 'timestamp':
+            frame[attribute] = frame[attribute].map(lambda value: value if value is None or isinstance(value, str) else str(value))
+    rows = frame.to_dict('records')
+    for position, row in enumerate(rows):
+        row['id'] = position
+    return rows
+
+
+def _user_rows(directory, resolver):
+    """User directory records as dicts of SheetUser attributes"""
+    rows = []
+    for position, (key, user) in enumerate(directory.users.items()):
+        resolution = resolver.resolve(user['email'])
+        rows.append({
+            'id': position, 'email': user['email'], 'email_key': key, 'role': user['role'],
+            'reviewer_name': user['name'], 'resolution_method': resolution['method'] if resolution else None,
+        })
+    return rows
+
+
+def _remember(state):
+    _current['version'] = _parse_version(state.workbook_version) if state else None
+    _current['generation'] = state.generation if state else None
+
+
+def sync(path=data_store.EXCEL_FILE_PATH, force=False):
+    """Import the workbook unless the tables already hold its current version.
+
+    Returns True if it imported. Reviewer names are resolved against a
+    temporary snapshot, exactly as the in-memory backend does, and stored
+    with each user.
+    """
+    version = data_store.file_version(path)
+    if version is None:
+        print(f"Error syncing database: {path} not found")
+        return False
+
+    with _lock, _import_lock():
+        state = db.session.get(ImportState, 1)
+        if not force and state is not None and state.workbook_version == _version_text(version):
+            _remember(state)
+            db.session.rollback()
+            return False
+
+        try:
+            with metrics.timed('import'):
+                submissions_df, users_df = data_store.load_workbook(path, version)
+                snapshot = data_store.DataSnapshot(submissions_df, users_df, version)
+                submissions = _submission_rows(snapshot.submissions)
+                resolver = reviewer_resolver.get_resolver(snapshot)
+                users = _user_rows(user_directory.get_directory(snapshot), resolver)
+
+                db.session.execute(delete(Submission))
+                db.session.execute(delete(SheetUser))
+                if submissions:
+                    db.session.execute(insert(Submission), submissions)
+                if users:
+                    db.session.execute(insert(SheetUser), users)
+                db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+                if state is None:
+                    state = ImportState(id=1, generation=0)
+                    db.session.add(state)
+                state.workbook_version = _version_text(version)
+                state.generation += 1
+                state.submissions = len(submissions)
+                state.users = len(users)
+                state.conflicts = json.dumps(resolver.conflicts, default=str)
+                state.users_sheet = snapshot.users.to_json(orient='split', index=False, date_format='iso', force_ascii=False)
+                state.imported_at = datetime.now(timezone.utc).replace(tzinfo=None)
+                db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error syncing database: {e}")
+            return False
+
+        _remember(state)
+        print(f"Imported {state.submissions} submissions and {state.users} users into the database (generation {state.generation})")
+        return True
+
+
+def sync_if_changed():
+    """before_request hook: re-import the workbook if it changed (checked every SQL_SYNC_INTERVAL seconds)"""
+    if not enabled():
+        return None
+    now = time.monotonic()
+    if now - _current['checked'] < SYNC_CHECK_INTERVAL:
+        return None
+    _current['checked'] = now
+    if data_store.file_version(data_store.EXCEL_FILE_PATH) != _current['version']:
+        sync()
+    return None
+
+
+def version():
+    """Workbook version the imported data came from, as data_store.file_version returns it"""
+    return _current['version']
+
+
+def generation():
+    """Import counter of the data this process last saw; changes on every import"""
+    return _current['generation']
+
+
+def init_app(app):
+    """Bind the models to the app and, with DATA_BACKEND=sqlite, create the tables and import the workbook"""
+    app.config.setdefault('SQLALCHEMY_DATABASE_URI', DATABASE_URI)
+    db.init_app(app)
+    if not enabled():
+        return
+    with app.app_context():
+        with _import_lock():
+            create_schema()
+        sync()
+        # Don't hand pooled connections to forked gunicorn workers
+        db.engine.dispose()
+
+
+if __name__ == '__main__':
+    from flask import Flask
+
+    args = sys.argv[1:]
+    force = '--force' in args
+    paths = [arg for arg in args if arg != '--force']
+    workbook = paths[0] if paths else data_store.EXCEL_FILE_PATH
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
+    db.init_app(app)
+    with app.app_context():
+        with _import_lock():
+            create_schema()
+        if not sync(workbook, force=force):
+            print(f"Nothing imported from {workbook} (use --force to re-import an unchanged workbook)")
@@ -0,0 +1,132 @@
+import numpy as np
+from src.services import data_store, schema
+
+# Columns the admin search box matches against
+SEARCH_COLUMNS = (schema.NAME, schema.TASK_TYPE, 'Miner/ Slicer Name')
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Request args that ask for the filtered, sorted and paginated view
+QUERY_ARGS = ('page', 'page_size', 'sort', 'status', 'task_type', 'q')
+
+
+class QueryError(ValueError):
+    """Raised for query parameters that can't be applied"""
+
+
+def _value_positions(series):
+    """Map each distinct non-null value to the row positions holding it"""
+    return {value: np.asarray(rows) for value, rows in series.groupby(series, sort=False).indices.items()}
+
+
+class SubmissionQueryIndex:
+    """Per-snapshot lookup structures for filtering, searching and sorting submissions"""
+
+    def __init__(self, df):
+        self.rows = len(df)
+        self.columns = set(df.columns)
+        self.by_status = _value_positions(df[schema.STATUS])
+        self.by_task_type = _value_positions(df[schema.TASK_TYPE])
+
+        # (lower-cased value, row positions) of every searchable column. The
+        # columns are categoricals with a few hundred labels at most, so `q`
+        # is matched against the labels rather than scanned over every row
+        self.search_values = [
+            (str(value).lower(), positions)
+            for column in SEARCH_COLUMNS if column in df.columns
+            for value, positions in _value_positions(df[column]).items()
+        ]
+
+        self._df = df
+        self._orders = {}
+
+    @classmethod
+    def build(cls, snapshot):
+        return cls(snapshot.submissions)
+
+    def order(self, column, descending=False):
+        """Row positions sorted by `column`, nulls last (cached per column and direction)"""
+        key = (column, descending)
+        if key not in self._orders:
+            # Timestamps are already datetimes (see schema.normalize)
+            values = self._df[column].reset_index(drop=True)
+            ordered = values.sort_values(ascending=not descending, kind='stable', na_position='last')
+            self._orders[key] = np.asarray(ordered.index)
+        return self._orders[key]
+
+    def _mask_for(self, positions_by_value, value):
+        mask = np.zeros(self.rows, dtype=bool)
+        mask[positions_by_value.get(value, [])] = True
+        return mask
+
+    def _search_mask(self, term):
+        """Rows where any searchable column contains `term` (already lower-cased)"""
+        mask = np.zeros(self.rows, dtype=bool)
+        for value, positions in self.search_values:
+            if term in value:
+                mask[positions] = True
+        return mask
+
+    def select(self, status=None, task_type=None, q=None, sort=None):
+        """Row positions matching the filters, in the requested order"""
+        mask = np.ones(self.rows, dtype=bool)
+        if status:
+            mask &= self._mask_for(self.by_status, status)
+        if task_type:
+            mask &= self._mask_for(self.by_task_type, task_type)
+        if q:
+            term = q.strip().lower()
+            if term:
+                mask &= self._search_mask(term)
+
+        if not sort:
+            return np.flatnonzero(mask)
+
+        column = sort.lstrip('-')
+        if column not in self.columns:
+            raise QueryError(f"Cannot sort by unknown column '{column}'")
+        order = self.order(column, descending=sort.startswith('-'))
+        return order[mask[order]]
+
+
+data_store.register_derived('submission_query', SubmissionQueryIndex.build)
+
+
+def is_query(args):
+    """Whether request args ask for the paginated view (other args, like cache busters, don't)"""
+    return any(name in args for name in QUERY_ARGS)
+
+
+def parse_page(args):
+    """Read and validate `page` and `page_size` from request args"""
+    try:
+        page = int(args.get('page', 1))
+        page_size = int(args.get('page_size', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise QueryError('page and page_size must be integers')
+    if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+        raise QueryError(f'page must be >= 1 and page_size between 1 and {MAX_PAGE_SIZE}')
+    return page, page_size
+
+
+def select_positions(snapshot, args):
+    """Row positions of the submissions matching the list-view filters in request args, sorted"""
+    index = snapshot.derived('submission_query')
+    return index.select(
+        status=args.get('status'),
+        task_type=args.get('task_type'),
+        q=args.get('q'),
+        sort=args.get('sort'),
+    )
+
+
+def query_submissions(snapshot, args):
+    """Filter, sort and paginate submissions according to request args.
+
+    Returns (page_df, total, page, page_size).
+    """
+    page, page_size = parse_page(args)
+    positions = select_positions(snapshot, args)
+    start = (page - 1) * page_size
+    return snapshot.submissions.take(positions[start:start + page_size]), len(positions), page, page_size
@@ -0,0 +1,132 @@
+from collections import Counter
+from datetime import date, timedelta
+from src.services import aggregates, data_store, schema
+
+GRANULARITIES = ('day', 'week', 'month')
+
+# Breakdown name -> position of that dimension in an aggregates key
+BREAKDOWNS = {
+    'task_type': aggregates.DIMENSIONS.index(schema.TASK_TYPE),
+    'status': aggregates.DIMENSIONS.index(schema.STATUS),
+    'reviewer': aggregates.DIMENSIONS.index(schema.NAME),
+}
+
+_DATE = aggregates.DIMENSIONS.index('Date')
+
+
+class TrendError(ValueError):
+    """Raised for invalid trend parameters"""
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket `day` falls in (weeks start on Monday)"""
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _roll_up(daily, granularity):
+    """Merge per-day counters into per-bucket counters"""
+    buckets = {}
+    for day, counts in daily.items():
+        start = bucket_start(day, granularity)
+        if start in buckets:
+            buckets[start] = buckets[start] + counts
+        else:
+            buckets[start] = Counter(counts)
+    return buckets
+
+
+class TrendRollups:
+    """Submission counts per time bucket, for every granularity and breakdown.
+
+    Built from the snapshot's aggregates, whose dates were parsed once at load,
+    so no request touches the timestamps. `daily[breakdown][day]` counts the
+    breakdown values on one day (breakdown None is the plain total, keyed None);
+    `buckets[granularity][breakdown]` holds the same rolled up to bucket starts.
+    """
+
+    def __init__(self, daily):
+        self.daily = daily
+        self.buckets = {
+            granularity: {breakdown: _roll_up(days, granularity) for breakdown, days in daily.items()}
+            for granularity in GRANULARITIES
+        }
+
+    @classmethod
+    def build(cls, snapshot):
+        return cls.from_aggregates(aggregates.get_aggregates(snapshot))
+
+    @classmethod
+    def from_aggregates(cls, summary):
+        counts = summary.counts
+        daily = {breakdown: {} for breakdown in (None, *BREAKDOWNS)}
+        for key, count in counts.items():
+            day = key[_DATE]
+            if day is None:
+                continue
+            daily[None].setdefault(day, Counter())[None] += count
+            for breakdown, position in BREAKDOWNS.items():
+                daily[breakdown].setdefault(day, Counter())[key[position]] += count
+        return cls(daily)
+
+    def series(self, granularity='day', breakdown=None, start=None, end=None):
+        """Bucketed counts, oldest first, optionally limited to days in [start, end]"""
+        if start is None and end is None:
+            buckets = self.buckets[granularity][breakdown]
+        else:
+            # Edge buckets may be partial, so re-roll just the days in range
+            days = {
+                day: counts for day, counts in self.daily[breakdown].items()
+                if (start is None or day >= start) and (end is None or day <= end)
+            }
+            buckets = _roll_up(days, granularity)
+
+        result = []
+        for period, counts in sorted(buckets.items()):
+            point = {'period': period.isoformat(), 'count': sum(counts.values())}
+            if breakdown is not None:
+                point['breakdown'] = {str(value) if value is not None else 'Unknown': count for value, count in counts.items()}
+            result.append(point)
+        return result
+
+
+data_store.register_derived('trends', TrendRollups.build)
+
+
+def _parse_date(args, name):
+    value = args.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value.strip())
+    except ValueError:
+        raise TrendError(f'{name} must be a date in YYYY-MM-DD format')
+
+
+def query_trend(snapshot, args):
+    """Trend series for request args `granularity`, `breakdown`, `start` and `end`"""
+    return query_rollups(snapshot.derived('trends'), args)
+
+
+def query_rollups(rollups, args):
+    """Trend series from the given TrendRollups for request args (see query_trend)"""
+    granularity = args.get('granularity', 'day').strip().lower()
+    if granularity not in GRANULARITIES:
+        raise TrendError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+    breakdown = args.get('breakdown', '').strip().lower() or None
+    if breakdown is not None and breakdown not in BREAKDOWNS:
+        raise TrendError(f"breakdown must be one of: {', '.join(BREAKDOWNS)}")
+    start, end = _parse_date(args, 'start'), _parse_date(args, 'end')
+    if start is not None and end is not None and start > end:
+        raise TrendError('start must not be after end')
+
+    return {
+        'granularity': granularity,
+        'breakdown': breakdown,
+        'start': start.isoformat() if start else None,
+        'end': end.isoformat() if end else None,
+        'series': rollups.series(granularity, breakdown, start, end),
+    }
@@ -0,0 +1,64 @@
+import pandas as pd
+from src.services import data_store, reviewer_resolver, schema
+
+
+def normalize_email(email):
+    """Normalize an email address for lookups (surrounding whitespace and case don't matter)"""
+    return str(email).strip().casefold()
+
+
+def _clean(value):
+    if value is None or pd.isna(value):
+        return None
+    return str(value).strip()
+
+
+class UserDirectory:
+    """Users sheet as a hash map from normalized email to the signed-in user record"""
+
+    def __init__(self, users):
+        self.users = users
+
+    @classmethod
+    def build(cls, snapshot):
+        users_df = snapshot.users
+
+        # Reviewer names were matched to emails once for this snapshot
+        resolver = reviewer_resolver.get_resolver(snapshot)
+
+        users = {}
+        for email, role in zip(users_df[schema.EMAIL], users_df[schema.ROLE]):
+            email = _clean(email)
+            if not email:
+                continue
+            # The first row for an address wins
+            users.setdefault(normalize_email(email), {
+                'email': email,
+                'role': _clean(role),
+                'name': resolver.name_for(email),
+            })
+        return cls(users)
+
+    def lookup(self, email):
+        """User record for an email address, or None if it isn't authorized"""
+        if not email:
+            return None
+        return self.users.get(normalize_email(email))
+
+    def __contains__(self, email):
+        return self.lookup(email) is not None
+
+
+data_store.register_derived('user_directory', UserDirectory.build)
+
+
+def get_directory(snapshot=None):
+    """User directory for the given (or current) snapshot"""
+    snapshot = snapshot or data_store.store.snapshot()
+    return snapshot.derived('user_directory')
+
+
+def reviewer_name(snapshot, user):
+    """Submission `Name` of a signed-in user, or None if their email didn't resolve to one"""
+    record = get_directory(snapshot).lookup(user.get('email'))
+    return record['name'] if record else None
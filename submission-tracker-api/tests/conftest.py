@@ -0,0 +1,69 @@
+import os
+import sys
+import tempfile
+
+# Make the src and benchmarks packages importable, as src/main.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep the services away from the real cache, session and database files
+_scratch = tempfile.mkdtemp(prefix='submission-tracker-tests-')
+os.environ['DATA_CACHE_DIR'] = os.path.join(_scratch, 'cache')
+os.environ['WORKBOOK_PATH'] = os.path.join(_scratch, 'workbook.xlsx')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_scratch, 'submissions.db')}"
+os.environ['SESSION_BACKEND'] = 'memory'
+os.environ['SESSION_DB_PATH'] = os.path.join(_scratch, 'sessions.db')
+os.environ.pop('WEB_CONCURRENCY', None)
+os.environ.pop('DATA_BACKEND', None)
+os.environ.pop('METRICS_TOKEN', None)
+os.environ.pop('METRICS_PUBLIC', None)
+
+import pytest
+from benchmarks import synthetic_workbook
+from src.services import data_store, ingest
+
+
+def make_frames(rows, reviewers=6, seed=0):
+    """Normalized (submissions_df, users_df) shaped like the production sheets"""
+    submissions_df, users_df = synthetic_workbook.generate(rows, reviewers, seed)
+    return (
+        ingest.normalize_sheet(submissions_df, data_store.SUBMISSIONS_SHEET),
+        ingest.normalize_sheet(users_df, data_store.USERS_SHEET),
+    )
+
+
+def build_all(snapshot):
+    """Compute every registered derived structure of a snapshot"""
+    for name in data_store._derivations:
+        snapshot.derived(name)
+    return snapshot
+
+
+@pytest.fixture(scope='session')
+def frames():
+    return make_frames(3000)
+
+
+# Reviewers of the workbook the app fixture serves, and the users signing in as them
+REVIEWERS = synthetic_workbook.reviewer_names(6)
+ADMIN_EMAIL = 'admin1@example.com'
+USER_EMAIL = f"{REVIEWERS[0].lower().replace(' ', '.')}@example.com"
+
+
+@pytest.fixture(scope='session')
+def app():
+    """src.main's app, serving a synthetic workbook written before it is imported"""
+    assert data_store.EXCEL_FILE_PATH.startswith(_scratch)
+    synthetic_workbook.write_workbook(data_store.EXCEL_FILE_PATH, *synthetic_workbook.generate(2000, len(REVIEWERS), 0))
+    from src.main import app
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def signin(client, email):
+    response = client.post('/api/auth/signin', json={'email': email})
+    assert response.status_code == 200
+    return response.get_json()['user']
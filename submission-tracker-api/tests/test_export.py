@@ -0,0 +1,78 @@
+import io
+import json
+import pandas as pd
+import pytest
+from conftest import ADMIN_EMAIL, REVIEWERS, USER_EMAIL, signin
+from src.services import data_store, export, schema
+
+URL = '/api/submissions/export'
+
+
+@pytest.fixture
+def submissions(app):
+    return data_store.store.snapshot().submissions
+
+
+def _ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def test_signin_required(client):
+    assert client.get(URL).status_code == 401
+
+
+def test_users_only_export_their_own_rows(client, submissions):
+    signin(client, USER_EMAIL)
+    response = client.get(URL, query_string={'format': 'ndjson'})
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    rows = _ndjson(response)
+    own = (submissions[schema.NAME] == REVIEWERS[0]).sum()
+    assert own > 0
+    assert len(rows) == own == int(response.headers['X-Total-Count'])
+    assert {row[schema.NAME] for row in rows} == {REVIEWERS[0]}
+
+
+def test_user_filters_apply_within_their_own_rows(client, submissions):
+    signin(client, USER_EMAIL)
+    rows = _ndjson(client.get(URL, query_string={'format': 'ndjson', 'status': 'Rejected'}))
+    expected = ((submissions[schema.NAME] == REVIEWERS[0]) & (submissions[schema.STATUS] == 'Rejected')).sum()
+    assert len(rows) == expected
+    assert {(row[schema.NAME], row[schema.STATUS]) for row in rows} == {(REVIEWERS[0], 'Rejected')}
+
+
+def test_unresolved_users_export_nothing(app):
+    snapshot = data_store.store.snapshot()
+    user = {'email': 'nobody@example.com', 'role': 'user'}
+    assert len(export.export_positions(snapshot, user, {})) == 0
+
+
+def test_admins_export_every_row_as_csv(client, submissions):
+    signin(client, ADMIN_EMAIL)
+    response = client.get(URL)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/csv'
+    assert response.headers['Content-Disposition'] == 'attachment; filename=submissions.csv'
+    df = pd.read_csv(io.StringIO(response.get_data(as_text=True)))
+    assert list(df.columns) == list(submissions.columns)
+    assert len(df) == len(submissions) == int(response.headers['X-Total-Count'])
+    assert list(df[schema.NAME].fillna('')) == list(submissions[schema.NAME].astype(object).fillna(''))
+
+
+def test_format_is_case_insensitive(client):
+    signin(client, ADMIN_EMAIL)
+    assert client.get(URL, query_string={'format': ' NDJSON '}).mimetype == 'application/x-ndjson'
+
+
+@pytest.mark.parametrize('query', [{'format': 'xml'}, {'format': ''}, {'sort': 'Nope'}])
+def test_bad_parameters_are_rejected(client, query):
+    signin(client, USER_EMAIL)
+    response = client.get(URL, query_string=query)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_parse_format():
+    assert export.parse_format({}) == 'csv'
+    with pytest.raises(export.ExportError, match='csv, ndjson'):
+        export.parse_format({'format': 'json'})
@@ -0,0 +1,81 @@
+import gzip
+import json
+import brotli
+import pytest
+from conftest import ADMIN_EMAIL, USER_EMAIL, signin
+from src.services import http_cache
+
+URL = '/api/submissions?page_size=100'
+
+
+@pytest.fixture
+def admin(client):
+    signin(client, ADMIN_EMAIL)
+    return client
+
+
+def test_matching_etag_returns_304(admin):
+    response = admin.get(URL)
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.headers['Last-Modified']
+
+    revalidated = admin.get(URL, headers={'If-None-Match': etag})
+    assert revalidated.status_code == 304
+    assert revalidated.data == b''
+    assert revalidated.headers['ETag'] == etag
+    assert admin.get(URL, headers={'If-None-Match': 'W/"stale"'}).status_code == 200
+
+
+def test_etag_depends_on_path_and_user(client):
+    signin(client, ADMIN_EMAIL)
+    admin_etag = client.get(URL).headers['ETag']
+    assert client.get('/api/submissions?page_size=50').headers['ETag'] != admin_etag
+
+    client.post('/api/auth/signout')
+    signin(client, USER_EMAIL)
+    mine = client.get('/api/submissions/my')
+    assert mine.status_code == 200
+    assert client.get('/api/submissions/my', headers={'If-None-Match': admin_etag}).status_code == 200
+
+
+@pytest.mark.parametrize('url', [URL, '/api/analytics/summary'])
+def test_responses_are_private(admin, url):
+    for response in (admin.get(url), admin.get(url, headers={'If-None-Match': admin.get(url).headers['ETag']})):
+        assert response.headers['Cache-Control'] == http_cache.CACHE_CONTROL
+        assert set(http_cache.VARY) <= set(response.vary)
+
+
+def test_streamed_exports_are_private(admin):
+    response = admin.get('/api/submissions/export?format=csv')
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == http_cache.CACHE_CONTROL
+    assert 'ETag' not in response.headers
+
+
+@pytest.mark.parametrize('accept, encoding, decompress', [
+    ('gzip, br', 'br', brotli.decompress),
+    ('br;q=0, gzip', 'gzip', gzip.decompress),
+    ('gzip', 'gzip', gzip.decompress),
+])
+def test_compression_is_negotiated(admin, accept, encoding, decompress):
+    plain = admin.get(URL)
+    assert 'Content-Encoding' not in plain.headers
+
+    response = admin.get(URL, headers={'Accept-Encoding': accept})
+    assert response.headers['Content-Encoding'] == encoding
+    assert decompress(response.data) == plain.data
+    assert json.loads(decompress(response.data))['page_size'] == 100
+
+
+def test_gzip_only_without_brotli(admin, monkeypatch):
+    monkeypatch.setattr(http_cache, 'brotli', None)
+    response = admin.get(URL, headers={'Accept-Encoding': 'br, gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+
+
+def test_small_bodies_are_not_compressed(admin):
+    response = admin.get('/api/analytics/summary', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert len(response.data) < http_cache.MIN_COMPRESS_SIZE
+    assert 'Content-Encoding' not in response.headers
@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import build_all
+from src.services import aggregates, data_store, reviewer_index, reviewer_resolver, reviewer_stats, schema, search_index, submission_query, trends, user_directory
+
+QUERIES = ('lane', 'traffic light', 'guidance gap', 'ahmed', 'npc yield', 'ml ranker fp')
+
+
+def _snapshot(submissions_df, users_df, version=None):
+    return data_store.DataSnapshot(submissions_df, users_df, version)
+
+
+def _extended(frames, start):
+    """Snapshot of all rows whose derived structures were extended from the first `start` rows"""
+    submissions_df, users_df = frames
+    previous = build_all(_snapshot(submissions_df.iloc[:start], users_df, (1, start)))
+    snapshot = _snapshot(submissions_df, users_df, (2, len(submissions_df)))
+    snapshot.derive_from(previous)
+    return snapshot
+
+
+def assert_same_structures(actual, expected):
+    """Compare every derived structure of two snapshots through what the endpoints read"""
+    a, e = aggregates.get_aggregates(actual), aggregates.get_aggregates(expected)
+    assert a.counts == e.counts
+    assert a.last_submission == e.last_submission
+    assert a.rows == e.rows
+    assert a.rejection_by_task_type() == e.rejection_by_task_type()
+    assert a.daily_trend() == e.daily_trend()
+
+    a_index, e_index = actual.derived('reviewer_index'), expected.derived('reviewer_index')
+    assert a_index.by_name.keys() == e_index.by_name.keys()
+    for name, positions in e_index.by_name.items():
+        np.testing.assert_array_equal(a_index.positions(name), positions)
+        pd.testing.assert_frame_equal(reviewer_index.submissions_for_name(actual, name), reviewer_index.submissions_for_name(expected, name))
+
+    for query in QUERIES:
+        assert search_index.search_submissions(actual, query, 50) == search_index.search_submissions(expected, query, 50)
+
+    a_resolver, e_resolver = reviewer_resolver.get_resolver(actual), reviewer_resolver.get_resolver(expected)
+    assert a_resolver.resolutions == e_resolver.resolutions
+    assert a_resolver.conflicts == e_resolver.conflicts
+    assert user_directory.get_directory(actual).users == user_directory.get_directory(expected).users
+
+    for granularity in trends.GRANULARITIES:
+        for breakdown in (None, *trends.BREAKDOWNS):
+            assert actual.derived('trends').series(granularity, breakdown) == expected.derived('trends').series(granularity, breakdown)
+
+    assert reviewer_stats.get_table(actual).rows == reviewer_stats.get_table(expected).rows
+
+    args = {'status': 'Rejected', 'q': 'lane', 'sort': '-Timestamp'}
+    np.testing.assert_array_equal(submission_query.select_positions(actual, args), submission_query.select_positions(expected, args))
+
+
+@pytest.mark.parametrize('start', [1, 1500, 2999])
+def test_extend_matches_rebuild(frames, start):
+    snapshot = _extended(frames, start)
+    rebuilt = _snapshot(*frames)
+    assert_same_structures(snapshot, rebuilt)
+
+
+def test_extend_counts_only_the_appended_rows(frames, monkeypatch):
+    submissions_df, users_df = frames
+    previous = build_all(_snapshot(submissions_df.iloc[:2000], users_df))
+    counted = []
+    count_frame = aggregates.count_frame
+
+    def recording_count_frame(df):
+        counted.append(len(df))
+        return count_frame(df)
+
+    monkeypatch.setattr(aggregates, 'count_frame', recording_count_frame)
+    _snapshot(submissions_df, users_df).derive_from(previous)
+    assert counted == [len(submissions_df) - 2000]
+
+
+def test_appended_from_accepts_a_pure_append(frames):
+    submissions_df, users_df = frames
+    previous = _snapshot(submissions_df.iloc[:2000], users_df)
+    assert data_store.appended_from(previous, _snapshot(submissions_df, users_df)) == 2000
+    assert data_store.appended_from(previous, _snapshot(submissions_df.iloc[:2000], users_df)) == 2000
+
+
+def _edited(df, position, column, value):
+    """Copy of `df` with one cell changed, typed as a fresh parse of the edited sheet would be"""
+    df = df.copy()
+    values = df[column].astype(object)
+    values.iloc[position] = value
+    df[column] = values.astype('category') if isinstance(df[column].dtype, pd.CategoricalDtype) else values.astype(df[column].dtype)
+    return df
+
+
+@pytest.mark.parametrize('position, column, value', [
+    (10, schema.STATUS, 'Accepted'),
+    (1999, schema.NAME, 'Someone Else'),
+    (500, schema.MISTAKE, None),
+])
+def test_appended_from_rejects_edited_rows(frames, position, column, value):
+    submissions_df, users_df = frames
+    previous = _snapshot(submissions_df.iloc[:2000], users_df)
+    original = submissions_df.iloc[position][column]
+    if original == value or (pd.isna(original) and value is None):
+        value = 'Rejected' if column == schema.STATUS else 'Edited'
+    edited = _edited(submissions_df, position, column, value)
+    assert data_store.appended_from(previous, _snapshot(edited, users_df)) is None
+
+
+def test_appended_from_rejects_removed_rows_and_user_changes(frames):
+    submissions_df, users_df = frames
+    previous = _snapshot(submissions_df.iloc[:2000], users_df)
+    assert data_store.appended_from(previous, _snapshot(submissions_df.iloc[:1999], users_df)) is None
+    assert data_store.appended_from(previous, _snapshot(submissions_df.iloc[1:], users_df)) is None
+    assert data_store.appended_from(previous, _snapshot(submissions_df, users_df.iloc[:-1])) is None
+
+
+def test_edited_rows_fall_back_to_a_full_rebuild(frames, monkeypatch):
+    submissions_df, users_df = frames
+    previous = build_all(_snapshot(submissions_df.iloc[:2000], users_df))
+    edited = _edited(submissions_df, 42, schema.NAME, 'Someone Else')
+
+    extended = []
+
+    def recording(name, extend):
+        def wrapper(*args):
+            extended.append(name)
+            return extend(*args)
+        return wrapper
+
+    derivations = {name: (build, extend and recording(name, extend)) for name, (build, extend) in data_store._derivations.items()}
+    monkeypatch.setattr(data_store, '_derivations', derivations)
+    snapshot = _snapshot(edited, users_df)
+    snapshot.derive_from(previous)
+    assert extended == []
+    assert 'Someone Else' in aggregates.get_aggregates(snapshot).reviewers
+    assert_same_structures(snapshot, _snapshot(edited, users_df))
@@ -0,0 +1,73 @@
+import pytest
+from benchmarks import synthetic_workbook
+from src.services import ingest, serialization
+
+
+@pytest.fixture(scope='module')
+def workbook(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('ingest') / 'workbook.xlsx')
+    synthetic_workbook.write_workbook(path, *synthetic_workbook.generate(300, 5, 3))
+    return path
+
+
+def _json(sheets):
+    return [serialization.frame_to_json(df) for df in sheets]
+
+
+@pytest.fixture
+def failing_calamine(monkeypatch):
+    """Make every calamine read fail; returns the engines _read was called with"""
+    engines = []
+    read = ingest._read
+
+    def _read(path, engine):
+        engines.append(engine)
+        if engine == 'calamine':
+            raise ValueError('corrupt shared strings')
+        return read(path, engine)
+
+    monkeypatch.setattr(ingest, '_read', _read)
+    return engines
+
+
+def test_engines_read_the_same_frames(workbook):
+    calamine = ingest.read_workbook(workbook, 'calamine')
+    openpyxl = ingest.read_workbook(workbook, 'openpyxl')
+    assert _json(calamine) == _json(openpyxl)
+    assert len(calamine[0]) == 300
+
+
+def test_calamine_failure_falls_back_to_openpyxl(workbook, failing_calamine, capsys):
+    sheets = ingest.read_workbook(workbook, 'calamine')
+    assert failing_calamine == ['calamine', 'openpyxl']
+    assert _json(sheets) == _json(ingest.read_workbook(workbook, 'openpyxl'))
+    out = capsys.readouterr().out
+    assert 'Error reading workbook with calamine, falling back to openpyxl: corrupt shared strings' in out
+    assert 'with openpyxl in' in out
+
+
+def test_openpyxl_failure_is_raised(tmp_path):
+    path = tmp_path / 'broken.xlsx'
+    path.write_bytes(b'not a zip file')
+    with pytest.raises(Exception):
+        ingest.read_workbook(str(path), 'openpyxl')
+
+
+def test_broken_file_fails_on_both_engines(tmp_path, failing_calamine):
+    path = tmp_path / 'broken.xlsx'
+    path.write_bytes(b'not a zip file')
+    with pytest.raises(Exception):
+        ingest.read_workbook(str(path), 'calamine')
+    assert failing_calamine == ['calamine', 'openpyxl']
+
+
+@pytest.mark.parametrize('configured, installed, engine', [
+    (None, True, 'calamine'),
+    (None, False, 'openpyxl'),
+    ('openpyxl', True, 'openpyxl'),
+    ('xlrd', True, 'openpyxl'),
+])
+def test_default_engine(monkeypatch, configured, installed, engine):
+    monkeypatch.setattr(ingest, 'ENGINE', configured)
+    monkeypatch.setattr(ingest, 'python_calamine', ingest.python_calamine if installed else None)
+    assert ingest.default_engine() == engine
@@ -0,0 +1,47 @@
+import pytest
+from conftest import ADMIN_EMAIL, USER_EMAIL, signin
+from src.services import data_store, reviewer_stats
+
+URL = '/api/analytics/leaderboard'
+
+
+@pytest.fixture
+def admin(client):
+    signin(client, ADMIN_EMAIL)
+    return client
+
+
+@pytest.mark.parametrize('query, message', [
+    ({'metric': 'speed'}, 'metric must be one of'),
+    ({'k': 'ten'}, 'k must be an integer'),
+    ({'k': '0'}, 'k must be between 1 and 100'),
+    ({'k': '-3'}, 'k must be between 1 and 100'),
+    ({'k': str(reviewer_stats.MAX_K + 1)}, 'k must be between 1 and 100'),
+])
+def test_bad_parameters_are_rejected(admin, query, message):
+    response = admin.get(URL, query_string=query)
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+def test_admin_only(client):
+    assert client.get(URL).status_code == 403
+    signin(client, USER_EMAIL)
+    assert client.get(URL).status_code == 403
+
+
+def test_top_k_by_metric(admin):
+    response = admin.get(URL, query_string={'metric': ' Rejected ', 'k': '3'})
+    assert response.status_code == 200
+    body = response.get_json()
+    rows = reviewer_stats.get_table(data_store.store.snapshot()).rows
+    expected = sorted(rows, key=lambda name: (-rows[name]['rejected_count'], name))[:3]
+    assert body['metric'] == 'rejected'
+    assert body['reviewers'] == len(rows)
+    assert [leader['name'] for leader in body['leaders']] == expected
+    assert [leader['rank'] for leader in body['leaders']] == [1, 2, 3]
+
+
+def test_defaults(admin):
+    body = admin.get(URL, query_string={'k': ' '}).get_json()
+    assert (body['metric'], body['k']) == (reviewer_stats.DEFAULT_METRIC, reviewer_stats.DEFAULT_K)
@@ -0,0 +1,40 @@
+import pytest
+from conftest import ADMIN_EMAIL, USER_EMAIL, signin
+from src.services import metrics
+
+
+@pytest.fixture
+def scrape(client, monkeypatch):
+    """GET /api/metrics with the given token configuration and request headers"""
+    def scrape(token=None, public=False, headers=None):
+        monkeypatch.setattr(metrics, 'METRICS_TOKEN', token)
+        monkeypatch.setattr(metrics, 'METRICS_PUBLIC', public)
+        return client.get('/api/metrics', headers=headers or {})
+    return scrape
+
+
+def test_anonymous_scrape_is_refused_by_default(scrape):
+    assert scrape().status_code == 401
+
+
+def test_signed_in_user_is_refused(client, scrape):
+    signin(client, USER_EMAIL)
+    assert scrape().status_code == 401
+
+
+def test_admin_may_scrape(client, scrape):
+    signin(client, ADMIN_EMAIL)
+    response = scrape()
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    assert b'http_request_duration_seconds' in response.data
+
+
+def test_token(scrape):
+    assert scrape(token='secret', headers={'Authorization': 'Bearer secret'}).status_code == 200
+    assert scrape(token='secret', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+    assert scrape(token='secret').status_code == 401
+
+
+def test_public_scrape_when_configured(scrape):
+    assert scrape(public=True).status_code == 200
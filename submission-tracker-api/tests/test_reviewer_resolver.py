@@ -0,0 +1,98 @@
+import pandas as pd
+import pytest
+from src.services import data_store, reviewer_resolver, schema, user_directory
+
+REVIEWERS = ('Omar Yasser', 'Omar Shaban', 'Ahmed Ashraf', 'Magdy', 'Mahmoud Bayoumi', 'Tarek Hussin')
+
+
+def _snapshot(users):
+    """Snapshot with one submission per reviewer and a Users sheet of (email, sheet name) pairs"""
+    submissions = pd.DataFrame({column: pd.Series([None] * len(REVIEWERS), dtype=object) for column in schema.SUBMISSION_FIELDS})
+    submissions[schema.NAME] = list(REVIEWERS)
+    submissions[schema.TIMESTAMP] = pd.date_range('2025-06-01', periods=len(REVIEWERS), freq='h')
+    users_df = pd.DataFrame({
+        schema.EMAIL: [email for email, _ in users],
+        schema.ROLE: ['user'] * len(users),
+        schema.NAME: [name for _, name in users],
+    })
+    return data_store.DataSnapshot(submissions, users_df, None)
+
+
+def _resolve(*users):
+    return reviewer_resolver.get_resolver(_snapshot(users))
+
+
+@pytest.mark.parametrize('email, sheet_name, name, method', [
+    # The Users sheet names the reviewer
+    ('someone@example.com', 'Tarek Hussin', 'Tarek Hussin', 'exact'),
+    # The local part is the whole name, or one whole word of it
+    ('magdy@example.com', None, 'Magdy', 'prefix'),
+    ('MAGDY@example.com', None, 'Magdy', 'prefix'),
+    ('yasser@example.com', None, 'Omar Yasser', 'prefix'),
+    ('bayoumi@example.com', None, 'Mahmoud Bayoumi', 'prefix'),
+    # Letters-only keys of the local part or the sheet name
+    ('omar.shaban@example.com', None, 'Omar Shaban', 'fuzzy'),
+    ('ahmed_ashraf1@example.com', None, 'Ahmed Ashraf', 'fuzzy'),
+    ('someone@example.com', 'ahmed-ashraf', 'Ahmed Ashraf', 'fuzzy'),
+])
+def test_resolution_tiers(email, sheet_name, name, method):
+    resolver = _resolve((email, sheet_name))
+    assert resolver.resolve(email) == {'email': email, 'name': name, 'method': method}
+    assert resolver.name_for(f'  {email.upper()} ') == name
+    assert resolver.conflicts == []
+
+
+def test_exact_wins_over_weaker_tiers():
+    resolver = _resolve(('omar@example.com', 'Omar Shaban'))
+    assert resolver.resolve('omar@example.com')['method'] == 'exact'
+    assert resolver.name_for('omar@example.com') == 'Omar Shaban'
+
+
+@pytest.mark.parametrize('local_part, names', [
+    ('yas', ['Omar Yasser']),
+    ('ash', ['Ahmed Ashraf']),
+    ('bay', ['Mahmoud Bayoumi']),
+    ('mag', ['Magdy']),
+])
+def test_partial_words_are_reported_not_resolved(local_part, names):
+    email = f'{local_part}@example.com'
+    resolver = _resolve((email, None))
+    assert resolver.name_for(email) is None
+    assert resolver.conflicts == [{'email': email, 'reason': 'partial name match', 'names': names}]
+
+
+def test_short_local_parts_never_match():
+    resolver = _resolve(('om@example.com', None))
+    assert resolver.name_for('om@example.com') is None
+    assert resolver.conflicts == []
+
+
+def test_ambiguous_tier_is_a_conflict():
+    resolver = _resolve(('omar@example.com', None))
+    assert resolver.name_for('omar@example.com') is None
+    assert resolver.conflicts == [{'email': 'omar@example.com', 'reason': 'ambiguous prefix match', 'names': ['Omar Shaban', 'Omar Yasser']}]
+
+
+def test_reviewer_claimed_by_several_users_is_a_conflict():
+    resolver = _resolve(('magdy@example.com', None), ('other@example.com', 'Magdy'))
+    assert resolver.name_for('magdy@example.com') == 'Magdy'
+    assert resolver.name_for('other@example.com') == 'Magdy'
+    assert resolver.conflicts == [{'email': 'magdy@example.com, other@example.com', 'reason': 'reviewer claimed by several users', 'names': ['Magdy']}]
+
+
+def test_first_row_for_an_email_wins():
+    resolver = _resolve(('magdy@example.com', None), ('Magdy@Example.com', 'Tarek Hussin'))
+    assert list(resolver.resolutions) == ['magdy@example.com']
+    assert resolver.name_for('magdy@example.com') == 'Magdy'
+
+
+def test_unknown_email_is_not_a_user():
+    resolver = _resolve(('magdy@example.com', None))
+    assert resolver.resolve('nobody@example.com') is None
+    assert resolver.resolve('') is None
+
+
+def test_user_directory_uses_the_resolution():
+    snapshot = _snapshot([('yasser@example.com', None), ('yas@example.com', None)])
+    assert user_directory.reviewer_name(snapshot, {'email': 'yasser@example.com'}) == 'Omar Yasser'
+    assert user_directory.reviewer_name(snapshot, {'email': 'yas@example.com'}) is None
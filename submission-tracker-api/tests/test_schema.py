@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+from src.services import schema
+
+
+@pytest.mark.parametrize('header, name', [
+    ('Timestamp', schema.TIMESTAMP),
+    ('  Task Type ', schema.TASK_TYPE),
+    ('Reviewer Name', schema.NAME),
+    ('GULP Link', '"GULP" Link'),
+    ('Miner/Slicer Name', 'Miner/ Slicer Name'),
+    ('In your opinion, what is the reason for reviewer mistake?', schema.MISTAKE),
+    ('Are the QC and Reviewer aligned on the same answer', schema.ALIGNED),
+    # Case, whitespace and punctuation don't matter
+    ('task-type', schema.TASK_TYPE),
+    ('IS THIS REJECTED (slice/miner)', schema.STATUS),
+    ('leader  name:', schema.LEADER_NAME),
+])
+def test_submission_headers_map_to_canonical_names(header, name):
+    df = schema.normalize(pd.DataFrame({header: ['x']}), schema.SUBMISSION_FIELDS, 'Submissions')
+    assert name in df.columns
+    assert header not in df.columns or header == name
+
+
+def test_user_headers():
+    df = schema.normalize(pd.DataFrame({'E-mail': ['a@b.c'], ' role ': ['user '], 'reviewer name': ['A']}), schema.USER_FIELDS, 'Users')
+    assert list(df.columns) == [schema.EMAIL, schema.ROLE, schema.NAME]
+    # Cells are kept as read
+    assert df[schema.ROLE].tolist() == ['user ']
+
+
+def test_unknown_headers_are_kept_stripped():
+    df = schema.normalize(pd.DataFrame({' Extra ': [1]}), schema.USER_FIELDS, 'Users')
+    assert 'Extra' in df.columns
+
+
+def test_canonical_header_wins_over_a_variant(capsys):
+    raw = pd.DataFrame({'Reviewer Name': ['variant'], 'Name': ['canonical']})
+    df = schema.normalize(raw, schema.SUBMISSION_FIELDS, 'Submissions')
+    assert df[schema.NAME].tolist() == ['canonical']
+    assert df['Reviewer Name'].tolist() == ['variant']
+    assert "both map to 'Name'" in capsys.readouterr().out
+
+
+def test_first_of_two_variants_wins(capsys):
+    raw = pd.DataFrame({'Comments': ['first'], 'comment!': ['second']})
+    df = schema.normalize(raw, schema.SUBMISSION_FIELDS, 'Submissions')
+    assert df[schema.COMMENT].tolist() == ['first']
+    assert df['comment!'].tolist() == ['second']
+    assert 'Schema warning' in capsys.readouterr().out
+
+
+def test_missing_required_fields_are_added_empty(capsys):
+    df = schema.normalize(pd.DataFrame({'Timestamp': ['2025-06-01 10:00']}), schema.SUBMISSION_FIELDS, 'Submissions')
+    required = [field.name for field in schema.SUBMISSION_FIELDS if field.required]
+    assert set(required) <= set(df.columns)
+    assert df[schema.STATUS].isna().all()
+    # Optional fields aren't added
+    assert 'Road Event' not in df.columns
+    assert f"has no {schema.STATUS!r} column" in capsys.readouterr().out
+
+
+def test_field_dtypes():
+    raw = pd.DataFrame({'Timestamp': ['2025-06-01 10:00', 'not a date'], 'Task Type': ['Miner', 'Slice'], 'Road Event': ['a', 'b']})
+    df = schema.normalize(raw, schema.SUBMISSION_FIELDS, 'Submissions')
+    assert pd.api.types.is_datetime64_any_dtype(df[schema.TIMESTAMP])
+    assert df[schema.TIMESTAMP].isna().tolist() == [False, True]
+    assert isinstance(df[schema.TASK_TYPE].dtype, pd.CategoricalDtype)
+    assert not isinstance(df['Road Event'].dtype, pd.CategoricalDtype)
+
+
+def test_header_matcher():
+    matches = schema.header_matcher(schema.SUBMISSION_FIELDS)
+    assert matches('Task Type') and matches(' task-type ') and matches('GULP Link')
+    assert not matches('Unrelated column')
+
+
+def test_empty_frame():
+    df = schema.empty_frame(schema.SUBMISSION_FIELDS)
+    assert len(df) == 0
+    assert list(df.columns) == [field.name for field in schema.SUBMISSION_FIELDS if field.required]
+    assert pd.api.types.is_datetime64_any_dtype(df[schema.TIMESTAMP])
@@ -0,0 +1,134 @@
+import os
+import pytest
+from src.services import session_store
+
+USER = {'email': 'someone@example.com', 'role': 'user', 'name': 'Someone'}
+
+
+class Clock:
+    """Stand-in for the time module: time() is set by hand and sleep() advances it"""
+
+    def __init__(self, now=1000.0, sleeps=None):
+        self.now = now
+        self.sleeps = sleeps
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        if self.sleeps is not None:
+            if not self.sleeps:
+                raise StopIteration
+            self.sleeps -= 1
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(session_store, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def store(request, tmp_path, clock):
+    if request.param == 'memory':
+        return session_store.MemorySessionStore(ttl=60, max_entries=100)
+    return session_store.SQLiteSessionStore(str(tmp_path / 'sessions.db'), ttl=60)
+
+
+def test_sessions_expire_after_the_ttl(store, clock):
+    store.put('token', USER)
+    clock.now += 59
+    assert store.get('token') == USER
+    clock.now += 1
+    assert store.get('token') is None
+
+
+def test_delete(store):
+    store.put('token', USER)
+    store.delete('token')
+    store.delete('unknown')
+    assert store.get('token') is None
+
+
+def test_sweep_drops_only_expired_sessions(store, clock):
+    store.put('old', USER)
+    clock.now += 30
+    store.put('new', USER)
+    clock.now += 30
+    assert store.sweep() == 1
+    assert store.get('new') == USER
+    assert store.sweep() == 0
+
+
+def test_sqlite_sessions_are_shared_between_stores(tmp_path, clock):
+    path = str(tmp_path / 'sessions.db')
+    session_store.SQLiteSessionStore(path).put('token', USER)
+    assert session_store.SQLiteSessionStore(path).get('token') == USER
+
+
+def test_memory_store_evicts_the_least_recently_used(clock):
+    store = session_store.MemorySessionStore(ttl=60, max_entries=2)
+    store.put('a', USER)
+    store.put('b', USER)
+    # Reading 'a' makes 'b' the least recently used
+    assert store.get('a') == USER
+    store.put('c', USER)
+    assert store.get('b') is None
+    assert store.get('a') == USER
+    assert store.get('c') == USER
+
+
+def test_sweeper_sweeps_every_interval(monkeypatch, clock):
+    memory = session_store.MemorySessionStore(ttl=60)
+    memory.put('token', USER)
+    sweeps = []
+    monkeypatch.setattr(memory, 'sweep', lambda: sweeps.append(clock.now) or 0)
+    monkeypatch.setattr(session_store, 'store', memory)
+    clock.sleeps = 3
+    with pytest.raises(StopIteration):
+        session_store._sweep_forever()
+    interval = session_store.SWEEP_INTERVAL
+    assert sweeps == [1000.0 + interval, 1000.0 + 2 * interval, 1000.0 + 3 * interval]
+
+
+def test_sweeper_survives_errors(monkeypatch, clock, capsys):
+    def fail():
+        raise OSError('disk I/O error')
+
+    monkeypatch.setattr(session_store, 'store', session_store.MemorySessionStore())
+    monkeypatch.setattr(session_store.store, 'sweep', fail)
+    clock.sleeps = 2
+    with pytest.raises(StopIteration):
+        session_store._sweep_forever()
+    assert capsys.readouterr().out.count('Error sweeping sessions: disk I/O error') == 2
+
+
+def test_one_sweeper_per_process(monkeypatch):
+    started = []
+
+    class Thread:
+        def __init__(self, target, name, daemon):
+            self.target = target
+
+        def start(self):
+            started.append(self.target)
+
+    monkeypatch.setattr(session_store.threading, 'Thread', Thread)
+    monkeypatch.setattr(session_store, '_sweeper_pid', None)
+    session_store._ensure_sweeper()
+    session_store._ensure_sweeper()
+    assert started == [session_store._sweep_forever]
+
+    # A forked worker inherits the parent's pid marker but not its thread
+    monkeypatch.setattr(session_store, '_sweeper_pid', os.getpid() + 1)
+    session_store._ensure_sweeper()
+    assert len(started) == 2
+
+
+def test_memory_store_is_refused_for_several_workers(monkeypatch):
+    monkeypatch.delenv('SESSION_BACKEND')
+    assert isinstance(session_store.create_store(workers=1), session_store.MemorySessionStore)
+    with pytest.raises(RuntimeError):
+        session_store.create_store('memory', workers=4)
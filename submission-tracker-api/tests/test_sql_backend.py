@@ -0,0 +1,118 @@
+import os
+import pytest
+from flask import Flask
+from benchmarks import synthetic_workbook
+from src.models.user import db
+from src.services import aggregates, data_store, reviewer_index, reviewer_resolver, reviewer_stats, schema, serialization, sql_queries, sql_store, submission_query, trends, user_directory
+
+PAGE_ARGS = (
+    {},
+    {'page': '3', 'page_size': '20'},
+    {'sort': '-Timestamp', 'page_size': '100'},
+    {'sort': 'Name', 'page': '2'},
+    {'status': 'Rejected', 'q': 'lane', 'sort': '-Task Type'},
+    {'task_type': 'Miner', 'sort': 'Leader Name'},
+)
+
+TREND_ARGS = (
+    {},
+    {'granularity': 'week', 'breakdown': 'status'},
+    {'granularity': 'month', 'breakdown': 'reviewer'},
+    {'granularity': 'day', 'start': '2025-05-20', 'end': '2025-06-10'},
+)
+
+
+@pytest.fixture(scope='module')
+def snapshot(tmp_path_factory):
+    """In-memory snapshot of a workbook, inside an app context over its SQLite import"""
+    directory = tmp_path_factory.mktemp('sql_backend')
+    path = str(directory / 'submissions.xlsx')
+    submissions_df, users_df = synthetic_workbook.generate(1200, 8, 1)
+    # The real Users sheet has roles like 'user ' and mixed-case emails
+    users_df[schema.ROLE] = users_df[schema.ROLE] + ' '
+    users_df.loc[0, schema.EMAIL] = users_df.loc[0, schema.EMAIL].upper()
+    synthetic_workbook.write_workbook(path, submissions_df, users_df)
+
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{directory / 'submissions.db'}"
+    db.init_app(app)
+    with app.app_context():
+        sql_store.create_schema()
+        assert sql_store.sync(path)
+        yield data_store.DataSnapshot(*data_store.read_workbook(path), data_store.file_version(path))
+
+
+def test_import_matches_the_workbook(snapshot):
+    assert sql_queries.all_submissions().shape == snapshot.submissions.shape
+    assert serialization.frame_to_json(sql_queries.all_submissions()) == serialization.frame_to_json(snapshot.submissions)
+
+
+def test_aggregates_match(snapshot):
+    expected, actual = aggregates.get_aggregates(snapshot), sql_queries.get_aggregates()
+    assert actual.counts == expected.counts
+    assert actual.last_submission == expected.last_submission
+    assert actual.rejection_by_task_type() == expected.rejection_by_task_type()
+    assert actual.daily_trend() == expected.daily_trend()
+
+
+@pytest.mark.parametrize('args', PAGE_ARGS)
+def test_submission_pages_match(snapshot, args):
+    page_df, *page = sql_queries.query_submissions(args)
+    expected_df, *expected = submission_query.query_submissions(snapshot, args)
+    assert page == expected
+    assert serialization.frame_to_json(page_df) == serialization.frame_to_json(expected_df)
+
+
+def test_unknown_sort_column_is_rejected_by_both(snapshot):
+    with pytest.raises(submission_query.QueryError):
+        sql_queries.query_submissions({'sort': 'Nope'})
+    with pytest.raises(submission_query.QueryError):
+        submission_query.query_submissions(snapshot, {'sort': 'Nope'})
+
+
+def test_reviewer_submissions_and_stats_match(snapshot):
+    table = reviewer_stats.get_table(snapshot)
+    assert sql_queries.get_reviewer_stats().rows == table.rows
+    for name in table.rows:
+        assert serialization.frame_to_json(sql_queries.submissions_for_name(name)) == serialization.frame_to_json(reviewer_index.submissions_for_name(snapshot, name))
+
+
+@pytest.mark.parametrize('args', TREND_ARGS)
+def test_trends_match(snapshot, args):
+    assert sql_queries.query_trend(args) == trends.query_trend(snapshot, args)
+
+
+def test_users_sheet_matches(snapshot):
+    assert serialization.frame_to_json(sql_queries.users()) == serialization.frame_to_json(snapshot.users)
+    assert sql_queries.users()[schema.ROLE].str.endswith(' ').all()
+
+
+def test_users_and_reviewer_resolutions_match(snapshot):
+    directory = user_directory.get_directory(snapshot)
+    for email in [*snapshot.users['Email'], 'nobody@example.com', '']:
+        assert sql_queries.lookup_user(email) == directory.lookup(email)
+
+    resolver = reviewer_resolver.get_resolver(snapshot)
+    resolutions, conflicts = sql_queries.reviewer_resolutions()
+    assert resolutions == [
+        {'email': user['email'], 'name': user['name'], 'method': (resolver.resolve(user['email']) or {}).get('method')}
+        for user in directory.users.values()
+    ]
+    assert conflicts == resolver.conflicts
+
+
+def test_import_lock_is_next_to_the_database(snapshot):
+    database = db.engine.url.database
+    assert sql_store.lock_file() == f'{database}.import.lock'
+    assert os.path.exists(sql_store.lock_file())
+
+
+def test_unchanged_workbook_is_not_reimported(snapshot, tmp_path):
+    generation = sql_store.generation()
+    path = str(tmp_path / 'submissions.xlsx')
+    synthetic_workbook.write_workbook(path, *synthetic_workbook.generate(10, 2, 2))
+    assert sql_store.sync(path)
+    assert sql_store.generation() == generation + 1
+    assert not sql_store.sync(path)
+    assert sql_store.generation() == generation + 1
+    assert len(sql_queries.all_submissions()) == 10
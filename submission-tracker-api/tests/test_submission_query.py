@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from src.services import data_store, schema, submission_query
+
+
+def _scanned(df, term):
+    """Positions whose searchable columns contain `term`, by scanning every row"""
+    found = np.zeros(len(df), dtype=bool)
+    for column in submission_query.SEARCH_COLUMNS:
+        found |= df[column].astype(object).fillna('').astype(str).str.lower().str.contains(term, regex=False).to_numpy()
+    return np.flatnonzero(found)
+
+
+@pytest.mark.parametrize('q', ['lane', 'LANE ', 'traffic light', 'ahmed', 'mine', 'a', 'no such text', 'lane\nmin'])
+def test_search_matches_a_full_scan(frames, q):
+    snapshot = data_store.DataSnapshot(*frames, None)
+    index = snapshot.derived('submission_query')
+    np.testing.assert_array_equal(index.select(q=q), _scanned(snapshot.submissions, q.strip().lower()))
+
+
+def test_search_combines_with_filters_and_sort(frames):
+    snapshot = data_store.DataSnapshot(*frames, None)
+    df = snapshot.submissions
+    positions = snapshot.derived('submission_query').select(status='Rejected', q='lane', sort='-Timestamp')
+    expected = np.intersect1d(_scanned(df, 'lane'), np.flatnonzero((df[schema.STATUS] == 'Rejected').to_numpy()))
+    assert sorted(positions) == list(expected)
+    timestamps = df[schema.TIMESTAMP].to_numpy()[positions]
+    assert (timestamps[:-1] >= timestamps[1:]).all()
+
+
+def test_unknown_sort_column(frames):
+    with pytest.raises(submission_query.QueryError):
+        data_store.DataSnapshot(*frames, None).derived('submission_query').select(sort='Nope')
@@ -0,0 +1,54 @@
+import pytest
+from conftest import ADMIN_EMAIL, signin
+from src.services import data_store, schema, trends
+
+URL = '/api/analytics/trend'
+
+
+@pytest.fixture
+def admin(client):
+    signin(client, ADMIN_EMAIL)
+    return client
+
+
+@pytest.mark.parametrize('query, message', [
+    ({'granularity': 'hour'}, 'granularity must be one of'),
+    ({'breakdown': 'mood'}, 'breakdown must be one of'),
+    ({'start': '2025-13-01'}, 'start must be a date'),
+    ({'end': 'yesterday'}, 'end must be a date'),
+    ({'start': '2025-06-10', 'end': '2025-06-01'}, 'start must not be after end'),
+])
+def test_bad_parameters_are_rejected(admin, query, message):
+    response = admin.get(URL, query_string=query)
+    assert response.status_code == 400
+    assert message in response.get_json()['error']
+
+
+def _counted_by_hand(freq, start=None, end=None):
+    """{period: count} computed straight from the submissions' timestamps"""
+    timestamps = data_store.store.snapshot().submissions[schema.TIMESTAMP].dropna()
+    days = timestamps.dt.normalize()
+    if start:
+        days = days[days >= start]
+    if end:
+        days = days[days <= end]
+    periods = days.dt.to_period(freq).dt.start_time.dt.date.astype(str)
+    return periods.value_counts().sort_index().to_dict()
+
+
+@pytest.mark.parametrize('granularity, freq', [('day', 'D'), ('week', 'W-SUN'), ('month', 'M')])
+def test_buckets_count_the_submissions(admin, granularity, freq):
+    body = admin.get(URL, query_string={'granularity': f' {granularity.upper()} '}).get_json()
+    assert body['granularity'] == granularity
+    assert {point['period']: point['count'] for point in body['series']} == _counted_by_hand(freq)
+
+
+def test_date_range_and_breakdown(admin):
+    query = {'granularity': 'week', 'breakdown': 'status', 'start': '2025-05-20', 'end': '2025-06-10'}
+    body = admin.get(URL, query_string=query).get_json()
+    assert (body['start'], body['end'], body['breakdown']) == ('2025-05-20', '2025-06-10', 'status')
+    # Edge weeks only count the days in range
+    assert {point['period']: point['count'] for point in body['series']} == _counted_by_hand('W-SUN', '2025-05-20', '2025-06-10')
+    for point in body['series']:
+        assert sum(point['breakdown'].values()) == point['count']
+    assert body == trends.query_trend(data_store.store.snapshot(), query)